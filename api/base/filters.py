@@ -44,6 +44,9 @@ class ODMOrderingFilter(OrderingFilter):
     def filter_queryset(self, request, queryset, view):
         ordering = self.get_ordering(request, queryset, view)
         if ordering:
+            # Lists that can sort without loading every item, e.g. api.nodes.utils.LazyFileList
+            if getattr(queryset, 'sorts_lazily', False):
+                return queryset.sort(*ordering)
             if not isinstance(queryset, modularodm_queryset.BaseQuerySet) and isinstance(ordering, (list, tuple)):
                 sorted_list = sorted(queryset, cmp=sort_multiple(ordering))
                 return sorted_list
@@ -296,6 +299,11 @@ class ODMFilterMixin(FilterMixin):
         else:
             query = default_query
 
+        # In cursor pagination mode, only query the items after the cursor
+        cursor_query = self.paginator.get_cursor_query(self) if hasattr(self.paginator, 'get_cursor_query') else None
+        if cursor_query:
+            query = query & cursor_query
+
         return query
 
     def query_params_to_odm_query(self, query_params):
@@ -323,17 +331,30 @@ class ListFilterMixin(FilterMixin):
 
     Subclasses must define `get_default_queryset()`.
 
+    If `database_filtering` is set, filters on fields that are stored on `model_class` are
+    compiled into a modularodm query, which is passed to `get_default_queryset(query=...)` so
+    that it can be applied in the database. Filters on computed fields (e.g.
+    SerializerMethodFields) are applied in Python, preserving the order of the default queryset.
+
     Serializers that want to restrict which fields are used for filtering need to have a variable called
     filterable_fields which is a frozenset of strings representing the field names as they appear in the serialization.
     """
     FILTERS = {
         'eq': operator.eq,
+        'ne': operator.ne,
         'lt': operator.lt,
         'lte': operator.le,
         'gt': operator.gt,
-        'gte': operator.ge
+        'gte': operator.ge,
+        'in': lambda value, values: value in values,
+        'contains': lambda values, value: value in (values or []),
+        'icontains': lambda values, value: value.lower() in [each.lower() for each in values or []],
     }
 
+    # Set on views whose get_default_queryset accepts a `query` keyword
+    database_filtering = False
+    model_class = None
+
     def __init__(self, *args, **kwargs):
         super(FilterMixin, self).__init__(*args, **kwargs)
         if not self.serializer_class:
@@ -343,48 +364,99 @@ class ListFilterMixin(FilterMixin):
         raise NotImplementedError('Must define get_default_queryset')
 
     def get_queryset_from_request(self):
-        default_queryset = self.get_default_queryset()
         if not self.kwargs.get('is_embedded') and self.request.query_params:
-            param_queryset = self.param_queryset(self.request.query_params, default_queryset)
-            return param_queryset
+            filters = self.parse_query_params(self.request.query_params)
+            query, filters = self.compile_filters(filters)
+            if query is not None:
+                default_queryset = self.get_default_queryset(query=query)
+            else:
+                default_queryset = self.get_default_queryset()
+            if not filters:
+                return default_queryset
+            return list(self.filter_in_python(filters, default_queryset))
         else:
-            return default_queryset
+            return self.get_default_queryset()
+
+    def _get_serializer_field(self, field_name):
+        """Look up a serializer field by the (possibly converted) key used in parsed filters."""
+        declared_fields = self.serializer_class._declared_fields
+        if field_name in declared_fields:
+            return declared_fields[field_name]
+        for name, field in declared_fields.iteritems():
+            if not isinstance(field, ser.SerializerMethodField) and self.convert_key(name, field) == field_name:
+                return field
+        raise InvalidFilterError(detail="'{0}' is not a valid field for this endpoint.".format(field_name))
+
+    def is_storage_field(self, field_name, field):
+        """Whether a filter on ``field_name`` may be run against `model_class` in the database."""
+        if not self.database_filtering or self.model_class is None or isinstance(field, ser.SerializerMethodField):
+            return False
+        return field_name in self.model_class._fields
+
+    def compile_filters(self, filters):
+        """Split parsed filters into a modularodm query over storage fields and the
+        filters that must be applied in Python.
+
+        :param dict filters: Filters as returned by `parse_query_params`
+        :return tuple: (query or `None`, dict of remaining filters)
+        """
+        query_parts = []
+        remaining = {}
+        for field_name, params in filters.iteritems():
+            field = self._get_serializer_field(field_name)
+            if self.is_storage_field(field_name, field):
+                for group in params:
+                    query_parts.append(Q(field_name, self._get_query_operator(field, group['op']), group['value']))
+            else:
+                remaining[field_name] = params
+        query = functools.reduce(operator.and_, query_parts) if query_parts else None
+        return query, remaining
+
+    def _get_query_operator(self, field, op):
+        # Match the Python filters, which treat every string filter as a case-insensitive match
+        if isinstance(field, ser.CharField) and op != 'in':
+            return 'icontains'
+        return op
+
+    def filter_in_python(self, filters, queryset):
+        """Lazily yield the items of ``queryset`` that pass every filter in ``filters``."""
+        predicates = [
+            self.get_filter_predicate(field_name, group)
+            for field_name, params in filters.iteritems()
+            for group in params
+        ]
+        for item in queryset:
+            try:
+                if all(predicate(item) for predicate in predicates):
+                    yield item
+            except TypeError:
+                raise InvalidFilterValue(detail='Could not apply filter to specified field')
 
     def param_queryset(self, query_params, default_queryset):
         """filters default queryset based on query parameters"""
         filters = self.parse_query_params(query_params)
-        queryset = set(default_queryset)
-        if filters:
-            for field_name, params in filters.iteritems():
-                for group in params:
-                    queryset = queryset.intersection(set(self.get_filtered_queryset(field_name, group, default_queryset)))
-        return list(queryset)
+        return list(self.filter_in_python(filters, default_queryset))
 
     def get_filtered_queryset(self, field_name, params, default_queryset):
         """filters default queryset based on the serializer field type"""
-        field = self.serializer_class._declared_fields[field_name]
+        return list(self.filter_in_python({field_name: [params]}, default_queryset))
+
+    def get_filter_predicate(self, field_name, params):
+        """Build a function that checks a single item against one filter group"""
+        field = self._get_serializer_field(field_name)
         field_name = self.convert_key(field_name, field)
+        value = params['value']
 
         if isinstance(field, ser.SerializerMethodField):
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
-            ]
-        elif isinstance(field, ser.CharField):
-            return_val = [
-                item for item in default_queryset
-                if params['value'].lower() in getattr(item, field_name, {}).lower()
-            ]
+            # Look up the serializer method once rather than once per item
+            method = self.get_serializer_method(field_name)
+            compare = self.FILTERS[params['op']]
+            return lambda item: compare(method(item), value)
+        elif isinstance(field, ser.CharField) and params['op'] != 'in':
+            return lambda item: value.lower() in getattr(item, field_name, {}).lower()
         else:
-            try:
-                return_val = [
-                    item for item in default_queryset
-                    if self.FILTERS[params['op']](getattr(item, field_name, None), params['value'])
-                ]
-            except TypeError:
-                raise InvalidFilterValue(detail='Could not apply filter to specified field')
-
-        return return_val
+            compare = self.FILTERS[params['op']]
+            return lambda item: compare(getattr(item, field_name, None), value)
 
     def get_serializer_method(self, field_name):
         """
@@ -1,14 +1,25 @@
+import json
+import base64
+import datetime
+import functools
+import operator
 from django.utils import six
 from collections import OrderedDict
 from django.core.urlresolvers import reverse
 from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
 
+from dateutil import parser as date_parser
+from modularodm import Q
+from modularodm.query import queryset as modularodm_queryset
 from rest_framework import pagination
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.utils.urls import (
     replace_query_param, remove_query_param
 )
+from api.base import utils
+from api.base.exceptions import InvalidQueryStringError
+from api.base.filters import ODMOrderingFilter
 from api.base.serializers import is_anonymized
 from api.base.settings import MAX_PAGE_SIZE
 
@@ -22,11 +33,23 @@ class JSONAPIPagination(pagination.PageNumberPagination):
 
     Properly handles pagination of embedded objects.
 
+    Passing `page[cursor]` switches to cursor pagination: pages are keyed on the
+    view's sort fields plus `_id` instead of a page number, `next` links carry an
+    opaque cursor, and `meta.total` is only counted with `page[total]=true`.
+
     """
 
     page_size_query_param = 'page[size]'
     max_page_size = MAX_PAGE_SIZE
 
+    # Passing this param (empty for the first page) switches to cursor pagination
+    cursor_query_param = 'page[cursor]'
+    # In cursor mode, meta.total is only counted when this param is truthy
+    total_query_param = 'page[total]'
+
+    cursor = None
+    cursor_query_applied = False
+
     def page_number_query(self, url, page_number):
         """
         Builds uri and adds page param.
@@ -77,6 +100,138 @@ class JSONAPIPagination(pagination.PageNumberPagination):
             ])),
         ])
 
+    def is_cursor_request(self, request):
+        return (
+            self.cursor_query_param in request.query_params and
+            not request.parser_context['kwargs'].get('is_embedded')
+        )
+
+    def get_cursor_ordering(self, request, view):
+        """Sort fields of the cursor: the view's ordering with `_id` appended as
+        a tie-breaker, in the direction of the first field.
+        """
+        ordering = list(ODMOrderingFilter().get_ordering(request, None, view) or [])
+        ordering = [field for field in ordering if field.lstrip('-') != '_id']
+        tie_breaker = '-_id' if ordering and ordering[0].startswith('-') else '_id'
+        return ordering + [tie_breaker]
+
+    def decode_cursor(self, request):
+        """Return the sort values of the last item of the previous page, or `None`
+        for the first page.
+
+        :raises: InvalidQueryStringError if the cursor was not issued by us
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(str(token)))
+            return [
+                date_parser.parse(value['$date']) if isinstance(value, dict) else value
+                for value in values
+            ]
+        except (TypeError, ValueError, KeyError):
+            raise InvalidQueryStringError(
+                detail='Invalid cursor.',
+                parameter=self.cursor_query_param
+            )
+
+    def get_cursor_values(self, obj, ordering):
+        return [getattr(obj, field.lstrip('-')) for field in ordering]
+
+    def compare_cursor_values(self, values, other, ordering):
+        """Compare two lists of sort values in the order of ``ordering``: 1 if
+        ``values`` come after ``other``, -1 if before and 0 if equal.
+        """
+        for value, other_value, field in zip(values, other, ordering):
+            if value != other_value:
+                after = value < other_value if field.startswith('-') else value > other_value
+                return 1 if after else -1
+        return 0
+
+    def encode_cursor(self, obj, ordering):
+        values = [
+            {'$date': value.isoformat()} if isinstance(value, datetime.datetime) else value
+            for value in self.get_cursor_values(obj, ordering)
+        ]
+        return base64.urlsafe_b64encode(json.dumps(values))
+
+    def get_cursor_query(self, view):
+        """Return a query for the items after the cursor of the request, for views
+        that build their queryset from a modularodm query, or `None`. Views that
+        add it to their query (see `ODMFilterMixin`) let the database skip to the
+        page instead of the paginator walking the results.
+        """
+        request = view.request
+        if not self.is_cursor_request(request):
+            return None
+        self.cursor_query_applied = True
+        values = self.decode_cursor(request)
+        if values is None:
+            return None
+        ordering = self.get_cursor_ordering(request, view)
+        if len(values) != len(ordering):
+            raise InvalidQueryStringError(detail='Invalid cursor.', parameter=self.cursor_query_param)
+        # (a, b) after (x, y) is a > x OR (a = x AND b > y), for each sort direction
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            clause = [Q(previous.lstrip('-'), 'eq', values[i]) for i, previous in enumerate(ordering[:index])]
+            clause.append(Q(name, 'lt' if field.startswith('-') else 'gt', values[index]))
+            clauses.append(functools.reduce(operator.and_, clause))
+        return functools.reduce(operator.or_, clauses)
+
+    def paginate_queryset_by_cursor(self, queryset, request, view):
+        """Return the page after the cursor, fetching one extra item to tell
+        whether there is a next page. The total is only counted when asked for.
+        """
+        page_size = self.get_page_size(request)
+        ordering = self.get_cursor_ordering(request, view)
+        values = self.decode_cursor(request)
+        self.total = None
+        if utils.is_truthy(request.query_params.get(self.total_query_param, False)):
+            self.total = queryset.count() if isinstance(queryset, modularodm_queryset.BaseQuerySet) else len(queryset)
+
+        if isinstance(queryset, modularodm_queryset.BaseQuerySet) and (self.cursor_query_applied or values is None):
+            items = list(queryset.sort(*ordering).limit(page_size + 1))
+        else:
+            # Lists are sorted and skipped past the cursor here, comparing sort
+            # keys like the cursor query does, so a cursor whose item has since
+            # been deleted still resumes where it left off
+            keyed = [(self.get_cursor_values(item, ordering), item) for item in queryset]
+            if values is not None:
+                keyed = [(keys, item) for keys, item in keyed if self.compare_cursor_values(keys, values, ordering) > 0]
+            keyed.sort(cmp=lambda a, b: self.compare_cursor_values(a[0], b[0], ordering))
+            items = [item for keys, item in keyed[:page_size + 1]]
+
+        self.cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            self.cursor = self.encode_cursor(items[-1], ordering)
+        self.page_size = page_size
+        self.request = request
+        return items
+
+    def cursor_query(self, url, cursor):
+        url = remove_query_param(self.request.build_absolute_uri(url), '_')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_cursor_response_dict(self, data, url):
+        meta = OrderedDict()
+        if self.total is not None:
+            meta['total'] = self.total
+        meta['per_page'] = self.page_size
+        return OrderedDict([
+            ('data', data),
+            ('links', OrderedDict([
+                ('first', self.cursor_query(url, '')),
+                ('last', None),
+                ('prev', None),
+                ('next', self.cursor_query(url, self.cursor) if self.cursor else None),
+                ('meta', meta),
+            ])),
+        ])
+
     def get_paginated_response(self, data):
         """
         Formats paginated response in accordance with JSON API.
@@ -91,7 +246,10 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         if embedded:
             reversed_url = reverse(view_name, kwargs=kwargs)
 
-        response_dict = self.get_response_dict(data, reversed_url)
+        if self.is_cursor_request(self.request):
+            response_dict = self.get_cursor_response_dict(data, reversed_url)
+        else:
+            response_dict = self.get_response_dict(data, reversed_url)
 
         if is_anonymized(self.request):
             if response_dict.get('meta', False):
@@ -124,6 +282,9 @@ class JSONAPIPagination(pagination.PageNumberPagination):
             self.request = request
             return list(self.page)
 
+        elif self.is_cursor_request(request):
+            return self.paginate_queryset_by_cursor(queryset, request, view)
+
         else:
             return super(JSONAPIPagination, self).paginate_queryset(queryset, request, view=None)
 
@@ -16,6 +16,7 @@ from api.base.settings import BULK_SETTINGS
 from api.base.utils import extend_querystring_params
 from framework.auth import core as auth_core
 from modularodm import Q
+from modularodm.fields import ForeignField
 from modularodm.exceptions import NoResultsFound
 from website import settings
 from website import util as website_utils
@@ -200,6 +201,10 @@ def _url_val(val, obj, serializer, **kwargs):
         if getattr(serializer, 'field', None):
             serializer = serializer.parent
         url = getattr(serializer, val)(obj) if obj is not None else None
+    elif isinstance(val, RelatedCount):
+        if getattr(serializer, 'field', None):
+            serializer = serializer.parent
+        url = val.get_count(obj, serializer) if obj is not None else None
     else:
         url = val
 
@@ -209,6 +214,35 @@ def _url_val(val, obj, serializer, **kwargs):
         return url
 
 
+class RelatedCount(object):
+    """A ``related_meta`` count computed for every object on the page at once. ::
+
+        children = RelationshipField(
+            related_view='nodes:node-children',
+            related_view_kwargs={'node_id': '<pk>'},
+            related_meta={'count': RelatedCount('get_node_counts')},
+        )
+
+    ``method`` names a serializer method that takes a list of objects and returns a
+    dict mapping their ``_id``s to counts; objects missing from the dict count 0. The
+    method is called once for the objects being serialized by the list serializer
+    (or with just the one object otherwise) and its result is kept in the serializer
+    context for the rest of the request.
+    """
+
+    def __init__(self, method):
+        self.method = method
+
+    def get_count(self, obj, serializer):
+        counts = serializer.context.setdefault('related_counts', {}).setdefault((type(serializer), self.method), {})
+        if obj._id not in counts:
+            page = serializer.context.get('page') or []
+            objs = [each for each in page if each._id not in counts] if obj in page else [obj]
+            computed = getattr(serializer, self.method)(objs)
+            counts.update({each._id: computed.get(each._id, 0) for each in objs})
+        return counts[obj._id]
+
+
 class IDField(ser.CharField):
     """
     ID field that validates that 'id' in the request body is the same as the instance 'id' for single requests.
@@ -310,7 +344,7 @@ class RelationshipField(ser.HyperlinkedIdentityField):
             related_view_kwargs={'node_id': '<pk>'},
             self_view='nodes:node-node-children-relationship',
             self_view_kwargs={'node_id': '<pk>'},
-            related_meta={'count': 'get_node_count'}
+            related_meta={'count': RelatedCount('get_node_counts')}
         )
 
     The lookup field must be surrounded in angular brackets to find the attribute on the target. Otherwise, the lookup
@@ -402,6 +436,27 @@ class RelationshipField(ser.HyperlinkedIdentityField):
             )
         )
 
+    def prefetch(self, resources):
+        """Load the records that looking up the view kwargs of every one of
+        ``resources`` passes through, e.g. the parents for
+        ``'<parent_node._id>'``, with one query per foreign field.
+        """
+        by_model = collections.defaultdict(list)
+        for resource in resources:
+            by_model[type(resource)].append(resource)
+        for model, model_resources in by_model.items():
+            for lookup in self.lookup_url_kwarg.values():
+                source_attrs = (_tpl(lookup) or '').split('.')
+                if len(source_attrs) < 2:
+                    continue
+                model_field = getattr(model, '_fields', {}).get(source_attrs[0])
+                if not isinstance(model_field, ForeignField):
+                    continue
+                utils.prefetch(
+                    model_field.base_class,
+                    [model_field._get_underlying_data(resource) for resource in model_resources]
+                )
+
     def process_related_counts_parameters(self, params, value):
         """
         Processes related_counts parameter.
@@ -692,7 +747,7 @@ class LinksField(ser.Field):
             'html': 'absolute_url',
             'children': {
                 'related': Link('nodes:node-children', node_id='<pk>'),
-                'count': 'get_node_count'
+                'count': RelatedCount('get_node_counts')
             },
             'contributors': {
                 'related': Link('nodes:node-contributors', node_id='<pk>'),
@@ -700,7 +755,7 @@ class LinksField(ser.Field):
             },
             'registrations': {
                 'related': Link('nodes:node-registrations', node_id='<pk>'),
-                'count': 'get_registration_count'
+                'count': RelatedCount('get_registration_counts')
             },
         })
     """
@@ -841,6 +896,15 @@ class JSONAPIListSerializer(ser.ListSerializer):
                 self.child.to_esi_representation(item, envelope=None) for item in data
             ]
         else:
+            data = list(data)
+            # Lets fields compute their values for the whole page at once, see RelatedCount
+            self.context['page'] = data
+            embeds = self.context.get('embed', {})
+            if embeds:
+                # Resolve the embeds of the whole page in batches before
+                # serializing the items one by one
+                for embed in embeds.values():
+                    embed.prefetch(data)
             ret = [
                 self.child.to_representation(item, envelope=envelope) for item in data
             ]
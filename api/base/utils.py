@@ -93,6 +93,19 @@ def get_object_or_error(model_cls, query_or_pk, display_name=None, **kwargs):
     return obj
 
 
+def prefetch(model_cls, keys):
+    """Load the records of ``model_cls`` with the given primary keys into the
+    identity map with a single query, so that later loads in the same request
+    do not go to the database. Keys that are already loaded are skipped.
+
+    :return: list of the records that were loaded
+    """
+    missing = list({key for key in keys if key is not None and model_cls._get_cache(key) is None})
+    if not missing:
+        return []
+    return list(model_cls.find(Q(model_cls._primary_name, 'in', missing)))
+
+
 def waterbutler_url_for(request_type, provider, path, node_id, token, obj_args=None, **query):
     """Reverse URL lookup for WaterButler routes
     :param str request_type: data or metadata
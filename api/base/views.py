@@ -1,4 +1,5 @@
 import weakref
+import collections
 from django.http import JsonResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -98,6 +99,28 @@ class JSONAPIBaseView(generics.GenericAPIView):
 
             return ret
 
+        def prefetch(items):
+            """Load what embedding the field for each of ``items`` needs up front,
+            with one query per relationship rather than one per item. The
+            embedded views then find the records in the identity map.
+            """
+            if getattr(field, 'prefetch', None):
+                field.prefetch(items)
+            view_kwargs = collections.defaultdict(list)
+            for item in items:
+                try:
+                    v, view_args, kwargs = field.resolve(item, field_name)
+                except Exception:
+                    # Left for the embed itself to report
+                    continue
+                if v:
+                    view_kwargs[v.cls].append(kwargs)
+            for view_cls, kwargs_list in view_kwargs.items():
+                prefetch_embeds = getattr(view_cls, 'prefetch_embeds', None)
+                if prefetch_embeds:
+                    prefetch_embeds(kwargs_list)
+
+        partial.prefetch = prefetch
         return partial
 
     def get_serializer_context(self):
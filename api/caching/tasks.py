@@ -1,85 +1,218 @@
+import os
 import urlparse
+import threading
+import collections
 
+import gevent.pool
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 from website.project.model import Comment
 
+from framework.celery_tasks import app
+from framework.postcommit_tasks.handlers import enqueue_postcommit_task, postcommit_queue
 from website import settings
 
 logger = logging.getLogger(__name__)
 
+_local = threading.local()
+
+# Keep-alive connections to the Varnish servers, shared by every ban
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_maxsize=settings.VARNISH_BAN_CONCURRENCY))
+session.mount('https://', HTTPAdapter(pool_maxsize=settings.VARNISH_BAN_CONCURRENCY))
+
 
 def get_varnish_servers():
     #  TODO: this should get the varnish servers from HAProxy or a setting
     return settings.VARNISH_SERVERS
 
 
-def get_bannable_urls(instance):
-    bannable_urls = []
-    parsed_absolute_url = {}
-
+def get_bannable_paths(instance):
+    """Return the API URL paths that must be banned when ``instance`` changes,
+    along with the hostname Varnish caches them under.
+    """
     if not hasattr(instance, 'absolute_api_v2_url'):
         logger.warning('Tried to ban {}:{} but it didn\'t have a absolute_api_v2_url method'.format(instance.__class__, instance))
         return [], ''
 
+    parsed_absolute_url = urlparse.urlparse(instance.absolute_api_v2_url)
+    bannable_paths = [parsed_absolute_url.path]
+    if isinstance(instance, Comment):
+        try:
+            bannable_paths.append(urlparse.urlparse(instance.target.referent.absolute_api_v2_url).path)
+        except AttributeError:
+            # some referents don't have an absolute_api_v2_url
+            # I'm looking at you NodeWikiPage
+            pass
+
+        try:
+            bannable_paths.append(urlparse.urlparse(instance.root_target.referent.absolute_api_v2_url).path)
+        except AttributeError:
+            # some root_targets don't have an absolute_api_v2_url
+            pass
+
+    return bannable_paths, parsed_absolute_url.hostname
+
+
+def get_bannable_urls(instance):
+    bannable_paths, hostname = get_bannable_paths(instance)
+    bannable_urls = []
+
     for host in get_varnish_servers():
-        # add instance url
         varnish_parsed_url = urlparse.urlparse(host)
-        parsed_absolute_url = urlparse.urlparse(instance.absolute_api_v2_url)
-        url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
-                                                          netloc=varnish_parsed_url.netloc,
-                                                          path=parsed_absolute_url.path)
-        bannable_urls.append(url_string)
-        if isinstance(instance, Comment):
-            try:
-                parsed_target_url = urlparse.urlparse(instance.target.referent.absolute_api_v2_url)
-            except AttributeError:
-                # some referents don't have an absolute_api_v2_url
-                # I'm looking at you NodeWikiPage
-                pass
-            else:
-                url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
-                                                                  netloc=varnish_parsed_url.netloc,
-                                                                  path=parsed_target_url.path)
-                bannable_urls.append(url_string)
-
-            try:
-                parsed_root_target_url = urlparse.urlparse(instance.root_target.referent.absolute_api_v2_url)
-            except AttributeError:
-                # some root_targets don't have an absolute_api_v2_url
-                pass
-            else:
-                url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
+        for path in bannable_paths:
+            url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
                                                               netloc=varnish_parsed_url.netloc,
-                                                              path=parsed_root_target_url.path)
-                bannable_urls.append(url_string)
+                                                              path=path)
+            bannable_urls.append(url_string)
+
+    return bannable_urls, hostname
+
+
+def build_ban_patterns(paths, max_length=None):
+    """Merge URL path prefixes into as few ban regexes as possible.
+
+    Prefixes already covered by a shorter prefix are dropped, and the rest are
+    joined into alternations no longer than ``max_length`` characters, e.g.
+    ``['/v2/nodes/abc/', '/v2/users/def/']`` becomes
+    ``['/v2/(?:nodes/abc/|users/def/).*']``.
+    """
+    max_length = max_length or settings.VARNISH_BAN_MAX_LENGTH
+
+    prefixes = []
+    # Sorting places every prefix directly before the paths it covers
+    for path in sorted(set(paths)):
+        if prefixes and path.startswith(prefixes[-1]):
+            continue
+        prefixes.append(path)
+
+    patterns, group = [], []
+    for prefix in prefixes:
+        if group and len(_build_ban_pattern(group + [prefix])) > max_length:
+            patterns.append(_build_ban_pattern(group))
+            group = []
+        group.append(prefix)
+    if group:
+        patterns.append(_build_ban_pattern(group))
+    return patterns
 
-    return bannable_urls, parsed_absolute_url.hostname
+
+def _build_ban_pattern(prefixes):
+    if len(prefixes) == 1:
+        return '{}.*'.format(prefixes[0])
+    # Keep the leading path segments outside of the alternation so the pattern
+    # is still a valid request path
+    common = os.path.commonprefix(prefixes)
+    common = common[:common.rfind('/') + 1]
+    return '{}(?:{}).*'.format(
+        common,
+        '|'.join(prefix[len(common):] for prefix in prefixes)
+    )
+
+
+def send_ban(server, hostname, pattern):
+    """Send a single BAN for ``pattern`` to the Varnish ``server``. Returns
+    whether the ban succeeded.
+    """
+    request = session.prepare_request(requests.Request('BAN', server, headers=dict(
+        Host=hostname
+    )))
+    # Send the pattern verbatim; requests would otherwise percent-encode the
+    # regex metacharacters
+    request.url = '{}{}'.format(server.rstrip('/'), pattern)
+    try:
+        response = session.send(request, timeout=settings.VARNISH_BAN_TIMEOUT)
+    except Exception as ex:
+        logger.error('Banning {} failed: {}'.format(
+            request.url,
+            ex.message
+        ))
+        return False
+    if not response.ok:
+        logger.error('Banning {} failed: {}'.format(
+            request.url,
+            response.text
+        ))
+        return False
+    logger.info('Banning {} succeeded'.format(
+        request.url
+    ))
+    return True
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=10)
+def retry_ban(self, server, hostname, pattern):
+    if not send_ban(server, hostname, pattern):
+        raise self.retry()
+
+
+def _send_or_retry(server, hostname, pattern):
+    if send_ban(server, hostname, pattern):
+        return
+    if settings.USE_CELERY:
+        retry_ban.apply_async(args=(server, hostname, pattern), countdown=retry_ban.default_retry_delay)
+
+
+class BanBatch(object):
+    """URL prefixes to ban, collected over a request or task and sent
+    together by `flush`.
+    """
+
+    def __init__(self):
+        # (varnish server, hostname) => set of path prefixes
+        self.paths = collections.defaultdict(set)
+        self.flushed = False
+
+    def add(self, instance):
+        bannable_paths, hostname = get_bannable_paths(instance)
+        if not bannable_paths:
+            return
+        for server in get_varnish_servers():
+            self.paths[(server, hostname)].update(bannable_paths)
+
+    def bans(self):
+        return [
+            (server, hostname, pattern)
+            for (server, hostname), paths in self.paths.items()
+            for pattern in build_ban_patterns(paths)
+        ]
+
+    def flush(self):
+        """Send every collected ban concurrently over the shared session.
+        Failed bans are handed to `retry_ban`.
+        """
+        self.flushed = True
+        bans = self.bans()
+        self.paths.clear()
+        pool = gevent.pool.Pool(settings.VARNISH_BAN_CONCURRENCY)
+        for ban in bans:
+            pool.spawn(_send_or_retry, *ban)
+        pool.join()
+
+
+def current_batch():
+    """Return the batch for the current request or task. A new batch is
+    started whenever the post-commit queue it was flushed from is replaced.
+    """
+    queue = postcommit_queue()
+    batch = getattr(_local, 'ban_batch', None)
+    if batch is None or batch.flushed or getattr(_local, 'ban_queue', None) is not queue:
+        batch = _local.ban_batch = BanBatch()
+        _local.ban_queue = queue
+    return batch
 
 
 def ban_url(instance):
-    # TODO: Refactor; Pull url generation into postcommit_task handling so we only ban urls once per request
-    timeout = 0.3  # 300ms timeout for bans
+    """Schedule the API URLs of ``instance`` to be banned from Varnish once the
+    current request's transaction has been committed. Bans for the whole
+    request are merged and sent together.
+    """
     if settings.ENABLE_VARNISH:
-        bannable_urls, hostname = get_bannable_urls(instance)
-
-        for url_to_ban in set(bannable_urls):
-            try:
-                response = requests.request('BAN', url_to_ban, timeout=timeout, headers=dict(
-                    Host=hostname
-                ))
-            except Exception as ex:
-                logger.error('Banning {} failed: {}'.format(
-                    url_to_ban,
-                    ex.message
-                ))
-            else:
-                if not response.ok:
-                    logger.error('Banning {} failed: {}'.format(
-                        url_to_ban,
-                        response.text
-                    ))
-                else:
-                    logger.info('Banning {} succeeded'.format(
-                        url_to_ban
-                    ))
+        batch = current_batch()
+        batch.add(instance)
+        enqueue_postcommit_task(flush_bans, (batch, ), {}, celery=True)
+
+
+def flush_bans(batch):
+    batch.flush()
@@ -0,0 +1,76 @@
+from __future__ import unicode_literals
+
+import re
+
+import mock
+from nose.tools import *  # flake8: noqa
+
+from api.caching import tasks
+from tests.base import DbTestCase
+from tests.factories import NodeFactory
+
+
+class TestBuildBanPatterns(DbTestCase):
+
+    def test_single_path(self):
+        assert_equal(tasks.build_ban_patterns(['/v2/nodes/abcde/']), ['/v2/nodes/abcde/.*'])
+
+    def test_paths_are_merged(self):
+        patterns = tasks.build_ban_patterns(['/v2/users/fghij/', '/v2/nodes/abcde/'])
+        assert_equal(patterns, ['/v2/(?:nodes/abcde/|users/fghij/).*'])
+
+    def test_covered_paths_are_dropped(self):
+        patterns = tasks.build_ban_patterns(['/v2/nodes/abcde/', '/v2/nodes/abcde/files/'])
+        assert_equal(patterns, ['/v2/nodes/abcde/.*'])
+
+    def test_long_lists_are_split(self):
+        paths = ['/v2/nodes/{:05d}/'.format(i) for i in range(100)]
+        patterns = tasks.build_ban_patterns(paths, max_length=200)
+        assert_true(all(len(pattern) <= 200 for pattern in patterns))
+        assert_true(len(patterns) > 1)
+        for path in paths:
+            assert_true(any(re.match(pattern, path) for pattern in patterns))
+
+
+@mock.patch('api.caching.tasks.get_varnish_servers', return_value=['http://varnish1', 'http://varnish2'])
+class TestBanBatch(DbTestCase):
+
+    def setUp(self):
+        super(TestBanBatch, self).setUp()
+        self.nodes = [NodeFactory() for _ in range(50)]
+
+    @mock.patch('api.caching.tasks.send_ban', return_value=True)
+    def test_one_ban_per_host(self, mock_send, mock_servers):
+        batch = tasks.BanBatch()
+        for node in self.nodes:
+            batch.add(node)
+        batch.flush()
+        assert_equal(mock_send.call_count, 2)
+        assert_equal(
+            {call[0][0] for call in mock_send.call_args_list},
+            {'http://varnish1', 'http://varnish2'}
+        )
+        assert_true(batch.flushed)
+        assert_equal(batch.bans(), [])
+
+    @mock.patch('api.caching.tasks.retry_ban')
+    @mock.patch('api.caching.tasks.send_ban', return_value=False)
+    def test_failed_bans_are_retried(self, mock_send, mock_retry, mock_servers):
+        batch = tasks.BanBatch()
+        batch.add(self.nodes[0])
+        with mock.patch('api.caching.tasks.settings.USE_CELERY', True):
+            batch.flush()
+        assert_equal(mock_retry.apply_async.call_count, 2)
+
+    @mock.patch('api.caching.tasks.enqueue_postcommit_task')
+    def test_ban_url_enqueues_flush_once_per_batch(self, mock_enqueue, mock_servers):
+        tasks._local.ban_batch = None
+        with mock.patch('api.caching.tasks.settings.ENABLE_VARNISH', True):
+            tasks.ban_url(self.nodes[0])
+            tasks.ban_url(self.nodes[1])
+        batch = tasks.current_batch()
+        assert_equal(
+            {args[0] for args, kwargs in mock_enqueue.call_args_list},
+            {tasks.flush_bans}
+        )
+        assert_equal(len(batch.bans()), 2)
@@ -1,3 +1,5 @@
+import collections
+
 from rest_framework import serializers as ser
 from rest_framework import exceptions
 
@@ -15,7 +17,7 @@ from website.project.model import NodeUpdateError
 from api.base.utils import get_user_auth, get_object_or_error, absolute_reverse
 from api.base.serializers import (JSONAPISerializer, WaterbutlerLink, NodeFileHyperLinkField, IDField, TypeField,
                                   TargetTypeField, JSONAPIListField, LinksField, RelationshipField, DevOnly,
-                                  HideIfRegistration)
+                                  HideIfRegistration, RelatedCount)
 from api.base.exceptions import InvalidModelValueError
 
 
@@ -107,7 +109,7 @@ class NodeSerializer(JSONAPISerializer):
     children = RelationshipField(
         related_view='nodes:node-children',
         related_view_kwargs={'node_id': '<pk>'},
-        related_meta={'count': 'get_node_count'},
+        related_meta={'count': RelatedCount('get_node_counts')},
     )
 
     comments = RelationshipField(
@@ -151,7 +153,7 @@ class NodeSerializer(JSONAPISerializer):
     registrations = DevOnly(HideIfRegistration(RelationshipField(
         related_view='nodes:node-registrations',
         related_view_kwargs={'node_id': '<pk>'},
-        related_meta={'count': 'get_registration_count'}
+        related_meta={'count': RelatedCount('get_registration_counts')}
     )))
 
     primary_institution = RelationshipField(
@@ -190,20 +192,36 @@ class NodeSerializer(JSONAPISerializer):
     # TODO: See if we can get the count filters into the filter rather than the serializer.
 
     def get_logs_count(self, obj):
-        return len(obj.logs)
+        return obj.get_log_count()
 
-    def get_node_count(self, obj):
+    def get_node_counts(self, objs):
         auth = get_user_auth(self.context['request'])
-        nodes = [node for node in obj.nodes if node.can_view(auth) and node.primary and not node.is_deleted]
-        return len(nodes)
+        counts = collections.Counter()
+        # Count the primary components in `nodes`, as listed by NodeChildrenList
+        parent_ids = {
+            child_id: obj._id
+            for obj in objs
+            for child_id in obj._get_primary_child_ids()
+        }
+        children = Node.find(
+            Q('_id', 'in', list(parent_ids)) &
+            Q('is_deleted', 'ne', True)
+        )
+        for node in children:
+            if node.can_view(auth):
+                counts[parent_ids[node._id]] += 1
+        return counts
 
     def get_contrib_count(self, obj):
         return len(obj.contributors)
 
-    def get_registration_count(self, obj):
+    def get_registration_counts(self, objs):
         auth = get_user_auth(self.context['request'])
-        registrations = [node for node in obj.registrations_all if node.can_view(auth)]
-        return len(registrations)
+        counts = collections.Counter()
+        for node in Node.find(Q('registered_from', 'in', [obj._id for obj in objs])):
+            if node.can_view(auth):
+                counts[node.registered_from_id] += 1
+        return counts
 
     def get_pointers_count(self, obj):
         return len(obj.nodes_pointer)
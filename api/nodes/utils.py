@@ -5,9 +5,11 @@ from rest_framework.status import is_server_error
 import requests
 
 from website.files.models import OsfStorageFileNode
+from website.util import waterbutler
 from website.util import waterbutler_api_url_for
 
 from api.base.exceptions import ServiceUnavailableError
+from api.base.filters import sort_multiple
 from api.base.utils import get_object_or_error
 
 def get_file_object(node, path, provider, request):
@@ -28,12 +30,20 @@ def get_file_object(node, path, provider, request):
     if not node.get_addon(provider) or not node.get_addon(provider).configured:
         raise NotFound('The {} provider is not configured for this project.'.format(provider))
 
+    user_id = getattr(request.user, '_id', None)
+    data = waterbutler.METADATA_CACHE.get(node._id, provider, path, user_id)
+    if data is not None:
+        return data
+
     url = waterbutler_api_url_for(node._id, provider, path, meta=True)
-    waterbutler_request = requests.get(
-        url,
-        cookies=request.COOKIES,
-        headers={'Authorization': request.META.get('HTTP_AUTHORIZATION')},
-    )
+    try:
+        waterbutler_request = waterbutler.get(
+            url,
+            cookies=request.COOKIES,
+            headers={'Authorization': request.META.get('HTTP_AUTHORIZATION')},
+        )
+    except requests.exceptions.RequestException:
+        raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
 
     if waterbutler_request.status_code == 401:
         raise PermissionDenied
@@ -45,6 +55,73 @@ def get_file_object(node, path, provider, request):
         raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
 
     try:
-        return waterbutler_request.json()['data']
+        data = waterbutler_request.json()['data']
     except KeyError:
         raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
+    waterbutler.METADATA_CACHE.set(node._id, provider, path, user_id, data)
+    return data
+
+
+class LazyFileList(object):
+    """A folder listing from WaterButler whose items are only turned into file
+    nodes when they are accessed, so that serving one page of a large folder
+    only creates, updates and checks the permissions of the files on that page.
+
+    :param list items: WaterButler metadata of the folder's contents
+    :param callable materialize: Turns one item into a file node
+    """
+
+    # Set for `ODMOrderingFilter`, which calls `sort` instead of sorting the items itself
+    sorts_lazily = True
+
+    # Serializer fields that can be sorted on before materializing, mapped to
+    # the WaterButler attributes they are copied from
+    SORT_ATTRIBUTES = {
+        'name': 'name',
+        'kind': 'kind',
+        'path': 'path',
+        'provider': 'provider',
+        'materialized_path': 'materialized',
+    }
+
+    def __init__(self, items, materialize):
+        self.items = list(items)
+        self.materialize = materialize
+        self._materialized = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def count(self):
+        return len(self.items)
+
+    def _get(self, index):
+        if index not in self._materialized:
+            self._materialized[index] = self.materialize(self.items[index])
+        return self._materialized[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self.items)))]
+        if index < 0:
+            index += len(self.items)
+        if not 0 <= index < len(self.items):
+            raise IndexError(index)
+        return self._get(index)
+
+    def __iter__(self):
+        for index in range(len(self.items)):
+            yield self._get(index)
+
+    def sort(self, *ordering):
+        """Return the listing sorted by ``ordering``, without materializing it
+        if every field is available from WaterButler's metadata.
+        """
+        if not all(field.lstrip('-') in self.SORT_ATTRIBUTES for field in ordering):
+            return sorted(self, cmp=sort_multiple(ordering))
+        items = list(self.items)
+        # Sort by the least significant field first; sorting is stable
+        for field in reversed(ordering):
+            attribute = self.SORT_ATTRIBUTES[field.lstrip('-')]
+            items.sort(key=lambda item: item['attributes'].get(attribute), reverse=field.startswith('-'))
+        return LazyFileList(items, self.materialize)
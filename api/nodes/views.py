@@ -1,3 +1,5 @@
+import itertools
+
 from modularodm import Q
 from rest_framework import generics, permissions as drf_permissions
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
@@ -12,7 +14,7 @@ from api.base.filters import ODMFilterMixin, ListFilterMixin
 from api.base.views import JSONAPIBaseView
 from api.base.parsers import JSONAPIOnetoOneRelationshipParser, JSONAPIOnetoOneRelationshipParserForRegularJSON
 from api.base.pagination import CommentPagination, NodeContributorPagination
-from api.base.utils import get_object_or_error, is_bulk_request, get_user_auth, is_truthy
+from api.base.utils import get_object_or_error, is_bulk_request, get_user_auth, is_truthy, prefetch
 from api.files.serializers import FileSerializer
 from api.comments.serializers import CommentSerializer, CommentCreateSerializer
 from api.comments.permissions import CanCommentOrPublic
@@ -30,7 +32,7 @@ from api.nodes.serializers import (
     NodeAlternativeCitationSerializer,
     NodeContributorsCreateSerializer
 )
-from api.nodes.utils import get_file_object
+from api.nodes.utils import get_file_object, LazyFileList
 
 from api.registrations.serializers import RegistrationSerializer
 from api.institutions.serializers import InstitutionSerializer
@@ -76,6 +78,14 @@ class NodeMixin(object):
             self.check_object_permissions(self.request, node)
         return node
 
+    @classmethod
+    def prefetch_embeds(cls, view_kwargs):
+        """Load the nodes of several embedded instances of this view with one query.
+
+        :param list view_kwargs: URL kwargs of each embedded view
+        """
+        prefetch(Node, [kwargs.get(cls.node_lookup_url_kwarg) for kwargs in view_kwargs])
+
 
 class WaterButlerMixin(object):
 
@@ -559,17 +569,33 @@ class NodeContributorsList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bu
     required_read_scopes = [CoreScopes.NODE_CONTRIBUTORS_READ]
     required_write_scopes = [CoreScopes.NODE_CONTRIBUTORS_WRITE]
     model_class = User
+    database_filtering = True
 
     pagination_class = NodeContributorPagination
     serializer_class = NodeContributorsSerializer
     view_category = 'nodes'
     view_name = 'node-contributors'
 
-    def get_default_queryset(self):
+    @classmethod
+    def prefetch_embeds(cls, view_kwargs):
+        super(NodeContributorsList, cls).prefetch_embeds(view_kwargs)
+        nodes = [Node.load(kwargs[cls.node_lookup_url_kwarg]) for kwargs in view_kwargs]
+        prefetch(User, itertools.chain.from_iterable(
+            node.contributors._to_primary_keys() for node in nodes if node
+        ))
+
+    def get_default_queryset(self, query=None):
         node = self.get_node()
         visible_contributors = set(node.visible_contributor_ids)
         contributors = []
-        for contributor in node.contributors:
+        if query is not None:
+            contributor_ids = node.contributors._to_primary_keys()
+            matching_ids = set(User.find(Q('_id', 'in', contributor_ids) & query).get_keys())
+            # Keep the contributors' order on the node
+            matching = (User.load(user_id) for user_id in contributor_ids if user_id in matching_ids)
+        else:
+            matching = node.contributors
+        for contributor in matching:
             contributor.bibliographic = contributor._id in visible_contributors
             contributor.permission = node.get_permissions(contributor)[-1]
             contributor.node_id = node._id
@@ -1220,8 +1246,8 @@ class NodeFilesList(JSONAPIBaseView, generics.ListAPIView, WaterButlerMixin, Lis
     """Files attached to a node for a given provider. *Read-only*.
 
     This gives a list of all of the files and folders that are attached to your project for the given storage provider.
-    If the provider is not "osfstorage", the metadata for the files in the storage will be retrieved and cached whenever
-    this endpoint is accessed.  To see the cached metadata, GET the endpoint for the file directly (available through
+    If the provider is not "osfstorage", the metadata for the files on the requested page will be retrieved and cached
+    whenever this endpoint is accessed.  To see the cached metadata, GET the endpoint for the file directly (available through
     its `/links/info` attribute).
 
     When a create/update/delete action is performed against the file or folder, the action is handled by an external
@@ -1473,7 +1499,7 @@ class NodeFilesList(JSONAPIBaseView, generics.ListAPIView, WaterButlerMixin, Lis
         files_list = self.fetch_from_waterbutler()
 
         if isinstance(files_list, list):
-            return [self.get_file_item(file) for file in files_list]
+            return LazyFileList(files_list, self.get_file_item)
 
         if isinstance(files_list, dict) or getattr(files_list, 'is_file', False):
             # We should not have gotten a file here
@@ -8,7 +8,8 @@ from api.nodes.serializers import NodeSerializer
 from api.nodes.serializers import NodeLinksSerializer
 from api.nodes.serializers import NodeContributorsSerializer, NodeTagField
 from api.base.serializers import (IDField, RelationshipField, LinksField, HideIfWithdrawal,
-                                  FileCommentRelationshipField, NodeFileHyperLinkField, HideIfRegistration, JSONAPIListField)
+                                  FileCommentRelationshipField, NodeFileHyperLinkField, HideIfRegistration, JSONAPIListField,
+                                  RelatedCount)
 
 
 class RegistrationSerializer(NodeSerializer):
@@ -67,7 +68,7 @@ class RegistrationSerializer(NodeSerializer):
     children = HideIfWithdrawal(RelationshipField(
         related_view='registrations:registration-children',
         related_view_kwargs={'node_id': '<pk>'},
-        related_meta={'count': 'get_node_count'},
+        related_meta={'count': RelatedCount('get_node_counts')},
     ))
 
     comments = HideIfWithdrawal(RelationshipField(
@@ -11,7 +11,7 @@ from framework.auth.oauth_scopes import CoreScopes
 from website.models import User, Node
 
 from api.base import permissions as base_permissions
-from api.base.utils import get_object_or_error
+from api.base.utils import get_object_or_error, prefetch
 from api.base.exceptions import Conflict
 from api.base.views import JSONAPIBaseView
 from api.base.filters import ODMFilterMixin
@@ -49,6 +49,14 @@ class UserMixin(object):
             self.check_object_permissions(self.request, obj)
         return obj
 
+    @classmethod
+    def prefetch_embeds(cls, view_kwargs):
+        """Load the users of several embedded instances of this view with one query.
+
+        :param list view_kwargs: URL kwargs of each embedded view
+        """
+        prefetch(User, [kwargs.get(cls.user_lookup_url_kwarg) for kwargs in view_kwargs])
+
 
 class UserList(JSONAPIBaseView, generics.ListAPIView, ODMFilterMixin):
     """List of users registered on the OSF. *Read-only*.
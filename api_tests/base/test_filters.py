@@ -11,7 +11,7 @@ from rest_framework import serializers as ser
 
 from tests.base import ApiTestCase
 
-from api.base.filters import FilterMixin
+from api.base.filters import FilterMixin, ListFilterMixin
 
 from api.base.filters import ODMOrderingFilter
 
@@ -41,6 +41,26 @@ class FakeView(FilterMixin):
     serializer_class = FakeSerializer
 
 
+class FakeRecord(object):
+
+    def __init__(self, _id, string_field, int_field, foobar=False):
+        self._id = _id
+        self.string_field = string_field
+        self.int_field = int_field
+        self.foobar = foobar
+
+
+class FakeModel(object):
+    _fields = {'string_field': None, 'int_field': None}
+
+
+class FakeListView(ListFilterMixin):
+
+    serializer_class = FakeSerializer
+    model_class = FakeModel
+    database_filtering = True
+
+
 class TestFilterMixin(ApiTestCase):
 
     def setUp(self):
@@ -232,6 +252,51 @@ class TestFilterMixin(ApiTestCase):
 
 
 
+class TestListFilterMixin(ApiTestCase):
+
+    def setUp(self):
+        super(TestListFilterMixin, self).setUp()
+        self.view = FakeListView()
+        self.records = [
+            FakeRecord(str(i), 'Record {}'.format(i), i, foobar=bool(i % 2))
+            for i in range(20)
+        ]
+
+    def test_compile_filters_splits_storage_fields(self):
+        filters = self.view.parse_query_params({
+            'filter[string_field]': 'Foo',
+            'filter[int_field][gt]': '10',
+            'filter[bool_field]': 'true',
+        })
+        query, remaining = self.view.compile_filters(filters)
+        assert_equal(remaining.keys(), ['foobar'])
+        assert_equal(
+            {(node.attribute, node.operator, node.argument) for node in query.nodes},
+            {('string_field', 'icontains', 'Foo'), ('int_field', 'gt', 10)}
+        )
+
+    def test_compile_filters_without_database_filtering(self):
+        self.view.database_filtering = False
+        filters = self.view.parse_query_params({'filter[int_field]': '10'})
+        query, remaining = self.view.compile_filters(filters)
+        assert_is_none(query)
+        assert_equal(remaining, filters)
+
+    def test_filter_in_python_keeps_order(self):
+        filters = self.view.parse_query_params({
+            'filter[int_field][gte]': '5',
+            'filter[bool_field]': 'true',
+            'filter[string_field]': 'record 1',
+        })
+        results = list(self.view.filter_in_python(filters, self.records))
+        assert_equal([each.int_field for each in results], [11, 13, 15, 17, 19])
+
+    def test_param_queryset_matches_filter_in_python(self):
+        query_params = {'filter[int_field][lt]': '4'}
+        results = self.view.param_queryset(query_params, self.records)
+        assert_equal([each.int_field for each in results], [0, 1, 2, 3])
+
+
 class TestODMOrderingFilter(ApiTestCase):
     class query:
         title = ' '
@@ -6,6 +6,7 @@ import mock
 from nose.tools import *  # flake8: noqa
 import re
 
+from framework.mongo import database
 from tests.base import ApiTestCase, DbTestCase
 from tests import factories
 from tests.utils import make_drf_request
@@ -216,6 +217,45 @@ class TestApiBaseSerializers(ApiTestCase):
         assert_equal(res.status_code, http.BAD_REQUEST)
         assert_equal(res.json['errors'][0]['detail'], "Acceptable values for the related_counts query param are 'true', 'false', or any of the relationship fields; got 'title'")
 
+    def test_related_counts_on_list_match_detail(self):
+        child = self.node.nodes[0]
+        factories.ProjectFactory(is_public=True, parent=child)
+        factories.ProjectFactory(is_public=False, parent=child)
+        factories.ProjectFactory(is_public=True, parent=child, is_deleted=True)
+        url = '/{}nodes/{}/children/'.format(API_BASE, self.node._id)
+
+        res = self.app.get(url, params={'related_counts': 'children'})
+        counts = {
+            each['id']: each['relationships']['children']['links']['related']['meta']['count']
+            for each in res.json['data']
+        }
+        assert_equal(counts[child._id], 1)
+        for node_id, count in counts.items():
+            detail = self.app.get('/{}nodes/{}/'.format(API_BASE, node_id), params={'related_counts': 'children'})
+            assert_equal(detail.json['data']['relationships']['children']['links']['related']['meta']['count'], count)
+
+    def test_related_counts_follow_nodes_list(self):
+        child = self.node.nodes[0]
+        moved = factories.ProjectFactory(is_public=True, parent=child)
+        # A component whose parent_node is stale is still listed by its parent
+        database['node'].update({'_id': moved._id}, {'$set': {'parent_node': None}})
+        url = '/{}nodes/{}/children/'.format(API_BASE, self.node._id)
+
+        res = self.app.get(url, params={'related_counts': 'children'})
+        counts = {
+            each['id']: each['relationships']['children']['links']['related']['meta']['count']
+            for each in res.json['data']
+        }
+        assert_equal(counts[child._id], 1)
+
+    def test_related_counts_computed_once_per_page(self):
+        url = '/{}nodes/{}/children/'.format(API_BASE, self.node._id)
+        with mock.patch.object(NodeSerializer, 'get_node_counts', autospec=True, return_value={}) as mock_counts:
+            res = self.app.get(url, params={'related_counts': 'children'})
+        assert_equal(len(res.json['data']), 5)
+        assert_equal(mock_counts.call_count, 1)
+        assert_equal(len(mock_counts.call_args[0][1]), 5)
+
 
 
 class TestRelationshipField(DbTestCase):
@@ -96,6 +96,27 @@ class TestNodeChildrenList(ApiTestCase):
         assert_not_in(child_project._id, ids)
         assert_equal(1, len(ids))
 
+    def test_node_children_cursor_pagination_after_deleted_item(self):
+        children = [self.public_component] + [
+            NodeFactory(parent=self.public_project, creator=self.user, is_public=True)
+            for _ in range(3)
+        ]
+        url = '{}?page[cursor]=&page[size]=2'.format(self.public_project_url)
+        res = self.app.get(url, auth=self.user.auth)
+        ids = [node['id'] for node in res.json['data']]
+        assert_equal(len(ids), 2)
+
+        # The item the cursor points at is deleted before the next page is read
+        last = Node.load(ids[-1])
+        last.is_deleted = True
+        last.save()
+
+        res = self.app.get(res.json['links']['next'], auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        next_ids = [node['id'] for node in res.json['data']]
+        assert_equal(set(ids + next_ids), {child._id for child in children})
+        assert_is_none(res.json['links']['next'])
+
     def test_node_children_list_does_not_include_node_links(self):
         pointed_to = ProjectFactory(is_public=True)
 
@@ -209,6 +209,35 @@ class TestNodeContributorFiltering(ApiTestCase):
         assert_equal(len(res.json['data']), 1)
         assert_false(res.json['data'][0]['attributes'].get('bibliographic', None))
 
+    def test_filtering_id_field_keeps_contributor_order(self):
+        contribs = [UserFactory() for _ in range(3)]
+        for contrib in contribs:
+            self.project.add_contributor(contrib)
+        self.project.save()
+
+        url = '/{}nodes/{}/contributors/?filter[id]={},{}'.format(
+            API_BASE, self.project._id, contribs[2]._id, contribs[0]._id
+        )
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(
+            [each['id'] for each in res.json['data']],
+            [contribs[0]._id, contribs[2]._id]
+        )
+
+    def test_filtering_id_and_bibliographic_fields(self):
+        non_bibliographic_contrib = UserFactory()
+        self.project.add_contributor(non_bibliographic_contrib, visible=False)
+        self.project.save()
+
+        url = '/{}nodes/{}/contributors/?filter[id]={},{}&filter[bibliographic]=False'.format(
+            API_BASE, self.project._id, self.user._id, non_bibliographic_contrib._id
+        )
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(len(res.json['data']), 1)
+        assert_equal(res.json['data'][0]['id'], non_bibliographic_contrib._id)
+
     def test_filtering_on_invalid_field(self):
         url = '/{}nodes/{}/contributors/?filter[invalid]=foo'.format(API_BASE, self.project._id)
         res = self.app.get(url, auth=self.user.auth, expect_errors=True)
@@ -1,6 +1,8 @@
 from nose.tools import *  # flake8: noqa
 import functools
 
+from modularodm.storedobject import ContextLogger
+
 from framework.auth.core import Auth
 
 from api.base.settings.defaults import API_BASE
@@ -86,3 +88,23 @@ class TestNodeEmbeds(ApiTestCase):
         assert_equal(res.status_code, 400)
         assert_equal(res.json['errors'][0]['detail'], "The following fields are not embeddable: title")
 
+
+    def test_embed_list_matches_detail(self):
+        url = '/{0}nodes/{1}/children/?embed=contributors&embed=parent'.format(API_BASE, self.root_node._id)
+
+        res = self.app.get(url, auth=self.user.auth)
+        children = {child['id']: child for child in res.json['data']}
+        assert_equal(set(children), {self.child1._id, self.child2._id})
+        for child_id, child in children.items():
+            detail_url = '/{0}nodes/{1}/?embed=contributors&embed=parent'.format(API_BASE, child_id)
+            detail = self.app.get(detail_url, auth=self.user.auth).json['data']
+            assert_equal(child['embeds'], detail['embeds'])
+            assert_equal(child['embeds']['parent']['data']['id'], self.root_node._id)
+
+    def test_embed_list_loads_contributors_in_one_query(self):
+        url = '/{0}nodes/{1}/children/?embed=contributors'.format(API_BASE, self.root_node._id)
+
+        with ContextLogger() as context:
+            self.app.get(url, auth=self.user.auth)
+            report = context.report()
+        assert_not_in(('user', 'get'), report)
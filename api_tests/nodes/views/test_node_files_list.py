@@ -4,10 +4,15 @@ import json
 import httpretty
 from nose.tools import *  # flake8: noqa
 
+from modularodm import Q
+
 from framework.auth.core import Auth
 
+from website.addons.base.views import invalidate_waterbutler_metadata
 from website.addons.github.tests.factories import GitHubAccountFactory
+from website.files.models import StoredFileNode
 from website.models import Node
+from website.util import waterbutler
 from website.util import waterbutler_api_url_for
 from api.base.settings.defaults import API_BASE
 from api_tests import utils as api_utils
@@ -82,6 +87,7 @@ class TestNodeFilesList(ApiTestCase):
 
     def setUp(self):
         super(TestNodeFilesList, self).setUp()
+        waterbutler.METADATA_CACHE.clear()
         self.user = AuthUserFactory()
         self.project = ProjectFactory(creator=self.user)
         self.private_url = '/{}nodes/{}/files/'.format(API_BASE, self.project._id)
@@ -288,11 +294,47 @@ class TestNodeFilesList(ApiTestCase):
         assert_equal(res.status_code, 200)
         assert 'relationships' in res.json['data'][0]
 
+    def test_waterbutler_metadata_is_cached(self):
+        self._prepare_mock_wb_response(provider='github', files=[{'name': 'First'}])
+        self.add_github()
+        url = '/{}nodes/{}/files/github/'.format(API_BASE, self.project._id)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['data'][0]['attributes']['name'], 'First')
+
+        self._prepare_mock_wb_response(provider='github', files=[{'name': 'Second'}])
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['data'][0]['attributes']['name'], 'First')
+
+    def test_waterbutler_metadata_cache_is_invalidated_by_file_changes(self):
+        self._prepare_mock_wb_response(provider='github', files=[{'name': 'First'}])
+        self.add_github()
+        url = '/{}nodes/{}/files/github/'.format(API_BASE, self.project._id)
+        self.app.get(url, auth=self.user.auth)
+
+        self._prepare_mock_wb_response(provider='github', files=[{'name': 'Second'}])
+        invalidate_waterbutler_metadata(
+            None, node=self.project, user=self.user, event_type='file_added', payload={'provider': 'github'}
+        )
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['data'][0]['attributes']['name'], 'Second')
+
+    def test_waterbutler_metadata_is_cached_per_user(self):
+        self._prepare_mock_wb_response(provider='github', files=[{'name': 'First'}])
+        self.add_github()
+        url = '/{}nodes/{}/files/github/'.format(API_BASE, self.project._id)
+        self.app.get(url, auth=self.user.auth)
+
+        self._prepare_mock_wb_response(provider='github', files=[{'name': 'Second'}])
+        self.project.add_contributor(self.user_two, auth=Auth(self.user), save=True)
+        res = self.app.get(url, auth=self.user_two.auth)
+        assert_equal(res.json['data'][0]['attributes']['name'], 'Second')
+
 
 class TestNodeFilesListFiltering(ApiTestCase):
 
     def setUp(self):
         super(TestNodeFilesListFiltering, self).setUp()
+        waterbutler.METADATA_CACHE.clear()
         self.user = AuthUserFactory()
         self.project = ProjectFactory(creator=self.user)
         httpretty.enable()
@@ -383,6 +425,7 @@ class TestNodeFilesListFiltering(ApiTestCase):
 class TestNodeFilesListPagination(ApiTestCase):
     def setUp(self):
         super(TestNodeFilesListPagination, self).setUp()
+        waterbutler.METADATA_CACHE.clear()
         self.user = AuthUserFactory()
         self.project = ProjectFactory(creator=self.user)
         httpretty.enable()
@@ -450,4 +493,19 @@ class TestNodeFilesListPagination(ApiTestCase):
         res = self.app.get(url, auth=self.user.auth)
         self.check_file_order(res)
 
-
+    def test_only_files_on_requested_page_are_retrieved(self):
+        prepare_mock_wb_response(
+            node=self.project,
+            provider='github',
+            files=[
+                {'name': '{:02d}'.format(i), 'path': '/{:02d}'.format(i), 'materialized': '/{:02d}'.format(i)}
+                for i in range(1, 16)
+            ]
+        )
+        self.add_github()
+        url = '/{}nodes/{}/files/github/?page=2'.format(API_BASE, self.project._id)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['links']['meta']['total'], 15)
+        assert_equal([each['attributes']['name'] for each in res.json['data']], ['11', '12', '13', '14', '15'])
+        stored = StoredFileNode.find(Q('node', 'eq', self.project) & Q('provider', 'eq', 'github'))
+        assert_equal(stored.count(), 5)
@@ -1818,3 +1818,29 @@ class TestNodeListPagination(ApiTestCase):
             assert_in(user._id, uids)
         assert_not_in(self.users[10]._id, uids)
         assert_equal(res.json['data'][0]['embeds']['contributors']['links']['meta']['per_page'], 10)
+
+    def test_cursor_pagination_walks_all_pages(self):
+        url = '{}?page[cursor]=&page[size]=4'.format(self.url)
+        pids = []
+        pages = 0
+        while url:
+            res = self.app.get(url, auth=Auth(self.users[0]))
+            pids.extend(e['id'] for e in res.json['data'])
+            assert_not_in('total', res.json['links']['meta'])
+            assert_equal(res.json['links']['meta']['per_page'], 4)
+            assert_is_none(res.json['links']['prev'])
+            url = res.json['links']['next']
+            pages += 1
+        assert_equal(pages, 3)
+        assert_equal(len(pids), len(self.projects))
+        assert_equal(set(pids), {project._id for project in self.projects})
+
+    def test_cursor_pagination_total_on_request(self):
+        url = '{}?page[cursor]=&page[total]=true'.format(self.url)
+        res = self.app.get(url, auth=Auth(self.users[0]))
+        assert_equal(res.json['links']['meta']['total'], 11)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        url = '{}?page[cursor]=notacursor'.format(self.url)
+        res = self.app.get(url, auth=Auth(self.users[0]), expect_errors=True)
+        assert_equal(res.status_code, 400)
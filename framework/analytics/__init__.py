@@ -1,15 +1,27 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import time
+import atexit
+import logging
 import functools
+import threading
 from datetime import datetime
 
+from bson.binary import Binary
+from pymongo.errors import DuplicateKeyError
+
+from framework.analytics.hyperloglog import HyperLogLog
 from framework.mongo import database
 from framework.postcommit_tasks.handlers import run_postcommit
 from framework.sessions import session
 
 from flask import request
 
+from website import settings
+
+logger = logging.getLogger(__name__)
+
 
 collection = database['pagecounters']
 
@@ -72,50 +84,197 @@ def build_page(rex, kwargs):
     except KeyError:
         return None
 
-@run_postcommit(once_per_request=False)
-def update_counter(page, db=None):
-    """Update counters for page.
+class PendingCounts(object):
+    """Page views of a single page that have not been written yet.
+    """
 
-    :param str page: Colon-delimited page key in analytics collection
-    :param db: MongoDB database or `None`
+    def __init__(self, precision):
+        self.precision = precision
+        self.total = 0
+        # date => views
+        self.dates = {}
+        self.visitors = None
+        # date => sketch of that day's visitors
+        self.date_visitors = {}
+
+    def add(self, date, visitor_id=None):
+        self.total += 1
+        self.dates[date] = self.dates.get(date, 0) + 1
+        if visitor_id is None:
+            return
+        if self.visitors is None:
+            self.visitors = HyperLogLog(self.precision)
+        self.visitors.add(visitor_id)
+        if date not in self.date_visitors:
+            self.date_visitors[date] = HyperLogLog(self.precision)
+        self.date_visitors[date].add(visitor_id)
+
+
+class CounterBuffer(object):
+    """Write-behind buffer for `pagecounters`. Views are merged per page in
+    memory and written in one batch once ``flush_interval`` seconds have passed
+    or ``max_pages`` pages are pending.
+
+    Unique visitors are tracked with HyperLogLog sketches stored in
+    `pagecountersketches`: one over all time and one for each recent day per
+    page. The `unique` counters in `pagecounters` hold the sketches' estimates.
+
+    Buffered views are flushed when the process exits normally. Views still
+    buffered when a worker is killed (e.g. SIGKILL or the OOM killer) are lost,
+    since ``atexit`` handlers do not run then.
     """
-    db = db or database
-    collection = db['pagecounters']
 
-    date = datetime.utcnow()
-    date = date.strftime('%Y/%m/%d')
+    def __init__(self, flush_interval=None, max_pages=None, precision=None):
+        self.flush_interval = flush_interval if flush_interval is not None else settings.ANALYTICS_FLUSH_INTERVAL
+        self.max_pages = max_pages or settings.ANALYTICS_BUFFER_MAX_PAGES
+        self.precision = precision or settings.ANALYTICS_SKETCH_PRECISION
+        self.pending = {}
+        self.last_flush = time.time()
+        self._lock = threading.Lock()
 
-    page = clean_page(page)
+    def add(self, page, date, visitor_id=None):
+        """Record a view of ``page``. Returns whether a flush is due.
+        """
+        with self._lock:
+            counts = self.pending.get(page)
+            if counts is None:
+                counts = self.pending[page] = PendingCounts(self.precision)
+            counts.add(date, visitor_id)
+            return (
+                len(self.pending) >= self.max_pages or
+                time.time() - self.last_flush >= self.flush_interval
+            )
 
-    d = {'$inc': {}}
+    def flush(self, db=None):
+        with self._lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.time()
+        if pending:
+            write_counts(db or database, pending)
 
-    visited_by_date = session.data.get('visited_by_date')
-    if not visited_by_date:
-        visited_by_date = {'date': date, 'pages': []}
+    def flush_on_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Could not flush page counters')
 
-    if date == visited_by_date['date']:
-        if page not in visited_by_date['pages']:
-            d['$inc']['date.%s.unique' % date] = 1
-            visited_by_date['pages'].append(page)
-            session.data['visited_by_date'] = visited_by_date
-    else:
-        visited_by_date['date'] = date
-        visited_by_date['pages'] = []
-        d['$inc']['date.%s.unique' % date] = 1
-        visited_by_date['pages'].append(page)
-        session.data['visited_by_date'] = visited_by_date
 
-    d['$inc']['date.%s.total' % date] = 1
+counter_buffer = CounterBuffer()
+atexit.register(counter_buffer.flush_on_exit)
+
 
-    visited = session.data.get('visited')  # '/project/x/, project/y/'
-    if not visited:
-        visited = []
-    if page not in visited:
-        d['$inc']['unique'] = 1
-        visited.append(page)
-        session.data['visited'] = visited
-    d['$inc']['total'] = 1
-    collection.update({'_id': page}, d, True, False)
+def write_counts(db, pending):
+    """Write buffered views to `pagecounters` and merge buffered visitors into
+    the stored sketches.
+
+    :param db: MongoDB database
+    :param dict pending: Mapping of page keys to `PendingCounts`
+    """
+    counters = db['pagecounters']
+    for page, counts in pending.items():
+        inc = {'total': counts.total}
+        for date, total in counts.dates.items():
+            inc['date.{0}.total'.format(date)] = total
+        counters.update({'_id': page}, {'$inc': inc}, upsert=True, manipulate=False)
+
+    pages = [page for page, counts in pending.items() if counts.visitors is not None]
+    if not pages:
+        return
+    stored = {
+        sketch['_id']: sketch
+        for sketch in db['pagecountersketches'].find({'_id': {'$in': pages}})
+    }
+    for page in pages:
+        merge_visitors(db, page, pending[page], stored.get(page))
+
+
+def merge_visitors(db, page, counts, sketch, retries=5):
+    """Merge the visitors in ``counts`` into the stored sketches of ``page`` and
+    update its unique counters. Concurrent writers are detected through the
+    sketch's version, in which case the merge is retried.
+
+    Views buffered across midnight are merged into the sketch of the day they
+    were made, so each day's `unique` counter is always set from a sketch of
+    all visitors seen that day. Only the ``ANALYTICS_SKETCH_DAYS`` most recent
+    days keep their sketch; a day whose sketch was dropped starts over from its
+    stored count.
+    """
+    counters = db['pagecounters']
+    sketches = db['pagecountersketches']
+
+    for _ in range(retries):
+        if sketch is None:
+            sketch = sketches.find_one({'_id': page})
+        if sketch is None:
+            sketch = {'_id': page, 'version': 0, 'baseline': None, 'visitors': None, 'days': {}}
+        days = dict(sketch.get('days') or {})
+
+        existing = {}
+        if sketch['baseline'] is None or any(date not in days for date in counts.date_visitors):
+            # Uniques counted before the sketch was created carry over
+            existing = counters.find_one({'_id': page}, {'unique': 1, 'date': 1}) or {}
+        baseline = sketch['baseline']
+        if baseline is None:
+            baseline = existing.get('unique', 0)
+
+        visitors = HyperLogLog(counts.precision, sketch['visitors'])
+        visitors.update(counts.visitors)
+        unique = {'unique': baseline + visitors.cardinality()}
+        for date, visitors_on_date in counts.date_visitors.items():
+            day = days.get(date)
+            if day is None:
+                day = {
+                    'baseline': existing.get('date', {}).get(date, {}).get('unique', 0),
+                    'visitors': None,
+                }
+            merged = HyperLogLog(counts.precision, day['visitors'])
+            merged.update(visitors_on_date)
+            days[date] = {'baseline': day['baseline'], 'visitors': Binary(merged.to_bytes())}
+            unique['date.{0}.unique'.format(date)] = day['baseline'] + merged.cardinality()
+        kept = set(sorted(days)[-settings.ANALYTICS_SKETCH_DAYS:]) | set(counts.date_visitors)
+
+        version = sketch['version']
+        updated = dict(
+            sketch,
+            version=version + 1,
+            baseline=baseline,
+            visitors=Binary(visitors.to_bytes()),
+            days={date: day for date, day in days.items() if date in kept},
+        )
+        sketch = None
+        if version == 0:
+            try:
+                sketches.insert(updated)
+            except DuplicateKeyError:
+                continue
+        elif not sketches.update({'_id': page, 'version': version}, updated)['n']:
+            continue
+
+        counters.update({'_id': page}, {'$set': unique}, manipulate=False)
+        return
+    logger.error('Could not merge unique visitors of {0} after {1} attempts'.format(page, retries))
+
+
+def get_visitor_id():
+    """Identify the current visitor by their session, if there is one."""
+    try:
+        return session._id
+    except (AttributeError, RuntimeError):
+        return None
+
+
+@run_postcommit(once_per_request=False)
+def update_counter(page, db=None):
+    """Update counters for page.
+
+    Views are buffered in memory and written periodically; see `CounterBuffer`.
+
+    :param str page: Colon-delimited page key in analytics collection
+    :param db: MongoDB database or `None`
+    """
+    date = datetime.utcnow().strftime('%Y/%m/%d')
+    if counter_buffer.add(clean_page(page), date, get_visitor_id()):
+        counter_buffer.flush(db)
 
 
 def update_counters(rex, db=None):
@@ -155,3 +314,16 @@ def get_basic_counters(page, db=None):
         return unique, total
     else:
         return None, None
+
+
+def get_total_counters(pages, db=None):
+    """Look up the total counts of several pages at once.
+
+    :return: dict mapping each page to its total, 0 for pages without views
+    """
+    db = db or database
+    keys = {clean_page(page): page for page in pages}
+    totals = {page: 0 for page in pages}
+    for result in db['pagecounters'].find({'_id': {'$in': list(keys)}}, {'total': 1}):
+        totals[keys[result['_id']]] = result.get('total', 0)
+    return totals
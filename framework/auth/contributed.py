@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Per-process cache of the IDs of the nodes each user contributes to.
+
+Contributor search shows how many projects every hit has in common with the
+current user, which needs both users' contributed node IDs. They are kept
+here as frozensets and loaded for many users with one query. An entry is
+dropped when a node save adds or removes the user as a contributor; changes
+made by other processes are only picked up once the entry expires after
+``settings.CONTRIBUTED_NODES_CACHE_TTL`` seconds.
+"""
+
+from modularodm import signals
+
+from framework.mongo import database
+from framework.mongo.object_cache import TTLCache
+from website import settings
+
+
+# Contributed node IDs keyed by user ID
+CONTRIBUTED_NODES_CACHE = TTLCache(
+    ttl=settings.CONTRIBUTED_NODES_CACHE_TTL,
+    max_entries=settings.CONTRIBUTED_NODES_CACHE_MAX_ENTRIES,
+)
+
+
+def get_contributed_node_ids(user_ids):
+    """Return the IDs of the nodes each of ``user_ids`` contributes to, reading
+    the users that are not cached with a single query.
+
+    :param list user_ids: User primary keys
+    :return dict: Mapping of user ID to a frozenset of node IDs
+    """
+    ret = {}
+    missing = set()
+    for user_id in user_ids:
+        node_ids = CONTRIBUTED_NODES_CACHE.get(user_id)
+        if node_ids is None:
+            missing.add(user_id)
+        else:
+            ret[user_id] = node_ids
+    if missing:
+        loaded = {user_id: set() for user_id in missing}
+        records = database['node'].find(
+            {'contributors': {'$in': list(missing)}},
+            {'contributors': True},
+        )
+        for record in records:
+            for user_id in missing.intersection(record['contributors']):
+                loaded[user_id].add(record['_id'])
+        for user_id, node_ids in loaded.items():
+            ret[user_id] = frozenset(node_ids)
+            CONTRIBUTED_NODES_CACHE.set(user_id, ret[user_id])
+    return ret
+
+
+@signals.save.connect
+def invalidate_contributors(sender, instance, fields_changed, cached_data):
+    if sender._name != 'node' or 'contributors' not in (fields_changed or ()):
+        return
+    before = set((cached_data or {}).get('contributors') or [])
+    after = set(instance.contributors._to_primary_keys())
+    for user_id in before.symmetric_difference(after):
+        CONTRIBUTED_NODES_CACHE.delete(user_id)
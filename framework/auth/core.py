@@ -18,6 +18,7 @@ import framework
 from framework.addons import AddonModelMixin
 from framework import analytics
 from framework.auth import signals, utils
+from framework.auth.contributed import get_contributed_node_ids
 from framework.auth.exceptions import (ChangePasswordError, ExpiredTokenError, InvalidTokenError,
                                        MergeConfirmedRequiredError, MergeConflictError)
 from framework.bcrypt import generate_password_hash, check_password_hash
@@ -1400,7 +1401,21 @@ class User(GuidStoredObject, AddonModelMixin):
 
     def n_projects_in_common(self, other_user):
         """Returns number of "shared projects" (projects that both users are contributors for)"""
-        return len(self.get_projects_in_common(other_user, primary_keys=True))
+        return self.get_n_projects_in_common([other_user])[other_user._id]
+
+    def get_n_projects_in_common(self, other_users):
+        """Returns the number of "shared projects" with each of ``other_users``, reading
+        the contributed node IDs of all users not already cached with one query.
+
+        :param list other_users: User objects
+        :return dict: Mapping of user ID to number of shared projects
+        """
+        node_ids = get_contributed_node_ids([self._id] + [user._id for user in other_users])
+        own_node_ids = node_ids[self._id]
+        return {
+            user._id: len(own_node_ids.intersection(node_ids[user._id]))
+            for user in other_users
+        }
 
     def is_affiliated_with_institution(self, inst):
         return inst in self.affiliated_institutions
@@ -3,12 +3,14 @@
 imported by Celery and is not used elsewhere in the application.
 """
 
-from celery import signals
+from celery import signals, states
 from modularodm import storage
 
 from framework.mongo import set_up_storage, StoredObject
+from framework.mongo.handlers import CLIENT_POOL, release_current_client
+from framework.postcommit_tasks.handlers import postcommit_before_request, run_postcommit_tasks
 
-from website import models
+from website import models, settings
 
 
 @signals.task_prerun.connect
@@ -19,8 +21,37 @@ def clear_caches(*args, **kwargs):
     StoredObject._clear_caches()
 
 
+@signals.task_prerun.connect
+def clear_postcommit_queue(*args, **kwargs):
+    """Start each task with an empty post-commit queue.
+    """
+    postcommit_before_request()
+
+
+@signals.task_postrun.connect
+def run_postcommit_queue(*args, **kwargs):
+    """Run post-commit tasks queued by a task once it has succeeded.
+    """
+    if kwargs.get('state') == states.SUCCESS:
+        run_postcommit_tasks()
+    else:
+        postcommit_before_request()
+
+
+@signals.task_postrun.connect
+def release_client(*args, **kwargs):
+    """Return the task's database client to the pool.
+    """
+    release_current_client()
+
+
 @signals.worker_process_init.connect
 def attach_models(*args, **kwargs):
-    """Attach models to database collections on worker initialization.
+    """Size the client pool for a worker process and attach models to database
+    collections on worker initialization.
     """
+    CLIENT_POOL.configure(
+        max_clients=settings.CELERY_DB_POOL_MAX_CLIENTS,
+        sockets_per_client=settings.CELERY_DB_POOL_SOCKETS_PER_CLIENT,
+    )
     set_up_storage(models.MODELS, storage.MongoStorage)
@@ -6,6 +6,7 @@ from modularodm.ext.concurrency import with_proxies, proxied_members
 
 from bson import ObjectId
 from .handlers import client, database, set_up_storage
+from .object_cache import OBJECT_CACHE
 
 
 from api.base.api_globals import api_globals
@@ -33,12 +34,57 @@ def get_cache_key():
 
 @with_proxies(proxied_members, get_cache_key)
 class StoredObject(GenericStoredObject):
-    pass
+
+    @classmethod
+    def load(cls, key=None, data=None, _is_loaded=True):
+        """Get a record by its primary key, consulting the cross-request
+        `OBJECT_CACHE` when the record is not in the request's identity map.
+        """
+        if key is not None and data is None and OBJECT_CACHE.is_cached_schema(cls):
+            key = cls._check_pk_type(key)
+            if cls._load_from_cache(key) is None:
+                data = cls._load_storage_data(key)
+                if data is None:
+                    return None
+        return super(StoredObject, cls).load(key=key, data=data, _is_loaded=_is_loaded)
+
+    @classmethod
+    def _load_storage_data(cls, key):
+        storage_key = cls._pk_to_storage(key)
+        data = OBJECT_CACHE.get(cls, storage_key)
+        if data is None:
+            data = cls._storage[0].get(cls._primary_name, storage_key)
+            if data is not None:
+                OBJECT_CACHE.set(cls, storage_key, data)
+        return data
+
+    @classmethod
+    def update_one(cls, which, data=None, storage_data=None, saved=False, inmem=False):
+        obj = cls._which_to_obj(which)
+        super(StoredObject, cls).update_one(obj, data=data, storage_data=storage_data, saved=saved, inmem=inmem)
+        # Saves are invalidated by the save signal
+        if not saved and OBJECT_CACHE.is_cached_schema(cls):
+            OBJECT_CACHE.invalidate(cls, obj._storage_key)
+
+    @classmethod
+    def update(cls, query, data=None, storage_data=None):
+        keys = cls.find(query).get_keys() if OBJECT_CACHE.is_cached_schema(cls) else []
+        super(StoredObject, cls).update(query, data=data, storage_data=storage_data)
+        for key in keys:
+            OBJECT_CACHE.invalidate(cls, cls._pk_to_storage(key))
+
+    @classmethod
+    def remove_one(cls, which, rm=True):
+        obj = cls._which_to_obj(which)
+        super(StoredObject, cls).remove_one(obj, rm=rm)
+        if OBJECT_CACHE.is_cached_schema(cls):
+            OBJECT_CACHE.invalidate(cls, obj._storage_key)
 
 
 __all__ = [
     'StoredObject',
     'ObjectId',
+    'OBJECT_CACHE',
     'client',
     'database',
     'set_up_storage',
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import time
+import thread
 import logging
 import threading
+import collections
 
 import pymongo
+from pymongo.errors import ConnectionFailure
 from werkzeug.local import LocalProxy
 
 from website import settings
@@ -12,45 +16,272 @@ from website import settings
 logger = logging.getLogger(__name__)
 
 
+class PooledClient(object):
+    """Book-keeping for a single ``pymongo.MongoClient`` shared by the pool.
+    """
+
+    def __init__(self, client, now):
+        self.client = client
+        self.leases = 0
+        self.created = now
+        self.last_used = now
+        self.last_checked = now
+        # Being pinged by the caller holding its only lease; not handed out meanwhile
+        self.checking = False
+
+
+class PoolMetrics(object):
+    """Counters describing a `ClientPool`. Wait times are bucketed by upper
+    bound in seconds.
+    """
+
+    WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, float('inf'))
+
+    def __init__(self):
+        self.created = 0
+        self.evicted = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_time_histogram = collections.OrderedDict(
+            (bucket, 0) for bucket in self.WAIT_TIME_BUCKETS
+        )
+
+    def observe_wait(self, seconds):
+        for bucket in self.WAIT_TIME_BUCKETS:
+            if seconds <= bucket:
+                self.wait_time_histogram[bucket] += 1
+                return
+
+
 class ClientPool(object):
+    """Bounded pool of MongoDB clients shared between threads and greenlets.
+
+    Each caller (keyed by thread or greenlet id) holds a lease on a client
+    until it calls `release`. A client serves up to ``sockets_per_client``
+    leases at once, matching the size of its own socket pool, so a handful of
+    clients cover a whole web process. When every client is saturated and
+    ``max_clients`` have been created, callers wait up to ``acquire_timeout``
+    seconds for a lease to be returned.
+
+    Idle clients are closed after ``idle_timeout`` seconds (keeping
+    ``min_clients`` around), and clients that have not been used for
+    ``health_check_interval`` seconds are pinged before being handed out.
+    """
+
+    OPTIONS = (
+        'max_clients',
+        'min_clients',
+        'sockets_per_client',
+        'acquire_timeout',
+        'idle_timeout',
+        'health_check_interval',
+    )
 
     class ExtraneousReleaseError(Exception):
         message = 'no cached connection to release'
 
+    class PoolExhaustedError(Exception):
+        message = 'timed out waiting for a database client'
+
     @property
     def thread_id(self):
-        return threading.current_thread().ident
+        # Patched by gevent to return the id of the current greenlet
+        return thread.get_ident()
+
+    def __init__(self, max_clients=None, min_clients=None, sockets_per_client=None,
+                 acquire_timeout=None, idle_timeout=None, health_check_interval=None,
+                 client_factory=None):
+        self.max_clients = max_clients or settings.DB_POOL_MAX_CLIENTS
+        self.min_clients = settings.DB_POOL_MIN_CLIENTS if min_clients is None else min_clients
+        self.sockets_per_client = sockets_per_client or settings.DB_POOL_SOCKETS_PER_CLIENT
+        self.acquire_timeout = acquire_timeout or settings.DB_POOL_ACQUIRE_TIMEOUT
+        self.idle_timeout = idle_timeout or settings.DB_POOL_IDLE_TIMEOUT
+        self.health_check_interval = health_check_interval or settings.DB_POOL_HEALTH_CHECK_INTERVAL
+        self._client_factory = client_factory or self._create_client
+
+        self._clients, self._local = [], {}
+        self._cond = threading.Condition()
+        self._acquire_hooks, self._release_hooks = [], []
+        self.metrics = PoolMetrics()
+
+    def configure(self, **options):
+        """Resize the pool in place, e.g. when a Celery worker process starts.
+        Surplus idle clients are closed on the next release.
+        """
+        for key in options:
+            if key not in self.OPTIONS:
+                raise TypeError('Unknown pool option {!r}'.format(key))
+        with self._cond:
+            for key, value in options.items():
+                setattr(self, key, value)
+            self._cond.notify_all()
+
+    def on_acquire(self, func):
+        """Register ``func(client, _id)`` to be called whenever a lease is
+        handed out. May be used as a decorator.
+        """
+        self._acquire_hooks.append(func)
+        return func
+
+    def on_release(self, func):
+        """Register ``func(client, _id)`` to be called whenever a lease is
+        returned. May be used as a decorator.
+        """
+        self._release_hooks.append(func)
+        return func
 
-    def __init__(self, MAX_CLIENTS=100):
-        self._max_clients = MAX_CLIENTS
-        self._cache, self._local = [], {}
-        self._sem = threading.BoundedSemaphore(MAX_CLIENTS)
+    @property
+    def in_use(self):
+        return sum(pooled.leases for pooled in self._clients)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'clients': len(self._clients),
+                'in_use': self.in_use,
+                'waiting': self.metrics.waiting,
+                'created': self.metrics.created,
+                'evicted': self.metrics.evicted,
+                'discarded': self.metrics.discarded,
+                'timeouts': self.metrics.timeouts,
+                'wait_time_histogram': dict(self.metrics.wait_time_histogram),
+            }
 
     def acquire(self, _id=None):
         _id = _id or self.thread_id
 
         if _id not in self._local:
-            self._sem.acquire()
-            self._local[_id] = self._get_client()
-        return self._local[_id]
+            pooled = self._checkout()
+            self._local[_id] = pooled
+            for hook in self._acquire_hooks:
+                hook(pooled.client, _id)
+        return self._local[_id].client
 
     def release(self, _id=None):
+        _id = _id or self.thread_id
         try:
-            self._cache.append(self._local.pop(_id or self.thread_id))
-            self._sem.release()
+            pooled = self._local.pop(_id)
         except KeyError:
             raise ClientPool.ExtraneousReleaseError
+        for hook in self._release_hooks:
+            hook(pooled.client, _id)
+        with self._cond:
+            pooled.leases -= 1
+            pooled.last_used = time.time()
+            self._evict_idle()
+            self._cond.notify()
 
     def transfer(self, to, from_):
         self._local[to] = self._local.pop(from_ or self.thread_id)
 
-    def _get_client(self):
+    def evict_idle(self):
+        with self._cond:
+            self._evict_idle()
+
+    def _checkout(self):
+        start = time.time()
+        deadline = start + self.acquire_timeout
+        while True:
+            with self._cond:
+                pooled = self._select()
+                while pooled is None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.metrics.timeouts += 1
+                        raise ClientPool.PoolExhaustedError
+                    self.metrics.waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self.metrics.waiting -= 1
+                    pooled = self._select()
+                pooled.leases += 1
+                now = time.time()
+                pooled.last_used = now
+                needs_check = (
+                    pooled.leases == 1 and
+                    now - pooled.last_checked >= self.health_check_interval
+                )
+                if not needs_check:
+                    self.metrics.observe_wait(now - start)
+                    return pooled
+                pooled.checking = True
+            # Ping outside of the lock so other callers are not held up
+            try:
+                alive = self._is_alive(pooled)
+            except Exception:
+                with self._cond:
+                    pooled.checking = False
+                    pooled.leases -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                pooled.checking = False
+                if alive:
+                    pooled.last_checked = time.time()
+                    self.metrics.observe_wait(pooled.last_checked - start)
+                    self._cond.notify_all()
+                    return pooled
+                self._discard(pooled)
+
+    def _select(self):
+        """Pick the busiest client that still has spare sockets so that load
+        concentrates on few clients and the rest can be evicted when idle.
+        Creates a new client if all are saturated and the pool is not full.
+        Must be called with the lock held.
+        """
+        available = [
+            pooled for pooled in self._clients
+            if pooled.leases < self.sockets_per_client and not pooled.checking
+        ]
+        if available:
+            return max(available, key=lambda pooled: pooled.leases)
+        if len(self._clients) < self.max_clients:
+            return self._create()
+        return None
+
+    def _create(self):
+        logger.info('Creating new client instance. {} instances initialized.'.format(len(self._clients) + 1))
+        pooled = PooledClient(self._client_factory(), time.time())
+        self._clients.append(pooled)
+        self.metrics.created += 1
+        return pooled
+
+    def _is_alive(self, pooled):
+        try:
+            pooled.client.admin.command('ping')
+        except ConnectionFailure:
+            logger.warning('Discarding unresponsive database client')
+            return False
+        return True
+
+    def _discard(self, pooled):
+        self._clients.remove(pooled)
+        self.metrics.discarded += 1
+        self._close(pooled)
+        self._cond.notify_all()
+
+    def _evict_idle(self):
+        now = time.time()
+        for pooled in list(self._clients):
+            if len(self._clients) <= self.min_clients:
+                break
+            if pooled.leases:
+                continue
+            if len(self._clients) > self.max_clients or now - pooled.last_used >= self.idle_timeout:
+                self._clients.remove(pooled)
+                self.metrics.evicted += 1
+                self._close(pooled)
+
+    def _close(self, pooled):
         try:
-            return self._cache.pop(0)
-        except IndexError:
-            pass
-        logger.warning('Creating new client instance. {} instances initialized.'.format(self._max_clients - self._sem._Semaphore__value))
-        client = pymongo.MongoClient(settings.DB_HOST, settings.DB_PORT, max_pool_size=1)
+            pooled.client.close()
+        except Exception:
+            logger.exception('Failed to close database client')
+
+    def _create_client(self):
+        client = pymongo.MongoClient(settings.DB_HOST, settings.DB_PORT, max_pool_size=self.sockets_per_client)
         db = client[settings.DB_NAME]
 
         if settings.DB_USER and settings.DB_PASS:
@@ -77,6 +308,17 @@ def connection_teardown_request(error=None):
             raise
 
 
+def release_current_client():
+    """Return the lease held by the current thread or greenlet, if any. Threads
+    and greenlets spawned to do part of a request's or task's work must call
+    this when they are done, as teardown only releases the caller's own lease.
+    """
+    try:
+        CLIENT_POOL.release()
+    except ClientPool.ExtraneousReleaseError:
+        pass
+
+
 handlers = {
     'before_request': connection_before_request,
     'teardown_request': connection_teardown_request,
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Second-level cache of raw storage documents for `StoredObject.load`.
+
+The modular-odm identity map only lives for a single request. This cache sits
+behind it and keeps the storage data of recently loaded records across
+requests, so hot records (popular nodes, users, guids) are not re-read from
+Mongo on every request. Only raw data is cached; every request still builds
+its own model instances from it.
+
+Caching is opt-in per schema through ``settings.OBJECT_CACHE_SCHEMAS``, which
+maps a schema's collection name to the number of seconds an entry may live.
+Entries are dropped whenever a record is saved, updated or removed through
+the ODM. Writes that bypass the ODM are only picked up once the entry expires.
+"""
+
+import copy
+import time
+import logging
+import threading
+import collections
+
+from modularodm import signals
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalSharedBackend(object):
+    """In-process stand-in for a shared cache tier (e.g. memcached or redis).
+    Any object providing ``get``, ``set`` and ``delete`` with these signatures
+    may be used instead.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return None
+            if expires < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class TTLCache(object):
+    """Bounded, thread-safe LRU cache whose entries expire after a while. The
+    building block of the process-local caches of the app.
+
+    :param int ttl: Seconds an entry may live unless given when it is set;
+        `None` keeps entries until they are evicted, 0 disables the cache
+    :param int max_entries: Maximum number of entries held; 0 disables the cache
+    """
+
+    def __init__(self, ttl=None, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the value cached for ``key``, or `None`."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or (entry[0] is not None and entry[0] < time.time()):
+                return None
+            # Re-insert to mark as most recently used
+            self._entries[key] = entry
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl == 0 or not self.max_entries:
+            return
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Generations(object):
+    """Generation numbers of groups of cache entries. Entries keyed by their
+    group's generation are all dropped at once by bumping it; with a shared
+    tier, every process sees the bump.
+
+    :param str prefix: Prefix of the generation keys in the shared tier
+    :param int ttl: Seconds a generation is kept in the shared tier; must
+        outlive the entries keyed by the previous one
+    :param int max_entries: Maximum number of groups tracked in process
+    :param shared: Optional shared tier, see `LocalSharedBackend`
+    :param callable on_reset: Called when the groups tracked in process are
+        forgotten, as their generations start over
+    """
+
+    def __init__(self, prefix, ttl, max_entries=1000, shared=None, on_reset=None):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.on_reset = on_reset
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _key(self, group):
+        return '{}:{}'.format(self.prefix, group)
+
+    def get(self, group):
+        if self.shared is not None:
+            return self.shared.get(self._key(group)) or 0
+        with self._lock:
+            return self._generations.get(group, 0)
+
+    def bump(self, group):
+        generation = self.get(group) + 1
+        with self._lock:
+            if len(self._generations) >= self.max_entries:
+                # Forget old generations rather than grow without bound
+                self._generations.clear()
+                if self.on_reset is not None:
+                    self.on_reset()
+            self._generations[group] = generation
+        if self.shared is not None:
+            self.shared.set(self._key(group), generation, self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._generations.clear()
+
+
+class ObjectCache(object):
+    """Bounded LRU cache of storage documents, optionally backed by a shared
+    tier.
+
+    :param dict schemas: Mapping of schema names to entry lifetimes in seconds;
+        schemas not listed are never cached
+    :param int max_entries: Maximum number of entries held in process
+    :param shared: Optional shared tier, see `LocalSharedBackend`
+    """
+
+    def __init__(self, schemas=None, max_entries=10000, shared=None):
+        self.schemas = dict(schemas or {})
+        self.shared = shared
+        self._entries = TTLCache(max_entries=max_entries)
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+
+    def is_cached_schema(self, schema):
+        return schema._name in self.schemas
+
+    def _key(self, schema, key):
+        return '{}:{}'.format(schema._name, key)
+
+    def get(self, schema, key):
+        """Return a copy of the cached storage data for ``key``, or `None`.
+        """
+        cache_key = self._key(schema, key)
+        data = self._entries.get(cache_key)
+        if data is None and self.shared is not None:
+            data = self.shared.get(cache_key)
+            if data is not None:
+                self._entries.set(cache_key, data, ttl=self.schemas[schema._name])
+        if data is None:
+            self.misses[schema._name] += 1
+            return None
+        self.hits[schema._name] += 1
+        return copy.deepcopy(data)
+
+    def set(self, schema, key, data):
+        cache_key = self._key(schema, key)
+        data = copy.deepcopy(data)
+        self._entries.set(cache_key, data, ttl=self.schemas[schema._name])
+        if self.shared is not None:
+            self.shared.set(cache_key, data, self.schemas[schema._name])
+
+    def invalidate(self, schema, key):
+        cache_key = self._key(schema, key)
+        self._entries.delete(cache_key)
+        if self.shared is not None:
+            self.shared.delete(cache_key)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            name: {
+                'hits': self.hits[name],
+                'misses': self.misses[name],
+            }
+            for name in self.schemas
+        }
+
+
+OBJECT_CACHE = ObjectCache(
+    schemas=settings.OBJECT_CACHE_SCHEMAS if settings.OBJECT_CACHE_ENABLED else {},
+    max_entries=settings.OBJECT_CACHE_MAX_ENTRIES,
+    shared=settings.OBJECT_CACHE_SHARED_BACKEND,
+)
+
+
+@signals.save.connect
+def invalidate_saved_object(sender, instance, fields_changed, cached_data):
+    if not OBJECT_CACHE.is_cached_schema(sender):
+        return
+    OBJECT_CACHE.invalidate(sender, instance._storage_key)
+    # Also drop the old entry if the primary key was changed
+    stored_key = cached_data.get(sender._primary_name)
+    if stored_key is not None and stored_key != instance._storage_key:
+        OBJECT_CACHE.invalidate(sender, stored_key)
@@ -2,18 +2,107 @@ import functools
 import hashlib
 import logging
 import threading
+import time
 import os
 
 import binascii
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 
 import gevent
+import gevent.pool
 
 from website import settings
 
 _local = threading.local()
 logger = logging.getLogger(__name__)
 
+
+class PostcommitTask(object):
+    """A queued call to ``fn``. Tasks flagged with ``celery`` only take
+    picklable arguments and may be handed to a Celery worker instead of
+    running in the web process.
+    """
+
+    def __init__(self, fn, args, kwargs, celery=False):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.celery = celery
+
+    @property
+    def name(self):
+        return '{}.{}'.format(self.fn.__module__, self.fn.__name__)
+
+    def __call__(self):
+        return self.fn(*self.args, **self.kwargs)
+
+
+class PostcommitMetrics(object):
+    """Per-task run counts and durations, keyed by task name.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = defaultdict(int)
+        self.total_time = defaultdict(float)
+        self.max_time = defaultdict(float)
+        self.failures = defaultdict(int)
+        self.timeouts = defaultdict(int)
+        self.offloaded = defaultdict(int)
+
+    def record(self, name, duration):
+        self.count[name] += 1
+        self.total_time[name] += duration
+        self.max_time[name] = max(self.max_time[name], duration)
+
+    def stats(self):
+        return {
+            name: {
+                'count': self.count[name],
+                'mean_time': self.total_time[name] / self.count[name],
+                'max_time': self.max_time[name],
+                'failures': self.failures[name],
+                'timeouts': self.timeouts[name],
+            }
+            for name in self.count
+        }
+
+
+metrics = PostcommitMetrics()
+
+
+class PostcommitExecutor(object):
+    """Runs post-commit tasks on a bounded pool of greenlets, cancelling any
+    task that runs longer than ``timeout`` seconds.
+    """
+
+    def __init__(self, max_concurrency=None, timeout=None):
+        self.max_concurrency = max_concurrency or settings.POSTCOMMIT_MAX_CONCURRENCY
+        self.timeout = timeout or settings.POSTCOMMIT_TASK_TIMEOUT
+
+    def run(self, tasks):
+        pool = gevent.pool.Pool(self.max_concurrency)
+        for task in tasks:
+            pool.spawn(self._run_task, task)
+        pool.join()
+
+    def _run_task(self, task):
+        start = time.time()
+        try:
+            with gevent.Timeout(self.timeout):
+                task()
+        except gevent.Timeout:
+            metrics.timeouts[task.name] += 1
+            logger.error('Post-commit task {} timed out after {} seconds'.format(task.name, self.timeout))
+        except Exception:
+            metrics.failures[task.name] += 1
+            logger.exception('Post-commit task {} failed'.format(task.name))
+        finally:
+            metrics.record(task.name, time.time() - start)
+
+
 def postcommit_queue():
     if not hasattr(_local, 'postcommit_queue'):
         _local.postcommit_queue = OrderedDict()
@@ -28,15 +117,54 @@ def postcommit_after_request(response, base_status_error_code=500):
         return response
     try:
         if postcommit_queue():
-            threads = [gevent.spawn(func) for func in postcommit_queue().values()]
-            gevent.joinall(threads)
+            tasks = postcommit_queue().values()
+            _local.postcommit_queue = OrderedDict()
+            offload = settings.USE_CELERY and settings.POSTCOMMIT_CELERY
+            if offload:
+                celery_tasks = [task for task in tasks if task.celery]
+                tasks = [task for task in tasks if not task.celery]
+                if celery_tasks:
+                    _call_on_close(response, functools.partial(send_to_celery, celery_tasks))
+            PostcommitExecutor().run(tasks)
 
     except AttributeError:
         if not settings.DEBUG_MODE:
             logger.error('Post commit task queue not initialized')
     return response
 
-def enqueue_postcommit_task(fn, args, kwargs, once_per_request=True):
+def run_postcommit_tasks():
+    """Run every queued task in process. Used outside of requests, e.g. after
+    a Celery task has finished.
+    """
+    tasks = postcommit_queue().values()
+    _local.postcommit_queue = OrderedDict()
+    if tasks:
+        PostcommitExecutor().run(tasks)
+
+def send_to_celery(tasks):
+    from framework.postcommit_tasks.tasks import run_postcommit_task
+    for task in tasks:
+        metrics.offloaded[task.name] += 1
+        run_postcommit_task.delay(task.fn.__module__, task.fn.__name__, task.args, task.kwargs)
+
+def _call_on_close(response, func):
+    """Call ``func`` once ``response`` has been sent to the client.
+    """
+    if hasattr(response, 'call_on_close'):
+        # Flask / Werkzeug
+        response.call_on_close(func)
+    else:
+        # Django
+        response._closable_objects.append(_Closer(func))
+
+
+class _Closer(object):
+
+    def __init__(self, func):
+        self.close = func
+
+
+def enqueue_postcommit_task(fn, args, kwargs, once_per_request=True, celery=False):
     # make a hash of the pertinent data
     raw = [fn.__name__, fn.__module__, args, kwargs]
     m = hashlib.md5()
@@ -46,7 +174,7 @@ def enqueue_postcommit_task(fn, args, kwargs, once_per_request=True):
     if not once_per_request:
         # we want to run it once for every occurrence, add a random string
         key = '{}:{}'.format(key, binascii.hexlify(os.urandom(8)))
-    postcommit_queue().update({key: functools.partial(fn, *args, **kwargs)})
+    postcommit_queue().update({key: PostcommitTask(fn, args, kwargs, celery=celery)})
 
 
 handlers = {
@@ -55,10 +183,12 @@ handlers = {
 }
 
 
-def run_postcommit(once_per_request=True):
+def run_postcommit(once_per_request=True, celery=False):
     '''
     Delays function execution until after the request's transaction has been committed.
     !!!Tasks enqueued using this decorator **WILL NOT** run if the return status code is >= 500!!!
+    :param bool celery: The function only takes picklable arguments and may be
+        run by a Celery worker after the response has been sent
     :return:
     '''
     def wrapper(func):
@@ -67,6 +197,7 @@ def run_postcommit(once_per_request=True):
             return func
         @functools.wraps(func)
         def wrapped(*args, **kwargs):
-            enqueue_postcommit_task(func, args, kwargs, once_per_request=once_per_request)
+            enqueue_postcommit_task(func, args, kwargs, once_per_request=once_per_request, celery=celery)
+        wrapped.__wrapped__ = func
         return wrapped
     return wrapper
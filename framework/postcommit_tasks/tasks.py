@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import importlib
+import time
+
+from framework.celery_tasks import app
+from framework.postcommit_tasks.handlers import metrics
+
+
+@app.task(max_retries=0)
+def run_postcommit_task(module, name, args, kwargs):
+    """Run a post-commit task handed off by a web process.
+    """
+    fn = getattr(importlib.import_module(module), name)
+    # Call the undecorated function rather than queueing it again
+    fn = getattr(fn, '__wrapped__', fn)
+    start = time.time()
+    try:
+        fn(*args, **kwargs)
+    finally:
+        metrics.record('{}.{}'.format(module, name), time.time() - start)
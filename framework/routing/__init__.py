@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import collections
 import copy
 import functools
 import httplib as http
 import json
 import logging
 import os
+import re
 
-from flask import request, make_response
+from flask import request, make_response, copy_current_request_context, has_request_context
+import gevent.pool
 import lxml.html
 from mako.lookup import TemplateLookup
 from mako.template import Template
@@ -18,6 +21,7 @@ import werkzeug.wrappers
 from framework import sentry
 from framework.exceptions import HTTPError
 from framework.flask import app, redirect
+from framework.mongo.handlers import CLIENT_POOL, release_current_client
 from framework.sessions import session
 
 from website import settings
@@ -26,6 +30,39 @@ logger = logging.getLogger(__name__)
 
 TEMPLATE_DIR = settings.TEMPLATES_PATH
 
+# Put in front of every element with a mod-meta attribute when a template is
+# compiled, see `mark_mod_meta`
+MOD_META_MARKER = '<!--mod-meta-->'
+
+_start_tag_re = re.compile(r'<([a-zA-Z][\w:-]*)\s')
+_start_tag_end_re = re.compile(r'''(?:[^>"']|"[^"]*"|'[^']*')*>''')
+
+
+def mark_mod_meta(source):
+    """Mako preprocessor that marks the start tags carrying a ``mod-meta``
+    attribute, so that `WebRenderer` finds the nested templates of a page in
+    its rendered output without parsing it. Runs once per template, when it
+    is compiled. Occurrences outside of a start tag or inside an HTML comment
+    are left unmarked.
+    """
+    pieces = []
+    cursor = 0
+    position = source.find('mod-meta=')
+    while position != -1:
+        tag_start = source.rfind('<', cursor, position)
+        if (
+            tag_start != -1 and
+            '>' not in source[tag_start:position] and
+            _start_tag_re.match(source, tag_start) and
+            source.rfind('<!--', 0, position) <= source.rfind('-->', 0, position)
+        ):
+            pieces.extend([source[cursor:tag_start], MOD_META_MARKER])
+            cursor = tag_start
+        position = source.find('mod-meta=', position + 1)
+    pieces.append(source[cursor:])
+    return ''.join(pieces)
+
+
 _TPL_LOOKUP = TemplateLookup(
     default_filters=[
         'unicode',  # default filter; must set explicitly when overriding
@@ -34,7 +71,8 @@ _TPL_LOOKUP = TemplateLookup(
         TEMPLATE_DIR,
         os.path.join(settings.BASE_PATH, 'addons/'),
     ],
-    module_directory='/tmp/mako_modules'
+    module_directory='/tmp/mako_modules',
+    preprocessor=mark_mod_meta,
 )
 
 _TPL_LOOKUP_SAFE = TemplateLookup(
@@ -51,6 +89,7 @@ _TPL_LOOKUP_SAFE = TemplateLookup(
         os.path.join(settings.BASE_PATH, 'addons/'),
     ],
     module_directory='/tmp/mako_modules',
+    preprocessor=mark_mod_meta,
 )
 
 REDIRECT_CODES = [
@@ -234,6 +273,7 @@ def render_mako_string(tpldir, tplname, data, trust=True):
             lookup=lookup_obj,
             input_encoding='utf-8',
             output_encoding='utf-8',
+            preprocessor=mark_mod_meta,
             default_filters=lookup_obj.template_args['default_filters'],
             imports=lookup_obj.template_args['imports']  # FIXME: Temporary workaround for data stored in wrong format in DB. Unescape it before it gets re-escaped by Markupsafe. See [#OSF-4432]
         )
@@ -303,6 +343,100 @@ def call_url(url, view_kwargs=None):
 
     return rv
 
+### Nested templates ###
+
+# An element with a mod-meta attribute in rendered output: ``start`` is where
+# its splice begins (its marker, if any), ``tag`` its start tag, ``content``
+# the end of its start tag and ``end`` the end of the element
+Include = collections.namedtuple('Include', ['start', 'tag', 'content', 'end', 'element'])
+
+
+def _find_element_end(rendered, position, tag):
+    """Return the offset after the tag closing the ``tag`` element whose
+    content starts at ``position``, or ``position`` if it is never closed.
+    """
+    close_tag = '</{}>'.format(tag)
+    if rendered.startswith(close_tag, position):
+        return position + len(close_tag)
+    depth = 1
+    for match in re.compile(r'<(/?){}[\s/>]'.format(re.escape(tag)), re.I).finditer(rendered, position):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            end = rendered.find('>', match.start())
+            return end + 1
+    return position
+
+
+def find_marked_includes(rendered):
+    """Locate the elements marked by `mark_mod_meta` in rendered output in a
+    single pass.
+
+    :return: List of `Include`, or `None` if the output also contains
+        mod-meta attributes that are not marked (e.g. from a template compiled
+        without the preprocessor)
+    """
+    includes = []
+    cursor = 0
+    position = rendered.find(MOD_META_MARKER)
+    while position != -1:
+        tag = position + len(MOD_META_MARKER)
+        match = _start_tag_re.match(rendered, tag)
+        tag_end = _start_tag_end_re.match(rendered, tag)
+        if match is None or tag_end is None or 'mod-meta=' in rendered[cursor:position]:
+            return None
+        content = tag_end.end()
+        end = _find_element_end(rendered, content, match.group(1))
+        element = lxml.html.fragment_fromstring(rendered[tag:content])
+        includes.append(Include(position, tag, content, end, element))
+        cursor = end
+        position = rendered.find(MOD_META_MARKER, cursor)
+    if 'mod-meta=' in rendered[cursor:]:
+        return None
+    return includes
+
+
+def find_parsed_includes(rendered):
+    """Locate the elements with a mod-meta attribute in rendered output by
+    parsing it. Elements whose serialization does not appear in the output
+    are skipped.
+
+    :return: List of `Include`
+    """
+    html = lxml.html.fragment_fromstring(rendered, create_parent='remove')
+    includes = []
+    cursor = 0
+    for element in html.findall('.//*[@mod-meta]'):
+        original = lxml.html.tostring(element, with_tail=False)
+        start = rendered.find(original, cursor)
+        if start == -1:
+            continue
+        end = start + len(original)
+        content = _start_tag_end_re.match(rendered, start).end()
+        includes.append(Include(start, start, content, end, element))
+        cursor = end
+    return includes
+
+
+def splice_includes(rendered, includes, results):
+    """Build the output of a template from its rendered text and the
+    ``(html, is_replace)`` results of its includes, by offset.
+    """
+    pieces = []
+    cursor = 0
+    for include, (template_rendered, is_replace) in zip(includes, results):
+        pieces.append(rendered[cursor:include.start])
+        if is_replace:
+            pieces.append(template_rendered)
+        else:
+            pieces.extend([
+                rendered[include.tag:include.content],
+                template_rendered,
+                rendered[include.content:include.end],
+            ])
+        cursor = include.end
+    pieces.append(rendered[cursor:])
+    return ''.join(pieces)
+
 ### Renderers ###
 
 class Renderer(object):
@@ -528,6 +662,32 @@ class WebRenderer(Renderer):
 
         return template_rendered, is_replace
 
+    def render_elements(self, elements, data):
+        """Render embedded templates, up to
+        ``settings.WEB_RENDERER_NESTED_CONCURRENCY`` at a time.
+
+        :param elements: The template embeds (HtmlElements)
+        :param data: Dictionary to be passed to the templates as context
+        :return: List of 2-tuples as returned by `render_element`
+        """
+        concurrency = settings.WEB_RENDERER_NESTED_CONCURRENCY
+        if concurrency <= 1 or len(elements) <= 1 or not has_request_context():
+            return [self.render_element(element, data) for element in elements]
+
+        parent_id = CLIENT_POOL.thread_id
+
+        @copy_current_request_context
+        def render(element):
+            try:
+                return self.render_element(element, data)
+            finally:
+                # Teardown only releases the request's own database lease;
+                # greenlets share it unless gevent patched the thread ids
+                if CLIENT_POOL.thread_id != parent_id:
+                    release_current_client()
+
+        return gevent.pool.Pool(concurrency).map(render, elements)
+
     def _render(self, data, template_name=None):
         """Render output of view function to HTML.
 
@@ -555,21 +715,16 @@ class WebRenderer(Renderer):
         except IOError:
             return '<div>Template {} not found.</div>'.format(template_name)
 
-        html = lxml.html.fragment_fromstring(rendered, create_parent='remove')
-
-        for element in html.findall('.//*[@mod-meta]'):
-
-            # Render nested template
-            template_rendered, is_replace = self.render_element(element, data)
+        if 'mod-meta' not in rendered:
+            return rendered
 
-            original = lxml.html.tostring(element)
-            if is_replace:
-                replacement = template_rendered
-            else:
-                replacement = original
-                replacement = replacement.replace('><', '>' + template_rendered + '<')
+        includes = find_marked_includes(rendered)
+        if includes is None:
+            rendered = rendered.replace(MOD_META_MARKER, '')
+            includes = find_parsed_includes(rendered)
 
-            rendered = rendered.replace(original, replacement)
+        results = self.render_elements([include.element for include in includes], data)
+        rendered = splice_includes(rendered, includes, results)
 
         ## Parse HTML using html5lib; lxml is too strict and e.g. throws
         ## errors if missing parent container; htmlparser mangles whitespace
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Count the queries and time taken to serve a page of nodes with embedded
+relationships (see `JSONAPIBaseView._get_embed_partial`).
+
+Creates a public project with ``--children`` public components, each with
+``--contributors`` contributors, requests the project's children with
+``embed=contributors&embed=parent`` at several page sizes, and removes the
+projects again. With batched embeds the number of queries per page should not
+grow with the page size.
+
+    python -m scripts.benchmarks.api_embeds --children 100 --contributors 3
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.base.settings')
+
+from modularodm import Q
+from webtest_plus import TestApp
+
+from framework.auth.core import Auth
+from website.app import init_app
+from website.models import Node
+from website.util import api_v2_url
+from api.base.wsgi import application as api_django_app
+from scripts.benchmarks.utils import measure, report, count_queries
+from tests.factories import ProjectFactory, NodeFactory, UserFactory
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+PAGE_SIZES = [10, 50, 100]
+
+
+def create_projects(n_children, n_contributors):
+    project = ProjectFactory(is_public=True)
+    auth = Auth(project.creator)
+    for _ in range(n_children):
+        child = NodeFactory(parent=project, creator=project.creator, is_public=True)
+        contributors = [UserFactory() for _ in range(n_contributors)]
+        child.add_contributors([{'user': user, 'permissions': ['read'], 'visible': True} for user in contributors], auth=auth, save=True)
+    return project
+
+
+def main(n_children, n_contributors, repeat):
+    app = TestApp(api_django_app)
+    project = create_projects(n_children, n_contributors)
+    try:
+        results = []
+        for size in PAGE_SIZES:
+            url = api_v2_url(
+                'nodes/{0}/children/'.format(project._id),
+                params={'page[size]': size}
+            ) + '&embed=contributors&embed=parent'
+            queries = count_queries(lambda: app.get(url))
+            logger.info('page size {0}: {1} queries ({2})'.format(
+                size,
+                sum(queries.values()),
+                ', '.join('{0[0]}.{0[1]}: {1}'.format(key, count) for key, count in sorted(queries.items())),
+            ))
+            results.append(('page size {0}'.format(size), measure(lambda: app.get(url), repeat)))
+        report('{0} children with {1} contributors each'.format(n_children, n_contributors), results)
+    finally:
+        Node.remove(Q('_id', 'in', [project._id] + [child._id for child in project.nodes]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--children', type=int, default=100)
+    parser.add_argument('--contributors', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(sys.argv[1:])
+    init_app(routes=False, set_backends=True)
+    main(args.children, args.contributors, args.repeat)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare filtering a list view in Python against pushing the filters down
+into the database (see `ListFilterMixin.database_filtering`).
+
+Loads ``--count`` records into a scratch collection, runs a handful of filter
+queries through both paths and drops the collection again.
+
+    python -m scripts.benchmarks.list_filters --count 10000
+"""
+
+import sys
+import logging
+import argparse
+
+from bson import ObjectId
+from modularodm import fields
+from modularodm.storage import MongoStorage
+from rest_framework import serializers as ser
+
+from framework.mongo import StoredObject, database, set_up_storage
+
+from website.app import init_app
+from api.base.filters import ListFilterMixin
+from scripts.benchmarks.utils import measure, report
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+QUERIES = [
+    {'filter[title]': 'record 99'},
+    {'filter[count][gte]': '9000'},
+    {'filter[public]': 'true', 'filter[count][lt]': '100'},
+    {'filter[id]': '000000000000000000000001,000000000000000000000002'},
+]
+
+
+class BenchmarkRecord(StoredObject):
+    _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
+    title = fields.StringField()
+    count = fields.IntegerField()
+    public = fields.BooleanField()
+
+
+class BenchmarkRecordSerializer(ser.Serializer):
+    filterable_fields = frozenset(['id', 'title', 'count', 'public'])
+
+    id = ser.CharField(source='_id')
+    title = ser.CharField()
+    count = ser.IntegerField()
+    public = ser.BooleanField()
+
+
+class BenchmarkRequest(object):
+
+    def __init__(self, query_params):
+        self.query_params = query_params
+
+
+class PythonFilterView(ListFilterMixin):
+    serializer_class = BenchmarkRecordSerializer
+
+    def __init__(self, query_params):
+        super(PythonFilterView, self).__init__()
+        self.kwargs = {}
+        self.request = BenchmarkRequest(query_params)
+
+    def get_default_queryset(self, query=None):
+        if query is None:
+            return list(BenchmarkRecord.find())
+        return list(BenchmarkRecord.find(query))
+
+
+class DatabaseFilterView(PythonFilterView):
+    database_filtering = True
+    model_class = BenchmarkRecord
+
+
+def populate(count):
+    collection = database[BenchmarkRecord._name]
+    collection.drop()
+    collection.insert([
+        {
+            '_id': str(ObjectId('{0:024x}'.format(i))),
+            'title': 'Record {0}'.format(i),
+            'count': i,
+            'public': bool(i % 2),
+        }
+        for i in range(count)
+    ])
+
+
+def run_view(view_class, query_params):
+    def run():
+        BenchmarkRecord._clear_caches()
+        return view_class(query_params).get_queryset_from_request()
+    return run
+
+
+def main(count, repeat):
+    set_up_storage([BenchmarkRecord], MongoStorage)
+    populate(count)
+    try:
+        for query_params in QUERIES:
+            python_results = run_view(PythonFilterView, query_params)()
+            database_results = run_view(DatabaseFilterView, query_params)()
+            # Both paths must agree before their timings mean anything
+            assert [each._id for each in python_results] == [each._id for each in database_results]
+            report(
+                '{0} ({1} of {2} records)'.format(query_params, len(python_results), count),
+                [
+                    ('python', measure(run_view(PythonFilterView, query_params), repeat)),
+                    ('database', measure(run_view(DatabaseFilterView, query_params), repeat)),
+                ]
+            )
+    finally:
+        database[BenchmarkRecord._name].drop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(sys.argv[1:])
+    init_app(routes=False, set_backends=True)
+    main(args.count, args.repeat)
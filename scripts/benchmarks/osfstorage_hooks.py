@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Count the queries and time taken by the lineage and children hooks that
+WaterButler calls on every OSF Storage operation.
+
+Creates a deep tree (``--depth`` nested folders with a file at the bottom) and
+a wide one (a folder with ``--width`` files) on a new project, compares the
+old parent-walking lineage and per-child serialization with
+`OsfStorageFileNode.get_lineage` and `OsfStorageFolder.serialize_children`,
+and removes the project again.
+
+    python -m scripts.benchmarks.osfstorage_hooks --depth 50 --width 1000
+"""
+
+import sys
+import logging
+import argparse
+
+from modularodm import Q
+
+from framework.mongo import StoredObject
+from website.app import init_app
+from website.models import Node
+from website.files.models import StoredFileNode
+from scripts.benchmarks.utils import measure, report, count_queries
+from tests.factories import ProjectFactory
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def create_trees(depth, width):
+    project = ProjectFactory()
+    root = project.get_addon('osfstorage').get_root()
+    folder = root
+    for i in range(depth):
+        folder = folder.append_folder('level-{0}'.format(i))
+    deep_file = folder.append_file('deep')
+    wide = root.append_folder('wide')
+    for i in range(width):
+        wide.append_file('file-{0}'.format(i))
+    return project, deep_file, wide
+
+
+def walk_lineage(file_node):
+    lineage = []
+    while file_node:
+        lineage.append(file_node.serialize())
+        file_node = file_node.parent
+    return lineage
+
+
+def stored_lineage(file_node):
+    return [each.serialize() for each in file_node.get_lineage()]
+
+
+def cold(func, *args):
+    """Call ``func`` with an empty identity map, as at the start of a request."""
+    def wrapped():
+        StoredObject._clear_caches()
+        for arg in args:
+            arg.reload()
+        return func(*args)
+    return wrapped
+
+
+def log_queries(label, func):
+    queries = count_queries(func)
+    logger.info('{0}: {1} queries'.format(label, sum(queries.values())))
+
+
+def main(depth, width, repeat):
+    project, deep_file, wide = create_trees(depth, width)
+    try:
+        cases = [
+            ('lineage, walking parents', cold(walk_lineage, deep_file)),
+            ('lineage, stored ancestors', cold(stored_lineage, deep_file)),
+            ('children, one by one', cold(lambda folder: [child.serialize() for child in folder.children], wide)),
+            ('children, projection query', cold(lambda folder: folder.serialize_children(), wide)),
+        ]
+        for label, func in cases:
+            log_queries(label, func)
+        report(
+            'depth {0}, width {1}'.format(depth, width),
+            [(label, measure(func, repeat)) for label, func in cases]
+        )
+    finally:
+        StoredFileNode.remove(Q('node', 'eq', project))
+        Node.remove(Q('_id', 'eq', project._id))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=50)
+    parser.add_argument('--width', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(sys.argv[1:])
+    init_app(routes=False, set_backends=True)
+    main(args.depth, args.width, args.repeat)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare counting projects in common for a page of contributor search hits
+one user at a time against `User.get_n_projects_in_common`.
+
+Creates a user with ``--projects`` projects and ``--candidates`` other users
+who each share some of them, times both ways of counting (with a cold and a
+warm contributed-node cache) and removes the records again.
+
+    python -m scripts.benchmarks.projects_in_common --projects 200 --candidates 10
+"""
+
+import sys
+import logging
+import argparse
+
+from modularodm import Q
+
+from framework.auth import User
+from framework.auth.core import Auth
+from framework.auth.contributed import CONTRIBUTED_NODES_CACHE
+from website.app import init_app
+from website.models import Node
+from scripts.benchmarks.utils import measure, report
+from tests.factories import ProjectFactory, UserFactory
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def create_users(n_projects, n_candidates):
+    user = UserFactory()
+    candidates = [UserFactory() for _ in range(n_candidates)]
+    for i in range(n_projects):
+        project = ProjectFactory(creator=user)
+        shared = [candidate for j, candidate in enumerate(candidates) if (i + j) % 3 == 0]
+        project.add_contributors(
+            [{'user': candidate, 'permissions': ['read'], 'visible': True} for candidate in shared],
+            auth=Auth(user), save=True,
+        )
+    return user, candidates
+
+
+def one_by_one(user, candidates):
+    return {candidate._id: len(user.get_projects_in_common(candidate)) for candidate in candidates}
+
+
+def batched(user, candidates, warm):
+    if not warm:
+        CONTRIBUTED_NODES_CACHE.clear()
+    return user.get_n_projects_in_common(candidates)
+
+
+def main(n_projects, n_candidates, repeat):
+    user, candidates = create_users(n_projects, n_candidates)
+    try:
+        assert one_by_one(user, candidates) == batched(user, candidates, warm=False)
+        results = [
+            ('one user at a time', measure(lambda: one_by_one(user, candidates), repeat)),
+            ('batched, cold cache', measure(lambda: batched(user, candidates, warm=False), repeat)),
+            ('batched, warm cache', measure(lambda: batched(user, candidates, warm=True), repeat)),
+        ]
+        report('{0} candidates, {1} projects'.format(n_candidates, n_projects), results)
+    finally:
+        Node.remove(Q('contributors', 'eq', user._id))
+        User.remove(Q('_id', 'in', [user._id] + [candidate._id for candidate in candidates]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--candidates', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(sys.argv[1:])
+    init_app(routes=False, set_backends=True)
+    main(args.projects, args.candidates, args.repeat)
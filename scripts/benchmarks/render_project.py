@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Time rendering a project's page (``project.mako``) and its nested
+``mod-meta`` templates.
+
+Creates a public project with ``--components`` components and
+``--contributors`` contributors, times its page with the nested templates
+found through the markers added when templates are compiled, one at a time
+and concurrently, and by parsing the page as before, then removes the records
+again.
+
+    python -m scripts.benchmarks.render_project --components 20 --contributors 10
+"""
+
+import sys
+import logging
+import argparse
+
+import mock
+from modularodm import Q
+
+from framework import routing
+from framework.auth import User
+from framework.auth.core import Auth
+from website import settings
+from website.app import init_app
+from website.models import Node
+from scripts.benchmarks.utils import measure, report
+from tests.factories import ProjectFactory, NodeFactory, UserFactory
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def create_project(n_components, n_contributors):
+    creator = UserFactory()
+    project = ProjectFactory(creator=creator, is_public=True)
+    contributors = [UserFactory() for _ in range(n_contributors)]
+    project.add_contributors(
+        [{'user': user, 'permissions': ['read', 'write'], 'visible': True} for user in contributors],
+        auth=Auth(creator), save=True,
+    )
+    for _ in range(n_components):
+        NodeFactory(creator=creator, parent=project, is_public=True)
+    return project, [creator] + contributors
+
+
+def get_page(client, project):
+    response = client.get(project.url)
+    assert response.status_code == 200, response.status_code
+    return response.data
+
+
+def main(n_components, n_contributors, concurrency, repeat):
+    app = init_app(routes=True, set_backends=True)
+    client = app.test_client()
+    project, users = create_project(n_components, n_contributors)
+    try:
+        with mock.patch.object(settings, 'WEB_RENDERER_NESTED_CONCURRENCY', 1):
+            results = [('marked, one at a time', measure(lambda: get_page(client, project), repeat))]
+            with mock.patch.object(routing, 'find_marked_includes', lambda rendered: None):
+                results.append(('parsed, one at a time', measure(lambda: get_page(client, project), repeat)))
+        with mock.patch.object(settings, 'WEB_RENDERER_NESTED_CONCURRENCY', concurrency):
+            results.append(
+                ('marked, {} at a time'.format(concurrency), measure(lambda: get_page(client, project), repeat))
+            )
+        report('{0} components, {1} contributors'.format(n_components, n_contributors), results)
+    finally:
+        Node.remove(Q('creator', 'eq', users[0]._id))
+        User.remove(Q('_id', 'in', [user._id for user in users]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--components', type=int, default=20)
+    parser.add_argument('--contributors', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(sys.argv[1:])
+    main(args.components, args.contributors, args.concurrency, args.repeat)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare full and incremental search indexing of nodes with many files.
+
+Creates ``--projects`` public projects with ``--files`` OSF Storage files each,
+times `update_node` for a full reindex and for the saves the incremental path
+handles (a description edit, a title edit), and removes the projects and the
+scratch index again. Requires a running elasticsearch.
+
+    python -m scripts.benchmarks.search_indexing --projects 5 --files 1000
+"""
+
+import sys
+import logging
+import argparse
+
+from modularodm import Q
+
+from website.app import init_app
+from website.models import Node
+from website.files.models import StoredFileNode
+from website.search import elastic_search
+from scripts.benchmarks.utils import measure, report
+from tests.factories import ProjectFactory
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+INDEX = 'benchmark_search_indexing'
+
+CASES = [
+    ('full reindex', None),
+    ('description edit', ['description']),
+    ('title edit', ['title']),
+]
+
+
+def create_project(n_files):
+    project = ProjectFactory(is_public=True)
+    root = project.get_addon('osfstorage').get_root()
+    for i in range(n_files):
+        # Save the stored object directly so that setup does not index each file
+        root.append_file('file-{0}.txt'.format(i), save=False).stored_object.save()
+    return project
+
+
+def main(n_projects, n_files, repeat):
+    elastic_search.create_index(INDEX)
+    projects = [create_project(n_files) for _ in range(n_projects)]
+    try:
+        for node in projects:
+            # Make sure every document exists before the partial updates run
+            elastic_search.update_node(node, index=INDEX)
+        report(
+            '{0} projects with {1} files each'.format(n_projects, n_files),
+            [
+                (label, measure(
+                    lambda: [elastic_search.update_node(node, index=INDEX, saved_fields=saved_fields) for node in projects],
+                    repeat
+                ))
+                for label, saved_fields in CASES
+            ]
+        )
+    finally:
+        node_ids = [node._id for node in projects]
+        StoredFileNode.remove(Q('node', 'in', node_ids))
+        Node.remove(Q('_id', 'in', node_ids))
+        elastic_search.delete_index(INDEX)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=5)
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(sys.argv[1:])
+    init_app(routes=False, set_backends=True)
+    main(args.projects, args.files, args.repeat)
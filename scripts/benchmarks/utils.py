@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+
+from modularodm.storedobject import ContextLogger
+
+logger = logging.getLogger(__name__)
+
+
+def measure(func, repeat=5):
+    """Call ``func`` ``repeat`` times and return the best and mean wall-clock
+    durations in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        durations.append(time.time() - start)
+    return min(durations), sum(durations) / len(durations)
+
+
+def report(title, results):
+    """Log a table of ``(label, (best, mean))`` pairs as produced by `measure`.
+    """
+    logger.info(title)
+    for label, (best, mean) in results:
+        logger.info('  {0:<40} best {1:>9.2f} ms   mean {2:>9.2f} ms'.format(label, best * 1000, mean * 1000))
+
+
+def count_queries(func):
+    """Call ``func`` and return the number of storage calls it made, keyed by
+    ``(collection, method)``.
+    """
+    with ContextLogger() as context:
+        func()
+        report = context.report()
+    return {key: count for key, (count, _) in report.items()}
@@ -0,0 +1,50 @@
+"""Node.add_log keeps a count of each node's logs, the date of its latest log
+and the ids of its most recent logs on the node. This script finds nodes whose
+fields disagree with their logs, e.g. because logs were added or removed
+without add_log, and recounts them.
+
+Nodes that have not been counted yet are skipped; they are populated by
+scripts/migration/migrate_node_log_counters.py
+
+Dry run: python -m scripts.consistency.check_node_log_counters
+Real: python -m scripts.consistency.check_node_log_counters false
+
+"""
+
+from website.app import init_app
+from website.models import Node, NodeLog
+from framework.mongo import database
+
+FIELDS = ['log_count', 'last_logged', 'recent_log_ids']
+
+
+def find_inconsistent_nodes():
+    """Yield (<node id>, <stored fields>, <recounted fields>) for every
+    counted node whose fields are wrong.
+    """
+    nodes = database[Node._name].find(
+        {'log_count': {'$ne': None}},
+        dict((field, True) for field in FIELDS),
+    )
+    for node in nodes:
+        stored = dict((field, node.get(field)) for field in FIELDS)
+        stored['recent_log_ids'] = stored['recent_log_ids'] or []
+        counted = NodeLog.get_node_counters(node['_id'])
+        if stored != counted:
+            yield node['_id'], stored, counted
+
+
+def check_node_log_counters(dry_run=True):
+    inconsistent = 0
+    for node_id, stored, counted in find_inconsistent_nodes():
+        inconsistent += 1
+        print u'Inconsistency: Log fields of node {} are {}, expected {}'.format(node_id, stored, counted)
+        if not dry_run:
+            database[Node._name].update({'_id': node_id}, {'$set': counted})
+    print u'{} inconsistent nodes{}'.format(inconsistent, '' if dry_run else ' recounted')
+
+if __name__ == '__main__':
+    import sys
+    dry_run = len(sys.argv) == 1 or sys.argv[1].lower() not in ['f', 'false']
+    init_app(set_backends=True, routes=False)
+    check_node_log_counters(dry_run=dry_run)
@@ -0,0 +1,74 @@
+"""
+This will populate the ancestors field on all nodes.
+Ancestors is the list of primary keys of the chain of parent nodes, root first.
+Done so that a node's subtree or chain of parents can be loaded with a single query.
+
+Top-level nodes are visited first and each of their components after its
+parent, so every node is saved once its parent already has its ancestors.
+"""
+
+import sys
+import logging
+from modularodm import Q
+from website import models
+from website.app import init_app
+from scripts import utils as script_utils
+from framework.transactions.context import TokuTransaction
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_targets():
+    return models.Node.find(Q('parent_node', 'eq', None))
+
+
+def migrate_tree(root, dry=True):
+    """Save ``root`` and its primary descendants, parents before children.
+
+    :return: number of nodes touched
+    """
+    touched = 0
+    to_visit = [root]
+    while to_visit:
+        node = to_visit.pop(0)
+        touched += 1
+        if not dry:
+            node.save(update_piwik=False)
+        logger.info('Node {} has ancestors {}'.format(node._id, list(node.ancestors)))
+        to_visit.extend(child for child in node.nodes if child.primary)
+    return touched
+
+
+def do_migration(dry=True):
+    roots = get_targets()
+    logger.info('Migrating the trees of {} top-level nodes'.format(roots.count()))
+    touched_counter = 0
+    errored_nodes = []
+    for root in roots:
+        with TokuTransaction():
+            try:
+                touched_counter += migrate_tree(root, dry=dry)
+            except (KeyError, RuntimeError) as err:  # Workaround for nodes whose files were unmigrated in a previous migration
+                logger.error('Error occurred when trying to migrate the tree of node: {}'.format(root._id))
+                logger.exception(err)
+                errored_nodes.append(root)
+
+    logger.info('Touched {} nodes'.format(touched_counter))
+    if errored_nodes:
+        logger.error('{} errored nodes:'.format(len(errored_nodes)))
+        logger.error('\n'.join([each._id for each in errored_nodes]))
+    else:
+        logger.info('Finished with no errors.')
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)  # Sets the storage backends on all models
+    do_migration(dry=dry)
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
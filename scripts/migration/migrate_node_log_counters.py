@@ -0,0 +1,64 @@
+"""
+This will populate the log_count, last_logged and recent_log_ids fields on all nodes
+that have not been counted yet.
+Done so that pages and summaries of a node do not have to scan its logs; Node.add_log
+keeps the fields up to date from then on.
+"""
+
+import sys
+import logging
+from website.app import init_app
+from website.models import Node, NodeLog
+from framework.mongo import database
+from scripts import utils as script_utils
+from framework.transactions.context import TokuTransaction
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_targets():
+    # Matches nodes without the field as well
+    return database[Node._name].find({'log_count': None}, {'_id': True})
+
+
+def migrate_node(node_id, dry=True):
+    counters = NodeLog.get_node_counters(node_id)
+    if not dry:
+        database[Node._name].update({'_id': node_id}, {'$set': counters})
+    return counters
+
+
+def do_migration(dry=True):
+    targets = get_targets()
+    logger.info('Counting the logs of {} nodes'.format(targets.count()))
+    count = 0
+    errored_nodes = []
+    for node in targets:
+        with TokuTransaction():
+            try:
+                migrate_node(node['_id'], dry=dry)
+                count += 1
+            except Exception as err:
+                logger.error('Error occurred when trying to count the logs of node: {}'.format(node['_id']))
+                logger.exception(err)
+                errored_nodes.append(node['_id'])
+
+    logger.info('Counted the logs of {} nodes'.format(count))
+    if errored_nodes:
+        logger.error('{} errored nodes:'.format(len(errored_nodes)))
+        logger.error('\n'.join(errored_nodes))
+    else:
+        logger.info('Finished with no errors.')
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)  # Sets the storage backends on all models
+    do_migration(dry=dry)
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
@@ -0,0 +1,80 @@
+"""
+This will populate the ancestors field on all osfstorage files and folders.
+Ancestors is the list of primary keys of the chain of parent folders, root first.
+Done so that the lineage and materialized path of a file can be read with a single query.
+
+Each tree is walked from its root folder; the children of a folder are updated
+with a single write.
+"""
+
+import sys
+import logging
+from website.app import init_app
+from website.files.models import StoredFileNode
+from framework.mongo import database
+from scripts import utils as script_utils
+from framework.transactions.context import TokuTransaction
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_targets():
+    return database[StoredFileNode._name].find(
+        {'provider': 'osfstorage', 'parent': None},
+        {'_id': True},
+    )
+
+
+def migrate_tree(root_id, dry=True):
+    """Set the ancestors of everything below the folder ``root_id``.
+
+    :return: number of files and folders touched
+    """
+    collection = database[StoredFileNode._name]
+    touched = 0
+    to_visit = [(root_id, [root_id])]
+    while to_visit:
+        folder_id, ancestors = to_visit.pop()
+        touched += collection.find({'parent': folder_id}).count()
+        if not dry:
+            collection.update({'parent': folder_id}, {'$set': {'ancestors': ancestors}}, multi=True)
+        to_visit.extend(
+            (child['_id'], ancestors + [child['_id']])
+            for child in collection.find({'parent': folder_id, 'is_file': False}, {'_id': True})
+        )
+    return touched
+
+
+def do_migration(dry=True):
+    roots = get_targets()
+    logger.info('Migrating the trees of {} root folders'.format(roots.count()))
+    touched_counter = 0
+    errored_roots = []
+    for root in roots:
+        with TokuTransaction():
+            try:
+                touched_counter += migrate_tree(root['_id'], dry=dry)
+            except Exception as err:
+                logger.error('Error occurred when trying to migrate the tree of root folder: {}'.format(root['_id']))
+                logger.exception(err)
+                errored_roots.append(root['_id'])
+
+    logger.info('Touched {} files and folders'.format(touched_counter))
+    if errored_roots:
+        logger.error('{} errored root folders:'.format(len(errored_roots)))
+        logger.error('\n'.join(errored_roots))
+    else:
+        logger.info('Finished with no errors.')
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)  # Sets the storage backends on all models
+    do_migration(dry=dry)
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
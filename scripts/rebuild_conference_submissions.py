@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Rebuild the conference submission index used by the meetings pages.
+
+    python -m scripts.rebuild_conference_submissions [conference ...]
+
+Rebuilds every conference unless endpoints are given.
+"""
+
+import sys
+import logging
+
+from modularodm import Q
+
+from website.app import init_app
+from website.conferences.model import Conference, ConferenceSubmission, rebuild_submissions
+
+from scripts import utils as scripts_utils
+
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def main(endpoints=None):
+    init_app(set_backends=True, routes=False)
+    if endpoints:
+        conferences = Conference.find(Q('endpoint', 'in', endpoints))
+    else:
+        conferences = Conference.find()
+        # Drop entries of conferences that no longer exist
+        ConferenceSubmission.remove(Q('conference', 'nin', conferences.get_keys()))
+    for conference in conferences:
+        rebuild_submissions(conference)
+        logger.info('Indexed {0} submissions to {1}'.format(conference.num_submissions, conference.endpoint))
+
+
+if __name__ == '__main__':
+    scripts_utils.add_file_logger(logger, __file__)
+    main(sys.argv[1:])
@@ -0,0 +1,36 @@
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, NodeFactory
+from framework.mongo import database
+
+from scripts.migration.migrate_ancestors_on_node import do_migration
+
+
+class TestMigrateAncestorsOnNode(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateAncestorsOnNode, self).setUp()
+        self.project = ProjectFactory()
+        self.child = NodeFactory(parent=self.project)
+        self.grandchild = NodeFactory(parent=self.child)
+        # Simulate nodes saved before the field existed
+        database['node'].update({}, {'$unset': {'ancestors': ''}}, multi=True)
+        for node in (self.project, self.child, self.grandchild):
+            node.reload()
+
+    def test_dry_run_does_not_populate_ancestors(self):
+        do_migration(dry=True)
+        self.grandchild.reload()
+        assert_equal(list(self.grandchild.ancestors), [])
+
+    def test_populates_ancestors(self):
+        do_migration(dry=False)
+        self.child.reload()
+        self.grandchild.reload()
+        assert_equal(list(self.child.ancestors), [self.project._id])
+        assert_equal(list(self.grandchild.ancestors), [self.project._id, self.child._id])
+        assert_equal(
+            {node._id for node in self.project.get_primary_descendants()},
+            {self.child._id, self.grandchild._id}
+        )
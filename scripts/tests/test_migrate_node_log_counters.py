@@ -0,0 +1,35 @@
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+from framework.mongo import database
+from website.models import Node
+
+from scripts.migration.migrate_node_log_counters import do_migration
+
+
+class TestMigrateNodeLogCounters(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateNodeLogCounters, self).setUp()
+        self.project = ProjectFactory()
+        # Simulate records saved before the fields existed
+        database[Node._name].update(
+            {},
+            {'$unset': {'log_count': '', 'last_logged': '', 'recent_log_ids': ''}},
+            multi=True,
+        )
+        self.project.reload()
+
+    def test_dry_run_does_not_count_logs(self):
+        do_migration(dry=True)
+        self.project.reload()
+        assert_is_none(self.project.log_count)
+
+    def test_counts_logs(self):
+        do_migration(dry=False)
+        self.project.reload()
+        logs = list(self.project.logs)
+        assert_equal(self.project.log_count, len(logs))
+        assert_equal(list(self.project.recent_log_ids), [log._id for log in logs])
+        assert_is_not_none(self.project.last_logged)
@@ -0,0 +1,37 @@
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+from framework.mongo import database
+from website.files.models import StoredFileNode
+
+from scripts.migration.migrate_osfstorage_ancestors import do_migration
+
+
+class TestMigrateOsfstorageAncestors(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateOsfstorageAncestors, self).setUp()
+        self.project = ProjectFactory()
+        self.root = self.project.get_addon('osfstorage').get_root()
+        self.folder = self.root.append_folder('Cloud')
+        self.nested = self.folder.append_folder('Nested')
+        self.file = self.nested.append_file('Carp')
+        # Simulate records saved before the field existed
+        database[StoredFileNode._name].update({}, {'$unset': {'ancestors': ''}}, multi=True)
+        for each in (self.root, self.folder, self.nested, self.file):
+            each.reload()
+
+    def test_dry_run_does_not_populate_ancestors(self):
+        do_migration(dry=True)
+        self.file.reload()
+        assert_equal(list(self.file.ancestors), [])
+
+    def test_populates_ancestors(self):
+        do_migration(dry=False)
+        for each in (self.root, self.folder, self.nested, self.file):
+            each.reload()
+        assert_equal(list(self.root.ancestors), [])
+        assert_equal(list(self.folder.ancestors), [self.root._id])
+        assert_equal(list(self.file.ancestors), [self.root._id, self.folder._id, self.nested._id])
+        assert_equal(self.file.get_lineage(), [self.file, self.nested, self.folder, self.root])
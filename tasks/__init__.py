@@ -406,6 +406,13 @@ def rebuild_search():
     migrate_search()
 
 
+@task
+def rebuild_conference_submissions(endpoint=None):
+    """Rebuild the conference submission index of one or all conferences."""
+    from scripts.rebuild_conference_submissions import main
+    main([endpoint] if endpoint else None)
+
+
 @task
 def mailserver(port=1025):
     """Run a SMTP test server."""
@@ -11,7 +11,7 @@ from flask import Flask
 from datetime import datetime
 
 from framework import analytics, sessions
-from framework.sessions import session
+from framework.analytics.hyperloglog import HyperLogLog
 
 from tests.base import OsfTestCase
 from tests.factories import UserFactory, ProjectFactory
@@ -48,6 +48,8 @@ class UpdateCountersTestCase(OsfTestCase):
         self.ctx.push()
         # TODO: Think of something better @sloria @jmcarp
         sessions.set_session(sessions.Session())
+        # Drop views buffered by other tests
+        analytics.counter_buffer.pending.clear()
 
     def tearDown(self):
         self.ctx.pop()
@@ -71,18 +73,26 @@ class TestUpdateCounters(UpdateCountersTestCase):
         assert_equal(count, (None, None))
 
         download_file_(node=self.node, fid=self.fid)
+        analytics.counter_buffer.flush(db=self.db)
 
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, self.fid), db=self.db)
         assert_equal(count, (1, 1))
 
-        page = 'download:{0}:{1}'.format(self.node, self.fid)
-
-        session.data['visited'].append(page)
+        # Same visitor
         download_file_(node=self.node, fid=self.fid)
+        analytics.counter_buffer.flush(db=self.db)
 
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, self.fid), db=self.db)
         assert_equal(count, (1, 2))
 
+        # New visitor
+        sessions.set_session(sessions.Session())
+        download_file_(node=self.node, fid=self.fid)
+        analytics.counter_buffer.flush(db=self.db)
+
+        count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, self.fid), db=self.db)
+        assert_equal(count, (2, 3))
+
     def test_update_counters_file_version(self):
         @analytics.update_counters('download:{target_id}:{fid}:{vid}', db=self.db)
         def download_file_version_(**kwargs):
@@ -92,18 +102,26 @@ class TestUpdateCounters(UpdateCountersTestCase):
         assert_equal(count, (None, None))
 
         download_file_version_(node=self.node, fid=self.fid, vid=self.vid)
+        analytics.counter_buffer.flush(db=self.db)
 
         count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
         assert_equal(count, (1, 1))
 
-        page = 'download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid)
-
-        session.data['visited'].append(page)
+        # Same visitor
         download_file_version_(node=self.node, fid=self.fid, vid=self.vid)
+        analytics.counter_buffer.flush(db=self.db)
 
         count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
         assert_equal(count, (1, 2))
 
+        # New visitor
+        sessions.set_session(sessions.Session())
+        download_file_version_(node=self.node, fid=self.fid, vid=self.vid)
+        analytics.counter_buffer.flush(db=self.db)
+
+        count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
+        assert_equal(count, (2, 3))
+
     def test_get_basic_counters(self):
         page = 'node:' + str(self.node._id)
 
@@ -133,9 +151,6 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, fid2), db=self.db)
         assert_equal(count, (None, None))
 
-        page = 'download:{0}:{1}'.format(self.node, fid1)
-
-        session.data['visited'].append(page)
         download_file_(node=self.node, fid=fid1)
         download_file_(node=self.node, fid=fid2)
 
@@ -143,3 +158,86 @@ class TestUpdateCounters(UpdateCountersTestCase):
         assert_equal(count, (1, 2))
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, fid2), db=self.db)
         assert_equal(count, (1, 1))
+
+    def test_views_are_buffered_until_flush(self):
+        page = 'node:' + str(self.node._id)
+        for _ in range(3):
+            analytics.update_counter(page, db=self.db)
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (None, None))
+        analytics.counter_buffer.flush(db=self.db)
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (1, 3))
+
+    def test_flush_is_due_after_interval(self):
+        buffer = analytics.CounterBuffer(flush_interval=60, max_pages=2)
+        assert_false(buffer.add('node:abc', '2016/01/01'))
+        assert_true(buffer.add('node:def', '2016/01/01'))
+        buffer.last_flush -= 60
+        buffer.max_pages = 10
+        assert_true(buffer.add('node:abc', '2016/01/01'))
+
+    def test_uniques_carry_over_existing_counts(self):
+        page = 'node:' + str(self.node._id)
+        self.db['pagecounters'].update({'_id': page}, {'$inc': {'total': 10, 'unique': 4}}, True, False)
+        analytics.update_counter(page, db=self.db)
+        analytics.counter_buffer.flush(db=self.db)
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (5, 11))
+
+    def test_uniques_merge_across_flushes(self):
+        page = 'node:' + str(self.node._id)
+        for _ in range(2):
+            analytics.update_counter(page, db=self.db)
+            analytics.counter_buffer.flush(db=self.db)
+        sessions.set_session(sessions.Session())
+        analytics.update_counter(page, db=self.db)
+        analytics.counter_buffer.flush(db=self.db)
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (2, 3))
+
+    def test_uniques_of_earlier_day_are_merged(self):
+        page = 'node:' + str(self.node._id)
+        for visitors in (['a', 'b'], ['b', 'c']):
+            counts = analytics.PendingCounts(analytics.counter_buffer.precision)
+            for visitor in visitors:
+                counts.add('2016/01/01', visitor)
+            counts.add('2016/01/02', 'a')
+            analytics.write_counts(self.db, {page: counts})
+        counter = self.db['pagecounters'].find_one({'_id': page})
+        assert_equal(counter['unique'], 3)
+        assert_equal(counter['date']['2016/01/01']['unique'], 3)
+        assert_equal(counter['date']['2016/01/02']['unique'], 1)
+
+    def test_only_recent_day_sketches_are_kept(self):
+        page = 'node:' + str(self.node._id)
+        for date in ('2016/01/01', '2016/01/02', '2016/01/03'):
+            counts = analytics.PendingCounts(analytics.counter_buffer.precision)
+            counts.add(date, 'a')
+            analytics.write_counts(self.db, {page: counts})
+        sketch = self.db['pagecountersketches'].find_one({'_id': page})
+        assert_equal(sorted(sketch['days']), ['2016/01/02', '2016/01/03'])
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_small_counts_are_exact(self):
+        sketch = HyperLogLog()
+        for i in range(20):
+            sketch.add('visitor-{0}'.format(i % 10))
+        assert_equal(sketch.cardinality(), 10)
+
+    def test_large_count_estimate(self):
+        sketch = HyperLogLog()
+        for i in range(50000):
+            sketch.add('visitor-{0}'.format(i))
+        assert_almost_equal(sketch.cardinality(), 50000, delta=50000 * 0.1)
+
+    def test_merge_counts_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(100):
+            first.add('visitor-{0}'.format(i))
+            second.add('visitor-{0}'.format(i + 50))
+        first.update(second)
+        assert_almost_equal(first.cardinality(), 150, delta=10)
+
+    def test_round_trip(self):
+        sketch = HyperLogLog()
+        sketch.add(u'visitor-\u00e9')
+        assert_equal(HyperLogLog(registers=sketch.to_bytes()).registers, sketch.registers)
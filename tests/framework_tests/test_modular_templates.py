@@ -9,12 +9,15 @@ import os
 
 import flask
 from lxml.html import fragment_fromstring
+import mock
+import gevent
 import werkzeug.wrappers
 
 from framework.exceptions import HTTPError, http
+from framework.mongo import database, handlers
 from framework.routing import (
     Renderer, JSONRenderer, WebRenderer,
-    render_mako_string,
+    render_mako_string, mark_mod_meta, MOD_META_MARKER,
 )
 
 from tests.base import AppTestCase, OsfTestCase
@@ -319,6 +322,99 @@ class WebRendererTemplateTestCase(OsfTestCase):
         )
 
 
+    def test_render_nested_template_by_offset(self):
+        self.app.app.preprocess_request()
+
+        r = WebRenderer(
+            'nested_parent_include.html',
+            render_mako_string,
+            template_dir=TEMPLATES_PATH,
+        )
+
+        resp = r({})
+
+        self.assertIn(
+            """<div class="wrapper" mod-meta='{"tpl":"nested_child.html"}'>"""
+            '<p>child template content</p></div> after wrapper\n'
+            '    <p>child template content</p>\n</body>',
+            resp.data,
+        )
+        self.assertNotIn(MOD_META_MARKER, resp.data)
+
+    @mock.patch('framework.routing.settings.WEB_RENDERER_NESTED_CONCURRENCY', 2)
+    def test_render_nested_templates_concurrently(self):
+        with self.app.app.test_request_context():
+            r = WebRenderer(
+                'nested_parent_include.html',
+                render_mako_string,
+                template_dir=TEMPLATES_PATH,
+            )
+
+            resp = r({})
+
+        self.assertEqual(resp.data.count('<p>child template content</p>'), 2)
+
+    @mock.patch('framework.routing.settings.WEB_RENDERER_NESTED_CONCURRENCY', 2)
+    def test_render_nested_templates_concurrently_returns_leases(self):
+        # Room for the request and one greenlet, connected to the test database
+        pool = handlers.ClientPool(
+            max_clients=1,
+            sockets_per_client=2,
+            acquire_timeout=1,
+            client_factory=handlers.CLIENT_POOL._client_factory,
+        )
+
+        def renderer(tpldir, tplname, data, trust=True):
+            if tplname == 'nested_child.html':
+                database['user'].find_one()
+            return render_mako_string(tpldir, tplname, data, trust=trust)
+
+        r = WebRenderer('nested_parent_include.html', renderer, template_dir=TEMPLATES_PATH)
+        # Greenlets get their own thread ids, as in the monkey patched web server
+        greenlet_ids = mock.PropertyMock(side_effect=lambda: id(gevent.getcurrent()))
+        with mock.patch.object(handlers, 'CLIENT_POOL', pool), \
+                mock.patch('framework.routing.CLIENT_POOL', pool), \
+                mock.patch.object(handlers.ClientPool, 'thread_id', greenlet_ids):
+            with self.app.app.test_request_context():
+                pool.acquire()
+                for _ in range(3):
+                    resp = r({})
+                    self.assertEqual(resp.data.count('<p>child template content</p>'), 2)
+                self.assertEqual(pool.in_use, 1)
+                pool.release()
+
+    def test_render_unmarked_nested_template(self):
+        """Output from a template compiled without `mark_mod_meta` is parsed
+        to find its nested templates.
+        """
+        self.app.app.preprocess_request()
+
+        def renderer(tpldir, tplname, data, trust=True):
+            if tplname == 'nested_child.html':
+                return render_mako_string(tpldir, tplname, data, trust=trust)
+            return """<p>parent</p><div mod-meta='{"tpl":"nested_child.html","replace": true}'></div> tail"""
+
+        r = WebRenderer('parent.html', renderer, template_dir=TEMPLATES_PATH)
+
+        resp = r({})
+
+        self.assertEqual('<p>parent</p><p>child template content</p> tail', resp.data)
+
+
+class MarkModMetaTestCase(unittest.TestCase):
+
+    def test_marks_start_tags(self):
+        source = """<p>\n  <div class="x" mod-meta='{"tpl": "${name}"}'></div>\n</p>"""
+        self.assertEqual(
+            mark_mod_meta(source),
+            """<p>\n  <!--mod-meta--><div class="x" mod-meta='{"tpl": "${name}"}'></div>\n</p>""",
+        )
+
+    def test_ignores_comments_and_text(self):
+        source = """<!-- <div mod-meta='{}'></div> --><p>Set mod-meta='{}'</p>"""
+        self.assertEqual(mark_mod_meta(source), source)
+
+
 class JSONRendererEncoderTestCase(unittest.TestCase):
 
     def test_encode_custom_class(self):
@@ -1,13 +1,17 @@
 """
 Tests related to functions in framework.mongo
 """
+import time
 from unittest import TestCase
 
+import mock
 from nose.tools import *  # flake8: noqa
 
 from modularodm.exceptions import ValidationError, ValidationValueError
+from pymongo.errors import ConnectionFailure
 
 from framework.mongo import validators
+from framework.mongo.handlers import ClientPool
 
 class TestValidators(TestCase):
 
@@ -62,3 +66,112 @@ class TestValidators(TestCase):
 
         with assert_raises(ValidationError):
             new_validator({'k': 'v', 'k2': 'v2'})
+
+
+class TestClientPool(TestCase):
+
+    def setUp(self):
+        self.pool = ClientPool(
+            max_clients=2,
+            min_clients=0,
+            sockets_per_client=2,
+            acquire_timeout=0.01,
+            idle_timeout=60,
+            health_check_interval=30,
+            client_factory=mock.Mock,
+        )
+
+    def test_clients_are_shared_between_callers(self):
+        first = self.pool.acquire('a')
+        second = self.pool.acquire('b')
+        assert_is(first, second)
+        assert_equal(self.pool.stats()['clients'], 1)
+        assert_equal(self.pool.stats()['in_use'], 2)
+
+    def test_acquire_is_idempotent_per_caller(self):
+        assert_is(self.pool.acquire('a'), self.pool.acquire('a'))
+        assert_equal(self.pool.in_use, 1)
+
+    def test_new_client_created_when_saturated(self):
+        first = self.pool.acquire('a')
+        self.pool.acquire('b')
+        third = self.pool.acquire('c')
+        assert_is_not(first, third)
+        assert_equal(self.pool.metrics.created, 2)
+
+    def test_acquire_times_out_when_exhausted(self):
+        for _id in 'abcd':
+            self.pool.acquire(_id)
+        with assert_raises(ClientPool.PoolExhaustedError):
+            self.pool.acquire('e')
+        assert_equal(self.pool.metrics.timeouts, 1)
+
+    def test_release_returns_lease(self):
+        self.pool.acquire('a')
+        self.pool.release('a')
+        assert_equal(self.pool.in_use, 0)
+        with assert_raises(ClientPool.ExtraneousReleaseError):
+            self.pool.release('a')
+
+    def test_idle_clients_are_evicted(self):
+        client = self.pool.acquire('a')
+        self.pool.release('a')
+        assert_equal(self.pool.stats()['clients'], 1)
+        with mock.patch('framework.mongo.handlers.time.time', return_value=time.time() + 120):
+            self.pool.evict_idle()
+        assert_equal(self.pool.stats()['clients'], 0)
+        assert_equal(self.pool.metrics.evicted, 1)
+        assert_true(client.close.called)
+
+    def test_stale_client_is_pinged_and_discarded(self):
+        client = self.pool.acquire('a')
+        self.pool.release('a')
+        client.admin.command.side_effect = ConnectionFailure
+        with mock.patch('framework.mongo.handlers.time.time', return_value=time.time() + 45):
+            replacement = self.pool.acquire('b')
+        assert_is_not(client, replacement)
+        assert_equal(self.pool.metrics.discarded, 1)
+
+    def test_client_being_checked_is_not_shared(self):
+        client = self.pool.acquire('a')
+        self.pool.release('a')
+        acquired = []
+
+        def ping(*args, **kwargs):
+            # Another caller asks for a client while the first is pinged
+            acquired.append(self.pool.acquire('c'))
+
+        client.admin.command.side_effect = ping
+        with mock.patch('framework.mongo.handlers.time.time', return_value=time.time() + 45):
+            assert_is(self.pool.acquire('b'), client)
+        assert_is_not(acquired[0], client)
+
+    def test_failed_ping_returns_lease(self):
+        client = self.pool.acquire('a')
+        self.pool.release('a')
+        client.admin.command.side_effect = ValueError
+        with mock.patch('framework.mongo.handlers.time.time', return_value=time.time() + 45):
+            with assert_raises(ValueError):
+                self.pool.acquire('b')
+        assert_equal(self.pool.in_use, 0)
+        assert_false(self.pool._clients[0].checking)
+
+    def test_hooks_are_called(self):
+        acquired, released = [], []
+        self.pool.on_acquire(lambda client, _id: acquired.append(_id))
+        self.pool.on_release(lambda client, _id: released.append(_id))
+        self.pool.acquire('a')
+        self.pool.acquire('a')
+        self.pool.release('a')
+        assert_equal(acquired, ['a'])
+        assert_equal(released, ['a'])
+
+    def test_wait_times_are_recorded(self):
+        self.pool.acquire('a')
+        assert_equal(sum(self.pool.metrics.wait_time_histogram.values()), 1)
+
+    def test_configure(self):
+        self.pool.configure(max_clients=1)
+        assert_equal(self.pool.max_clients, 1)
+        with assert_raises(TypeError):
+            self.pool.configure(bogus=1)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+import mock
+from nose.tools import *  # noqa (PEP8 asserts)
+
+from framework.mongo import OBJECT_CACHE
+from framework.mongo.object_cache import ObjectCache, LocalSharedBackend, TTLCache, Generations
+from tests import factories
+from tests.base import DbTestCase
+from website.models import User
+
+
+class Schema(object):
+    _name = 'schema'
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert_equal(cache.get('a'), 1)
+        assert_is_none(cache.get('b'))
+        assert_equal(len(cache), 2)
+
+    def test_entries_expire(self):
+        cache = TTLCache(ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=120)
+        with mock.patch('framework.mongo.object_cache.time.time', return_value=time.time() + 61):
+            assert_is_none(cache.get('a'))
+            assert_equal(cache.get('b'), 2)
+
+    def test_entries_without_ttl_do_not_expire(self):
+        cache = TTLCache()
+        cache.set('a', 1)
+        with mock.patch('framework.mongo.object_cache.time.time', return_value=time.time() + 10 ** 6):
+            assert_equal(cache.get('a'), 1)
+
+    def test_disabled(self):
+        for cache in (TTLCache(ttl=0), TTLCache(max_entries=0)):
+            cache.set('a', 1)
+            assert_is_none(cache.get('a'))
+
+
+class TestGenerations(unittest.TestCase):
+
+    def test_bump(self):
+        generations = Generations('test', ttl=60)
+        assert_equal(generations.get('a'), 0)
+        generations.bump('a')
+        assert_equal(generations.get('a'), 1)
+        assert_equal(generations.get('b'), 0)
+
+    def test_shared_bump(self):
+        shared = LocalSharedBackend()
+        this, other = Generations('test', 60, shared=shared), Generations('test', 60, shared=shared)
+        this.bump('a')
+        assert_equal(other.get('a'), 1)
+
+    def test_reset_when_full(self):
+        on_reset = mock.Mock()
+        generations = Generations('test', 60, max_entries=1, on_reset=on_reset)
+        generations.bump('a')
+        generations.bump('b')
+        assert_true(on_reset.called)
+        assert_equal(generations.get('a'), 0)
+
+
+class TestObjectCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ObjectCache(schemas={'schema': 60}, max_entries=2)
+
+    def test_get_returns_copy(self):
+        self.cache.set(Schema, 'abc', {'tags': ['a']})
+        data = self.cache.get(Schema, 'abc')
+        data['tags'].append('b')
+        assert_equal(self.cache.get(Schema, 'abc'), {'tags': ['a']})
+
+    def test_counts_hits_and_misses(self):
+        assert_is_none(self.cache.get(Schema, 'abc'))
+        self.cache.set(Schema, 'abc', {})
+        self.cache.get(Schema, 'abc')
+        assert_equal(self.cache.stats(), {'schema': {'hits': 1, 'misses': 1}})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set(Schema, 'a', {})
+        self.cache.set(Schema, 'b', {})
+        self.cache.get(Schema, 'a')
+        self.cache.set(Schema, 'c', {})
+        assert_is_not_none(self.cache.get(Schema, 'a'))
+        assert_is_none(self.cache.get(Schema, 'b'))
+
+    def test_entries_expire(self):
+        self.cache.set(Schema, 'a', {})
+        with mock.patch('framework.mongo.object_cache.time.time', return_value=time.time() + 61):
+            assert_is_none(self.cache.get(Schema, 'a'))
+
+    def test_invalidate(self):
+        self.cache.set(Schema, 'a', {})
+        self.cache.invalidate(Schema, 'a')
+        assert_is_none(self.cache.get(Schema, 'a'))
+
+    def test_shared_tier_fills_local_tier(self):
+        shared = LocalSharedBackend()
+        other = ObjectCache(schemas={'schema': 60}, shared=shared)
+        self.cache.shared = shared
+        self.cache.set(Schema, 'a', {'x': 1})
+        assert_equal(other.get(Schema, 'a'), {'x': 1})
+        other.invalidate(Schema, 'a')
+        assert_is_none(shared.get('schema:a'))
+
+
+class TestStoredObjectCache(DbTestCase):
+
+    def setUp(self):
+        super(TestStoredObjectCache, self).setUp()
+        self.user = factories.UserFactory()
+        self.patcher = mock.patch.dict(OBJECT_CACHE.schemas, {'user': 60})
+        self.patcher.start()
+        OBJECT_CACHE.clear()
+        User._clear_caches()
+
+    def tearDown(self):
+        self.patcher.stop()
+        OBJECT_CACHE.clear()
+        super(TestStoredObjectCache, self).tearDown()
+
+    def test_load_populates_cache_across_requests(self):
+        User.load(self.user._id)
+        User._clear_caches()
+        with mock.patch.object(User._storage[0], 'get') as mock_get:
+            user = User.load(self.user._id)
+        assert_false(mock_get.called)
+        assert_equal(user.fullname, self.user.fullname)
+
+    def test_load_missing_record(self):
+        assert_is_none(User.load('nope'))
+
+    def test_save_invalidates_cache(self):
+        User.load(self.user._id)
+        User._clear_caches()
+        user = User.load(self.user._id)
+        user.fullname = 'Freddie Mercury'
+        user.save()
+        User._clear_caches()
+        assert_equal(User.load(self.user._id).fullname, 'Freddie Mercury')
+
+    def test_remove_invalidates_cache(self):
+        User.load(self.user._id)
+        User.remove_one(self.user)
+        User._clear_caches()
+        assert_is_none(User.load(self.user._id))
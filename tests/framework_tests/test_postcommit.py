@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import gevent
+import mock
+from nose.tools import *  # noqa (PEP8 asserts)
+
+from framework.postcommit_tasks import handlers
+from framework.postcommit_tasks.handlers import (
+    PostcommitExecutor,
+    enqueue_postcommit_task,
+    postcommit_after_request,
+    postcommit_before_request,
+    postcommit_queue,
+)
+
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def sleep_forever():
+    gevent.sleep(60)
+
+
+def fail():
+    raise ValueError
+
+
+class TestPostcommitQueue(unittest.TestCase):
+
+    def setUp(self):
+        calls[:] = []
+        handlers.metrics.reset()
+        postcommit_before_request()
+        self.response = mock.Mock(status_code=200)
+
+    def test_tasks_run_once_per_request(self):
+        enqueue_postcommit_task(record, (1, ), {})
+        enqueue_postcommit_task(record, (1, ), {})
+        enqueue_postcommit_task(record, (2, ), {})
+        postcommit_after_request(self.response)
+        assert_equal(sorted(calls), [1, 2])
+        assert_equal(len(postcommit_queue()), 0)
+
+    def test_tasks_run_for_every_occurrence(self):
+        enqueue_postcommit_task(record, (1, ), {}, once_per_request=False)
+        enqueue_postcommit_task(record, (1, ), {}, once_per_request=False)
+        postcommit_after_request(self.response)
+        assert_equal(calls, [1, 1])
+
+    def test_tasks_discarded_on_error_response(self):
+        enqueue_postcommit_task(record, (1, ), {})
+        postcommit_after_request(mock.Mock(status_code=500))
+        assert_equal(calls, [])
+        assert_equal(len(postcommit_queue()), 0)
+
+    def test_durations_are_recorded(self):
+        enqueue_postcommit_task(record, (1, ), {})
+        postcommit_after_request(self.response)
+        stats = handlers.metrics.stats()
+        assert_equal(stats[__name__ + '.record']['count'], 1)
+
+    @mock.patch('framework.postcommit_tasks.handlers.send_to_celery')
+    def test_celery_tasks_sent_after_response(self, mock_send):
+        enqueue_postcommit_task(record, (1, ), {}, celery=True)
+        enqueue_postcommit_task(record, (2, ), {})
+        with mock.patch.multiple(handlers.settings, USE_CELERY=True, POSTCOMMIT_CELERY=True):
+            postcommit_after_request(self.response)
+        assert_equal(calls, [2])
+        assert_false(mock_send.called)
+        close_callback = self.response.call_on_close.call_args[0][0]
+        close_callback()
+        tasks = mock_send.call_args[0][0]
+        assert_equal([task.args for task in tasks], [(1, )])
+
+
+class TestPostcommitExecutor(unittest.TestCase):
+
+    def setUp(self):
+        handlers.metrics.reset()
+
+    def test_slow_tasks_time_out(self):
+        executor = PostcommitExecutor(max_concurrency=2, timeout=0.01)
+        executor.run([handlers.PostcommitTask(sleep_forever, (), {})])
+        assert_equal(handlers.metrics.timeouts[__name__ + '.sleep_forever'], 1)
+
+    def test_failures_do_not_stop_other_tasks(self):
+        calls[:] = []
+        executor = PostcommitExecutor(max_concurrency=1, timeout=1)
+        executor.run([
+            handlers.PostcommitTask(fail, (), {}),
+            handlers.PostcommitTask(record, (1, ), {}),
+        ])
+        assert_equal(calls, [1])
+        assert_equal(handlers.metrics.failures[__name__ + '.fail'], 1)
+
+    def test_concurrency_is_bounded(self):
+        running, peak = [0], [0]
+
+        def task():
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            gevent.sleep(0.001)
+            running[0] -= 1
+
+        executor = PostcommitExecutor(max_concurrency=3, timeout=1)
+        executor.run([handlers.PostcommitTask(task, (), {}) for _ in range(10)])
+        assert_equal(peak[0], 3)
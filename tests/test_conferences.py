@@ -18,7 +18,7 @@ from framework.transactions import commands
 from website import settings
 from website.models import User, Node
 from website.conferences import views
-from website.conferences.model import Conference
+from website.conferences.model import Conference, ConferenceSubmission, rebuild_submissions
 from website.conferences import utils, message
 from website.util import api_url_for, web_url_for
 
@@ -444,6 +444,7 @@ class TestConferenceEmailViews(OsfTestCase):
 
     def test_conference_submissions(self):
         Node.remove()
+        ConferenceSubmission.remove()
         conference1 = ConferenceFactory()
         conference2 = ConferenceFactory()
         # Create conference nodes
@@ -539,6 +540,79 @@ class TestConferenceModel(OsfTestCase):
         assert_equal(conf.field_names['submission1'], 'poster')
         assert_equal(conf.field_names['mail_subject'], 'Presentation title')
 
+class TestConferenceSubmissionIndex(OsfTestCase):
+
+    def setUp(self):
+        super(TestConferenceSubmissionIndex, self).setUp()
+        self.conference = ConferenceFactory()
+        self.node = ProjectFactory(is_public=True)
+        self.auth = Auth(self.node.creator)
+
+    def get_submissions(self):
+        return list(ConferenceSubmission.find(Q('conference', 'eq', self.conference.endpoint)))
+
+    def test_tagging_adds_submission(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        submissions = self.get_submissions()
+        assert_equal(len(submissions), 1)
+        assert_equal(submissions[0].node, self.node._id)
+        assert_equal(submissions[0].title, self.node.title)
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 1)
+
+    def test_title_change_updates_submission(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        self.node.set_title('Changed', self.auth)
+        self.node.save()
+        assert_equal(self.get_submissions()[0].title, 'Changed')
+
+    def test_making_private_removes_submission(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        self.node.set_privacy('private', self.auth)
+        assert_equal(self.get_submissions(), [])
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 0)
+
+    def test_removing_tag_removes_submission(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        self.node.remove_tag(self.conference.endpoint, self.auth)
+        assert_equal(self.get_submissions(), [])
+
+    def test_mixed_case_endpoint_keeps_lowercase_tag(self):
+        conference = ConferenceFactory(endpoint='MixedCase2015')
+        self.node.add_tag('mixedcase2015', self.auth)
+        self.node.set_title('Changed', self.auth)
+        self.node.save()
+        submissions = list(ConferenceSubmission.find(Q('conference', 'eq', 'MixedCase2015')))
+        assert_equal(len(submissions), 1)
+        assert_equal(submissions[0].title, 'Changed')
+        conference.reload()
+        assert_equal(conference.num_submissions, 1)
+
+    def test_new_conference_indexes_tagged_nodes(self):
+        self.node.add_tag('laterconf', self.auth)
+        conference = ConferenceFactory(endpoint='laterconf')
+        assert_equal(conference.num_submissions, 1)
+        assert_equal(ConferenceSubmission.find(Q('conference', 'eq', 'laterconf')).count(), 1)
+
+    def test_rebuild_submissions(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        ConferenceSubmission.remove()
+        rebuild_submissions(self.conference)
+        assert_equal(len(self.get_submissions()), 1)
+        assert_equal(self.conference.num_submissions, 1)
+
+    def test_conference_data_paginated(self):
+        create_fake_conference_nodes(3, self.conference.endpoint)
+        url = api_url_for('conference_data', meeting=self.conference.endpoint)
+        res = self.app.get(url, {'page': 0, 'size': 2})
+        assert_equal(len(res.json), 2)
+        res = self.app.get(url, {'page': 1, 'size': 2})
+        assert_equal(len(res.json), 1)
+        res = self.app.get(url, {'page': 'first'}, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+
 class TestConferenceIntegration(ContextTestCase):
 
     @mock.patch('website.conferences.views.send_mail')
@@ -35,10 +35,14 @@ class SearchTestCase(OsfTestCase):
         super(SearchTestCase, self).tearDown()
         search.delete_index(elastic_search.INDEX)
         search.create_index(elastic_search.INDEX)
+        settings.ELASTIC_FORCE_REFRESH = self._force_refresh
     def setUp(self):
         super(SearchTestCase, self).setUp()
         elastic_search.INDEX = TEST_INDEX
         settings.ELASTIC_INDEX = TEST_INDEX
+        # Make every write searchable before the test queries for it
+        self._force_refresh = settings.ELASTIC_FORCE_REFRESH
+        settings.ELASTIC_FORCE_REFRESH = True
         search.delete_index(elastic_search.INDEX)
         search.create_index(elastic_search.INDEX)
 
@@ -747,6 +751,83 @@ class TestUserSearchResults(SearchTestCase):
             assert_in(name, were_starfleet_names)
 
 
+class TestIncrementalNodeIndexing(OsfTestCase):
+
+    def setUp(self):
+        super(TestIncrementalNodeIndexing, self).setUp()
+        self.actions = []
+        self.es_patcher = mock.patch('website.search.elastic_search.es')
+        self.bulk_patcher = mock.patch('website.search.elastic_search.helpers.bulk', side_effect=self.bulk)
+        self.mock_es = self.es_patcher.start()
+        self.bulk_patcher.start()
+
+        self.node = ProjectFactory(is_public=True, title='Green Onions')
+        self.file = self.node.get_addon('osfstorage').get_root().append_file('Time Is Tight.mp3')
+        self.mock_es.reset_mock()
+        del self.actions[:]
+
+    def tearDown(self):
+        super(TestIncrementalNodeIndexing, self).tearDown()
+        self.es_patcher.stop()
+        self.bulk_patcher.stop()
+
+    def bulk(self, client, actions, **kwargs):
+        actions = list(actions)
+        self.actions.extend(actions)
+        return len(actions), self.bulk_errors(actions)
+
+    def bulk_errors(self, actions):
+        return []
+
+    def actions_for(self, _id):
+        return [action for action in self.actions if action['_id'] == _id]
+
+    def test_full_reindex_by_default(self):
+        elastic_search.update_node(self.node)
+        node_action, = self.actions_for(self.node._id)
+        assert_equal(node_action.get('_op_type', 'index'), 'index')
+        assert_in('wikis', node_action['_source'])
+        file_action, = self.actions_for(self.file._id)
+        assert_equal(file_action['_op_type'], 'index')
+        assert_equal(file_action['_source']['node_title'], 'Green Onions')
+
+    def test_description_change_skips_files_and_wikis(self):
+        elastic_search.update_node(self.node, saved_fields=['description'])
+        assert_equal(self.actions_for(self.file._id), [])
+        node_action, = self.actions_for(self.node._id)
+        assert_equal(node_action['_op_type'], 'update')
+        assert_not_in('wikis', node_action['doc'])
+
+    def test_title_change_updates_files(self):
+        self.node.title = 'Hip Hug-Her'
+        elastic_search.update_node(self.node, saved_fields=['title'])
+        file_action, = self.actions_for(self.file._id)
+        assert_equal(file_action['_source']['node_title'], 'Hip Hug-Her')
+        node_action, = self.actions_for(self.node._id)
+        assert_equal(node_action['_op_type'], 'update')
+
+    def test_making_private_deletes_node_and_files(self):
+        self.node.is_public = False
+        elastic_search.update_node(self.node, saved_fields=['is_public'])
+        assert_equal(self.actions_for(self.node._id)[0]['_op_type'], 'delete')
+        assert_equal(self.actions_for(self.file._id)[0]['_op_type'], 'delete')
+
+    def test_failed_partial_update_indexes_full_document(self):
+        self.bulk_errors = lambda actions: [
+            {'update': {'_id': action['_id'], 'status': 404}}
+            for action in actions if action.get('_op_type') == 'update'
+        ]
+        elastic_search.update_node(self.node, saved_fields=['description'])
+        assert_true(self.mock_es.index.called)
+        assert_in('wikis', self.mock_es.index.call_args[1]['body'])
+
+    @mock.patch('website.search.elastic_search.settings.ELASTIC_FORCE_REFRESH', False)
+    def test_no_forced_refresh(self):
+        with mock.patch('website.search.elastic_search.helpers.bulk', return_value=(0, [])) as mock_bulk:
+            elastic_search.update_node(self.node, saved_fields=['description'])
+        assert_false(mock_bulk.call_args[1]['refresh'])
+
+
 class TestSearchExceptions(OsfTestCase):
     # Verify that the correct exception is thrown when the connection is lost
 
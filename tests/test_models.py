@@ -18,6 +18,8 @@ from modularodm.exceptions import ValidationError, ValidationValueError
 
 
 from framework.analytics import get_total_activity_count
+from framework.mongo import database
+from framework.mongo.object_cache import LocalSharedBackend
 from framework.exceptions import PermissionsError
 from framework.auth import User, Auth
 from framework.auth import cas
@@ -33,6 +35,7 @@ from website.addons.wiki.model import NodeWikiPage
 from website.exceptions import NodeStateError, TagNotFoundError
 from website.profile.utils import serialize_user
 from website.project.signals import contributor_added
+from website.project.visibility import VisibleNodesCache
 from website.project.model import (
     Node, NodeLog, Pointer, ensure_schemas, has_anonymous_link,
     get_pointer_parent, MetaSchema, DraftRegistration
@@ -833,6 +836,28 @@ class TestUser(OsfTestCase):
         assert_equal(self.user.n_projects_in_common(user2), 1)
         assert_equal(self.user.n_projects_in_common(user3), 0)
 
+    def test_get_n_projects_in_common(self):
+        user2 = UserFactory()
+        user3 = UserFactory()
+        project = ProjectFactory(creator=self.user)
+        project.add_contributor(contributor=user2, auth=self.auth, save=True)
+        other_project = ProjectFactory(creator=self.user)
+        other_project.add_contributor(contributor=user2, auth=self.auth, save=True)
+
+        counts = self.user.get_n_projects_in_common([user2, user3])
+        assert_equal(counts, {user2._id: 2, user3._id: 0})
+
+    def test_n_projects_in_common_updates_on_contributor_changes(self):
+        user2 = UserFactory()
+        project = ProjectFactory(creator=self.user)
+        assert_equal(self.user.n_projects_in_common(user2), 0)
+
+        project.add_contributor(contributor=user2, auth=self.auth, save=True)
+        assert_equal(self.user.n_projects_in_common(user2), 1)
+
+        project.remove_contributor(user2, auth=self.auth)
+        assert_equal(self.user.n_projects_in_common(user2), 0)
+
     def test_user_get_cookie(self):
         user = UserFactory()
         super_secret_key = 'children need maps'
@@ -1565,6 +1590,54 @@ class TestNode(OsfTestCase):
         # Hidden log is not returned
         assert_equal(n_new_logs, n_orig_logs - 1)
 
+    def test_get_visible_descendant_ids_matches_can_view(self):
+        private_child = NodeFactory(parent=self.parent)
+        public_child = NodeFactory(parent=self.parent, is_public=True)
+        grandchild = NodeFactory(parent=private_child)
+        link = PrivateLinkFactory()
+        link.nodes.append(grandchild)
+        link.save()
+        descendants = [self.node, private_child, public_child, grandchild]
+        auths = [
+            None,
+            self.auth,
+            Auth(user=UserFactory()),
+            Auth(user=private_child.creator),
+            Auth(private_key=link.key),
+        ]
+        for auth in auths:
+            assert_equal(
+                self.parent.get_visible_descendant_ids(auth),
+                {node._id for node in descendants if node.can_view(auth)}
+            )
+
+    def test_get_visible_descendant_ids_is_invalidated_by_permission_changes(self):
+        user = UserFactory()
+        assert_equal(self.parent.get_visible_descendant_ids(Auth(user)), set())
+        self.node.add_contributor(user, auth=self.auth, save=True)
+        assert_equal(self.parent.get_visible_descendant_ids(Auth(user)), {self.node._id})
+        self.node.set_privacy('public', auth=self.auth)
+        self.node.remove_contributor(user, auth=self.auth)
+        assert_equal(self.parent.get_visible_descendant_ids(Auth(UserFactory())), {self.node._id})
+
+    def test_visible_nodes_cache_invalidation_is_shared_between_processes(self):
+        shared = LocalSharedBackend()
+        this, other = VisibleNodesCache(shared=shared), VisibleNodesCache(shared=shared)
+        other.set(self.parent._id, ('key',), {self.node._id})
+        this.invalidate_tree(self.parent._id)
+        assert_is_none(other.get(self.parent._id, ('key',)))
+        other.set(self.parent._id, ('key',), {self.node._id})
+        this.invalidate_all()
+        assert_is_none(other.get(self.parent._id, ('key',)))
+
+    def test_get_aggregate_logs_queryset_before(self):
+        for _ in range(3):
+            self.node.add_log('file_added', params={'node': self.node._id}, auth=self.auth)
+        logs = list(self.parent.get_aggregate_logs_queryset(self.auth))
+        last_seen = logs[1]
+        older = list(self.parent.get_aggregate_logs_queryset(self.auth, before=(last_seen.date, last_seen._id)))
+        assert_equal([log._id for log in older], [log._id for log in logs[2:]])
+
     def test_validate_categories(self):
         with assert_raises(ValidationError):
             Node(category='invalid').save()  # an invalid category
@@ -2160,6 +2233,92 @@ class TestNodeUpdate(OsfTestCase):
         assert_equal(len(self.node.logs), original_n_logs + 1)
         assert_equal(self.node.category, new_category)
 
+    def _assert_log_counters(self, node):
+        logs = list(node.logs)
+        assert_equal(node.log_count, len(logs))
+        # Dates read back from the database are rounded to milliseconds
+        assert_less(abs(node.last_logged - logs[-1].date), datetime.timedelta(milliseconds=1))
+        newest_first = sorted(logs, key=lambda log: (log.date, log._id), reverse=True)
+        assert_equal(
+            node.get_recent_log_ids(),
+            [log._id for log in newest_first][:settings.NODE_RECENT_LOG_IDS_SIZE]
+        )
+
+    def test_add_log_updates_log_counters(self):
+        with mock.patch.object(settings, 'NODE_RECENT_LOG_IDS_SIZE', 3):
+            for i in range(4):
+                log = self.node.add_log(NodeLog.TAG_ADDED, params={'tag': str(i)}, auth=self.auth)
+            self.node.reload()
+            self._assert_log_counters(self.node)
+        assert_equal(self.node.recent_log_ids[-1], log._id)
+        assert_less(abs(self.node.date_modified - log.date), datetime.timedelta(milliseconds=1))
+
+    def test_add_log_keeps_concurrent_updates(self):
+        count = self.node.log_count
+        # Another request logs on the node after this instance was loaded
+        database['node'].update({'_id': self.node._id}, {
+            '$inc': {'log_count': 1},
+            '$push': {'recent_log_ids': 'concurrent'},
+        })
+        log = self.node.add_log(NodeLog.TAG_ADDED, params={'tag': 'carp'}, auth=self.auth)
+        assert_equal(self.node.log_count, count + 2)
+        self.node.reload()
+        assert_equal(self.node.log_count, count + 2)
+        assert_equal(self.node.get_recent_log_ids()[:2], [log._id, 'concurrent'])
+
+    def test_add_log_trims_recent_log_ids_in_database(self):
+        # Runs the counter update against the configured database server
+        with mock.patch.object(settings, 'NODE_RECENT_LOG_IDS_SIZE', 2):
+            logs = [
+                self.node.add_log(NodeLog.TAG_ADDED, params={'tag': str(i)}, auth=self.auth)
+                for i in range(3)
+            ]
+        stored = database['node'].find_one({'_id': self.node._id})
+        assert_equal(stored['recent_log_ids'], [logs[1]._id, logs[2]._id])
+        assert_equal(stored['log_count'], len(self.node.logs))
+        assert_less(abs(stored['last_logged'] - logs[2].date), datetime.timedelta(milliseconds=1))
+
+    def test_add_log_recounts_after_concurrent_later_log(self):
+        log_date = datetime.datetime.utcnow()
+        # Another request stored a later log after this instance was loaded
+        later = NodeLog(action=NodeLog.TAG_ADDED, params={'node': self.node._id}, node=self.node)
+        later.date = log_date + datetime.timedelta(minutes=1)
+        later.save()
+        database['node'].update({'_id': self.node._id}, {
+            '$inc': {'log_count': 1},
+            '$set': {'last_logged': later.date},
+        })
+        self.node.add_log(NodeLog.TAG_ADDED, params={'tag': 'carp'}, auth=self.auth, log_date=log_date)
+        self._assert_log_counters(self.node)
+        assert_equal(self.node.get_recent_log_ids()[0], later._id)
+
+    def test_add_log_counts_uncounted_node(self):
+        self.node.log_count = None
+        self.node.recent_log_ids = []
+        self.node.save()
+        self.node.add_log(NodeLog.TAG_ADDED, params={'tag': 'carp'}, auth=self.auth)
+        self._assert_log_counters(self.node)
+
+    def test_add_log_dated_before_recent_logs(self):
+        log = self.node.add_log(
+            NodeLog.TAG_ADDED, params={'tag': 'carp'}, auth=self.auth,
+            log_date=datetime.datetime(2000, 1, 1),
+        )
+        self._assert_log_counters(self.node)
+        assert_equal(self.node.get_recent_log_ids()[-1], log._id)
+
+    def test_log_counters_of_uncounted_node(self):
+        self.node.log_count = None
+        assert_equal(self.node.get_log_count(), len(self.node.logs))
+        assert_less(abs(self.node.get_last_logged() - self.node.logs[-1].date), datetime.timedelta(milliseconds=1))
+        assert_equal(self.node.get_recent_log_ids()[0], self.node.logs[-1]._id)
+
+    def test_fork_and_template_log_counters(self):
+        fork = self.parent.fork_node(self.auth)
+        self._assert_log_counters(fork)
+        templated = self.parent.use_as_template(self.auth)
+        self._assert_log_counters(templated)
+
     # TODO: test permissions, non-writable fields
 
 
@@ -3510,6 +3669,96 @@ class TestRoot(OsfTestCase):
                 assert_in(project.parent._id, parent_list)
 
 
+class TestAncestors(OsfTestCase):
+    def setUp(self):
+        super(TestAncestors, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user)
+        self.child = NodeFactory(parent=self.project, creator=self.user)
+        self.grandchild = NodeFactory(parent=self.child, creator=self.user)
+
+    def test_top_level_project_has_no_ancestors(self):
+        assert_equal(list(self.project.ancestors), [])
+
+    def test_descendants_have_ancestors_root_first(self):
+        assert_equal(list(self.child.ancestors), [self.project._id])
+        assert_equal(list(self.grandchild.ancestors), [self.project._id, self.child._id])
+        assert_equal(self.grandchild.depth, 2)
+
+    def test_get_primary_descendants(self):
+        pointed = ProjectFactory()
+        self.project.add_pointer(pointed, auth=self.auth)
+        assert_equal(
+            {node._id for node in self.project.get_primary_descendants()},
+            {self.child._id, self.grandchild._id}
+        )
+
+    def test_ancestors_follow_new_parent(self):
+        other = ProjectFactory(creator=self.user)
+        self.project.nodes.remove(self.child)
+        self.project.save()
+        other.nodes.append(self.child)
+        other.save()
+        self.child.save()
+        self.grandchild.reload()
+        assert_equal(list(self.child.ancestors), [other._id])
+        assert_equal(list(self.grandchild.ancestors), [other._id, self.child._id])
+
+    def test_fork_descendants_have_fork_ancestors(self):
+        fork = self.project.fork_node(auth=self.auth)
+        fork_child = fork.nodes[0]
+        fork_grandchild = fork_child.nodes[0]
+        assert_equal(list(fork.ancestors), [])
+        assert_equal(list(fork_child.ancestors), [fork._id])
+        assert_equal(list(fork_grandchild.ancestors), [fork._id, fork_child._id])
+
+    def test_registration_descendants_have_registration_ancestors(self):
+        registration = RegistrationFactory(project=self.project)
+        registration_child = registration.nodes[0]
+        registration_grandchild = registration_child.nodes[0]
+        assert_equal(list(registration_child.ancestors), [registration._id])
+        assert_equal(list(registration_grandchild.ancestors), [registration._id, registration_child._id])
+
+    def test_has_permission_on_children_uses_descendants(self):
+        user = UserFactory()
+        self.grandchild.add_contributor(user, permissions=['read', 'write'], auth=self.auth, save=True)
+        assert_true(self.project.has_permission_on_children(user, 'write'))
+        self.grandchild.remove_node(auth=self.auth)
+        assert_false(self.project.has_permission_on_children(user, 'write'))
+
+    def test_has_permission_on_children_skips_nodes_below_deleted_node(self):
+        user = UserFactory()
+        self.grandchild.add_contributor(user, permissions=['read', 'write'], auth=self.auth, save=True)
+        self.child.is_deleted = True
+        self.child.save()
+        assert_false(self.project.has_permission_on_children(user, 'write'))
+        assert_false(self.project.has_permission_on_children(user, 'read'))
+
+    def test_has_permission_on_children_through_admin_parent(self):
+        user = UserFactory()
+        self.child.add_contributor(user, permissions=['read', 'write', 'admin'], auth=self.auth, save=True)
+        self.grandchild.reload()
+        assert_true(self.project.has_permission_on_children(user, 'read'))
+        assert_true(self.grandchild.is_admin_parent(user))
+
+    def test_fall_back_to_parent_pointers_without_ancestors(self):
+        user = UserFactory()
+        self.project.add_contributor(user, permissions=['read', 'write', 'admin'], auth=self.auth, save=True)
+        # Simulate nodes saved before the field existed
+        database['node'].update({}, {'$unset': {'ancestors': ''}}, multi=True)
+        for node in (self.project, self.child, self.grandchild):
+            node.reload()
+        assert_equal(self.grandchild.parents, [self.child, self.project])
+        assert_equal(self.grandchild.depth, 2)
+        assert_true(self.grandchild.is_admin_parent(user))
+        assert_equal(
+            {node._id for node in self.project.get_primary_descendants()},
+            {self.child._id, self.grandchild._id}
+        )
+        assert_equal(len(list(self.project.node_and_primary_descendants())), 3)
+
+
 class TestTemplateNode(OsfTestCase):
 
     def setUp(self):
@@ -3862,6 +4111,20 @@ class TestForkNode(OsfTestCase):
         fork = self.project.fork_node(self.auth)
         assert_false(fork.is_public)
 
+    def test_fork_clones_logs_in_batches(self):
+        for i in range(5):
+            self.project.add_log(NodeLog.TAG_ADDED, params={'tag': str(i)}, auth=self.auth)
+        with mock.patch.object(settings, 'NODE_LOG_CLONE_BATCH_SIZE', 2):
+            fork = self.project.fork_node(self.auth)
+        original_logs = list(self.project.logs)
+        cloned_logs = list(fork.logs)[:-1]
+        assert_equal(
+            [(log.action, log.params, log.date, log.user, log.original_node) for log in original_logs],
+            [(log.action, log.params, log.date, log.user, log.original_node) for log in cloned_logs],
+        )
+        assert_true(all(log.node == fork for log in cloned_logs))
+        assert_false({log._id for log in original_logs} & {log._id for log in cloned_logs})
+
     def test_fork_log_has_correct_log(self):
         fork = self.project.fork_node(self.auth)
         last_log = list(fork.logs)[-1]
@@ -4197,6 +4460,18 @@ class TestNodeLog(OsfTestCase):
         log = NodeLogFactory()
         assert_true(log.action)
 
+    def test_clone_logs(self):
+        original = ProjectFactory()
+        node = ProjectFactory()
+        n_logs = len(original.logs)
+        assert_equal(NodeLog.clone_logs(original, node, batch_size=1), n_logs)
+        assert_equal(len(original.logs), n_logs)
+        assert_equal(len(node.logs), n_logs * 2)
+        assert_equal(
+            [log.action for log in original.logs],
+            [log.action for log in node.logs if log.original_node == original],
+        )
+
     def test_render_log_contributor_unregistered(self):
         node = NodeFactory()
         name, email = fake.name(), fake.email()
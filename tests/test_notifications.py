@@ -1,5 +1,6 @@
 import collections
 import datetime
+import time
 import mock
 import pytz
 from babel import dates, Locale
@@ -12,8 +13,10 @@ from nose.tools import *  # noqa PEP8 asserts
 from framework.auth import Auth
 from framework.auth.core import User
 from framework.guid.model import Guid
+from framework.mongo import database, handlers
 
 from website.notifications.tasks import get_users_emails, send_users_email, group_by_node, remove_notifications
+from website.notifications.tasks import get_checkpoint, set_checkpoint
 from website.notifications import constants
 from website.notifications.model import NotificationDigest
 from website.notifications.model import NotificationSubscription
@@ -21,7 +24,7 @@ from website.notifications import emails
 from website.notifications import utils
 from website.project.model import Node, Comment
 from website.project.signals import contributor_removed, node_deleted
-from website import mails
+from website import mails, settings
 from website.util import api_url_for
 from website.util import web_url_for
 
@@ -1130,6 +1133,39 @@ class TestSendEmails(OsfTestCase):
         url = emails.get_settings_url(self.user._id, self.user)
         assert_equal(url, web_url_for('user_notifications', _absolute=True))
 
+    @mock.patch('website.mails.render_message', return_value='Rendered')
+    def test_store_emails_renders_once_per_timezone_and_locale(self, mock_render):
+        recipients = [
+            factories.UserFactory(timezone='Etc/UTC', locale='en_US'),
+            factories.UserFactory(timezone='Etc/UTC', locale='en_US'),
+            factories.UserFactory(timezone='America/New_York', locale='en_US'),
+        ]
+        timestamp = datetime.datetime.utcnow()
+        emails.store_emails(
+            [recipient._id for recipient in recipients] + [self.user._id],
+            'email_digest', 'comments', self.user, self.node, timestamp
+        )
+        assert_equal(mock_render.call_count, 2)
+        digests = NotificationDigest.find(Q('event', 'eq', 'comments'))
+        assert_equal(
+            sorted(digest.user_id for digest in digests),
+            sorted(recipient._id for recipient in recipients)
+        )
+        for digest in digests:
+            assert_equal(digest.message, 'Rendered')
+            assert_equal(digest.send_type, 'email_digest')
+            assert_equal(digest.node_lineage, [self.project._id, self.node._id])
+
+    def test_store_emails_none_notification_type(self):
+        emails.store_emails([factories.UserFactory()._id], 'none', 'comments', self.user, self.node,
+                            datetime.datetime.utcnow())
+        assert_equal(NotificationDigest.find().count(), 0)
+
+    def test_get_lineage_readers_includes_parent_admins(self):
+        readers = emails.get_lineage_readers(emails.get_lineage_nodes(self.node))
+        assert_in(self.project.creator._id, readers[self.node._id])
+        assert_not_in(self.user._id, readers[self.node._id])
+
     def test_get_node_lineage(self):
         node_lineage = emails.get_node_lineage(self.node)
         assert_equal(node_lineage, [self.project._id, self.node._id])
@@ -1238,7 +1274,7 @@ class TestSendDigest(OsfTestCase):
         ]
 
         assert_equal(len(user_groups), 2)
-        assert_equal(user_groups, expected)
+        assert_equal(user_groups, sorted(expected, key=lambda group: group['user_id']))
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
@@ -1289,7 +1325,7 @@ class TestSendDigest(OsfTestCase):
         ]
 
         assert_equal(len(user_groups), 2)
-        assert_equal(user_groups, expected)
+        assert_equal(user_groups, sorted(expected, key=lambda group: group['user_id']))
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
@@ -1321,7 +1357,88 @@ class TestSendDigest(OsfTestCase):
         assert_equal(kwargs['name'], user.fullname)
         message = group_by_node(user_groups[last_user_index]['info'])
         assert_equal(kwargs['message'], message)
-        assert_equal(kwargs['callback'], remove_notifications(email_notification_ids=email_notification_ids))
+        assert_equal(NotificationDigest.find(Q('_id', 'in', email_notification_ids)).count(), 0)
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_deletes_only_sent_digests(self, mock_send_mail):
+        send_type = 'email_transactional'
+        failing_user = factories.UserFactory()
+        mock_send_mail.side_effect = lambda **kwargs: self._fail_for(failing_user, **kwargs)
+        digests = [
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            )
+            for user in [self.user_1, self.user_2, failing_user]
+        ]
+        stats = send_users_email(send_type)
+        remaining = [digest.user_id for digest in NotificationDigest.find(Q('send_type', 'eq', send_type))]
+        assert_equal(remaining, [failing_user._id])
+        assert_equal(stats['emails'], 2)
+        assert_equal(stats['failures'], 1)
+        assert_equal(stats['digests'], len(digests))
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_within_celery_pool_bounds(self, mock_send_mail):
+        send_type = 'email_transactional'
+        for _ in range(settings.NOTIFICATION_DIGEST_CONCURRENCY * 2):
+            factories.NotificationDigestFactory(
+                user_id=factories.UserFactory()._id,
+                send_type=send_type,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            )
+        # Sized like a Celery worker's pool, connected to the test database
+        pool = handlers.ClientPool(
+            max_clients=settings.CELERY_DB_POOL_MAX_CLIENTS,
+            sockets_per_client=settings.CELERY_DB_POOL_SOCKETS_PER_CLIENT,
+            acquire_timeout=1,
+            client_factory=handlers.CLIENT_POOL._client_factory,
+        )
+
+        def send_mail(**kwargs):
+            # Rendering a digest reads from the database on the email thread
+            database['user'].find_one({'username': kwargs['to_addr']})
+            time.sleep(0.01)
+        mock_send_mail.side_effect = send_mail
+
+        with mock.patch.object(handlers, 'CLIENT_POOL', pool):
+            stats = send_users_email(send_type)
+            assert_equal(stats['failures'], 0)
+            # Only the task's own lease is still held
+            assert_equal(pool.in_use, 1)
+            pool.release()
+
+    def _fail_for(self, failing_user, **kwargs):
+        if kwargs['to_addr'] == failing_user.username:
+            raise Exception('SMTP unavailable')
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_in_chunks_resumes_from_checkpoint(self, mock_send_mail):
+        send_type = 'email_digest'
+        users = sorted([self.user_1, self.user_2, factories.UserFactory()], key=lambda user: user._id)
+        for user in users:
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            )
+        # A previous run crashed after sending to the first user
+        set_checkpoint(send_type, users[0]._id)
+        with mock.patch('website.notifications.tasks.settings.NOTIFICATION_DIGEST_CHUNK_SIZE', 1):
+            stats = send_users_email(send_type)
+        assert_equal(
+            [kwargs['to_addr'] for _, kwargs in mock_send_mail.call_args_list],
+            [user.username for user in users[1:]]
+        )
+        assert_equal(stats['users'], 2)
+        assert_is_none(get_checkpoint(send_type))
 
     def test_remove_sent_digest_notifications(self):
         d = factories.NotificationDigestFactory(
@@ -7,6 +7,7 @@ import itertools
 import random
 import copy
 import re
+import threading
 
 import celery
 import mock  # noqa
@@ -19,6 +20,7 @@ from modularodm import Q
 from scripts import cleanup_failed_registrations as scripts
 
 from framework.auth import Auth
+from framework.exceptions import HTTPError
 from framework.celery_tasks import handlers
 
 from website.archiver import (
@@ -145,6 +147,18 @@ FILE_TREE = {
     ],
 }
 
+def list_folder(file_tree, path):
+    """Return the listing WaterButler would give of the folder at ``path`` in ``file_tree``."""
+    stack = [file_tree]
+    while stack:
+        folder = stack.pop()
+        if folder['path'] == path:
+            return [
+                {key: value for key, value in child.items() if key != 'children'}
+                for child in folder['children']
+            ]
+        stack.extend(child for child in folder['children'] if child['kind'] == 'folder')
+
 class MockAddon(mock.MagicMock, StorageAddonBase):
 
     complete = True
@@ -152,6 +166,9 @@ class MockAddon(mock.MagicMock, StorageAddonBase):
     def _get_file_tree(self, user, version):
         return FILE_TREE
 
+    def _list_folder(self, filenode, metadata_url):
+        return list_folder(FILE_TREE, filenode['path'])
+
     def after_register(self, *args):
         return None, None
 
@@ -382,6 +399,67 @@ class TestStorageAddonBase(ArchiverTestCase):
     def _test_addon(self, addon_short_name):
         self._test__get_file_tree(addon_short_name)
 
+    def test_get_file_tree_lists_folders_concurrently(self):
+        file_tree = {
+            'path': '/',
+            'kind': 'folder',
+            'name': '',
+            'children': [
+                {'path': '/a/', 'kind': 'folder', 'name': 'a', 'children': [
+                    {'path': '/a/1', 'kind': 'file', 'name': '1', 'size': 1},
+                ]},
+                {'path': '/b/', 'kind': 'folder', 'name': 'b', 'children': [
+                    {'path': '/b/c/', 'kind': 'folder', 'name': 'c', 'children': []},
+                ]},
+            ],
+        }
+        listing = threading.Event()
+        listed = []
+        def _list_folder(filenode, metadata_url):
+            listed.append(filenode['path'])
+            if len(listed) == 2:
+                # Only returns if another folder is listed meanwhile
+                assert_true(listing.wait(5))
+            elif len(listed) == 3:
+                listing.set()
+            return list_folder(file_tree, filenode['path'])
+        addon = self.src.get_or_add_addon('dropbox', auth=self.auth)
+        with mock.patch.object(addon, '_list_folder', side_effect=_list_folder):
+            result = addon._get_file_tree({'path': '/', 'kind': 'folder', 'name': ''}, self.user)
+        assert_equal(result, file_tree)
+
+    def test_get_file_tree_stops_at_first_error(self):
+        addon = self.src.get_or_add_addon('dropbox', auth=self.auth)
+        error = HTTPError(400, data={'error': 'nope'})
+        with mock.patch.object(addon, '_list_folder', side_effect=error):
+            with assert_raises(HTTPError) as cm:
+                addon._get_file_tree(user=self.user)
+        assert_is(cm.exception, error)
+
+    @httpretty.activate
+    def test_list_folder_retries_server_errors(self):
+        addon = self.src.get_or_add_addon('dropbox', auth=self.auth)
+        metadata_url = addon._get_metadata_url(self.user)
+        httpretty.register_uri(httpretty.GET, metadata_url, responses=[
+            httpretty.Response(body='{}', status=503),
+            httpretty.Response(body=json.dumps(self.RESP_MAP['/qwerty']), status=200),
+        ])
+        with mock.patch('website.addons.base.crawler.time.sleep') as mock_sleep:
+            children = addon._list_folder({'path': '/qwerty'}, metadata_url)
+        assert_equal(children, self.RESP_MAP['/qwerty']['data'])
+        mock_sleep.assert_called_once_with(settings.ARCHIVER_CRAWL_BACKOFF)
+
+    @httpretty.activate
+    def test_list_folder_gives_up_after_retries(self):
+        addon = self.src.get_or_add_addon('dropbox', auth=self.auth)
+        metadata_url = addon._get_metadata_url(self.user)
+        httpretty.register_uri(httpretty.GET, metadata_url, body='{"message": "down"}', status=503)
+        with mock.patch('website.addons.base.crawler.time.sleep') as mock_sleep:
+            with assert_raises(HTTPError) as cm:
+                addon._list_folder({'path': '/'}, metadata_url)
+        assert_equal(cm.exception.code, 503)
+        assert_equal(mock_sleep.call_count, settings.ARCHIVER_CRAWL_RETRIES)
+
     def test_addons(self):
         #  Test that each addon in settings.ADDONS_ARCHIVABLE other than wiki implementes the StorageAddonBase interface
         for addon in [a for a in settings.ADDONS_ARCHIVABLE if a not in ['wiki']]:
@@ -446,14 +524,9 @@ class TestArchiverTasks(ArchiverTestCase):
     def test_archive_node_does_not_archive_empty_addons(self, mock_archive_addon):
         with mock.patch.object(self.src, 'get_addon') as mock_get_addon:
             mock_addon = MockAddon()
-            def empty_file_tree(user, version):
-                return {
-                    'path': '/',
-                    'kind': 'folder',
-                    'name': 'Fake',
-                    'children': []
-                }
-            setattr(mock_addon, '_get_file_tree', empty_file_tree)
+            def empty_folder(filenode, metadata_url):
+                return []
+            setattr(mock_addon, '_list_folder', empty_folder)
             mock_get_addon.return_value = mock_addon
             results = [stat_addon(addon, self.archive_job._id) for addon in ['osfstorage']]
             archive_node(results, job_pk=self.archive_job._id)
@@ -934,6 +1007,30 @@ class TestArchiverUtils(ArchiverTestCase):
         for patch in patches.values():
             patch.stop()
 
+    def test_file_map_indexes_wide_trees(self):
+        file_tree = file_tree_factory(2, 500, 1)
+        file_map = archiver_utils.FileMap(file_tree)
+        files = [item for item in file_tree['children'] if item['kind'] == 'file']
+        assert_equal(len(file_map), 1000)
+        assert_equal([value for _, value in file_map][:500], files)
+        target = files[250]
+        assert_is(file_map.find(target['extra']['hashes']['sha256'], target['name']), target)
+        assert_is_none(file_map.find(target['extra']['hashes']['sha256'], 'not the name'))
+        assert_is_none(file_map.find('not a hash', target['name']))
+
+    def test_file_map_cache_is_bounded(self):
+        nodes = [factories.NodeFactory() for _ in range(3)]
+        file_maps = archiver_utils.FileMapCache(max_entries=2)
+        with mock.patch.object(StorageAddonBase, '_get_file_tree', mock.Mock(return_value=file_tree_factory(1, 1, 1))) as mock_file_tree:
+            for node in nodes:
+                file_maps.get(node)
+            assert_equal(mock_file_tree.call_count, 3)
+            file_maps.get(nodes[2])
+            assert_equal(mock_file_tree.call_count, 3)
+            # The least recently used map was evicted
+            file_maps.get(nodes[0])
+            assert_equal(mock_file_tree.call_count, 4)
+
 
 class TestArchiverListeners(ArchiverTestCase):
 
@@ -819,6 +819,25 @@ class TestProjectViews(OsfTestCase):
         assert_equal(res.json['page'], 1)
         assert_equal(res.json['pages'], 2)
 
+    def test_get_logs_with_cursor(self):
+        for _ in range(12):
+            self.project.add_log('file_added', params={'node': self.project._id}, auth=self.consolidate_auth1)
+
+        self.project.save()
+        url = self.project.api_url_for('get_logs')
+        res = self.app.get(url, {'cursor': '', 'count': 10}, auth=self.auth)
+        assert_equal(len(res.json['logs']), 10)
+        assert_is_not_none(res.json['next_cursor'])
+        res = self.app.get(url, {'cursor': res.json['next_cursor'], 'count': 10}, auth=self.auth)
+        # 1 project create log, 1 add contributor log, then 12 generated logs
+        assert_equal(len(res.json['logs']), 4)
+        assert_is_none(res.json['next_cursor'])
+
+    def test_get_logs_invalid_cursor(self):
+        url = self.project.api_url_for('get_logs')
+        res = self.app.get(url, {'cursor': 'invalid'}, auth=self.auth, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
     def test_logs_private(self):
         """Add logs to a public project, then to its private component. Get
         the ten most recent logs; assert that ten logs are returned and that
@@ -3,12 +3,11 @@ import glob
 import importlib
 import mimetypes
 import os
-from time import sleep
 
 from bson import ObjectId
+import furl
 from mako.lookup import TemplateLookup
 import markupsafe
-import requests
 
 from modularodm import fields
 from modularodm import Q
@@ -23,7 +22,7 @@ from framework.mongo import StoredObject
 from framework.routing import process_rules
 
 from website import settings
-from website.addons.base import serializer, logger
+from website.addons.base import serializer, logger, crawler
 from website.project.model import Node, User
 from website.util import waterbutler_url_for
 
@@ -754,10 +753,20 @@ class StorageAddonBase(object):
             name = name + ": {folder}".format(folder=folder_name)
         return name
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _get_root_filenode(self):
+        return {
+            'path': '/',
+            'kind': 'folder',
+            'name': self.root_node.name,
+        }
+
+    def _get_metadata_url(self, user, cookie=None, version=None):
+        """Return the URL of WaterButler's metadata route for this addon,
+        without the path of a file or folder.
+        """
         kwargs = dict(
             provider=self.config.short_name,
-            path=filenode.get('path', ''),
+            path='',
             node=self.owner,
             user=user,
             view_only=True,
@@ -766,40 +775,52 @@ class StorageAddonBase(object):
             kwargs['cookie'] = cookie
         if version:
             kwargs['version'] = version
-        metadata_url = waterbutler_url_for(
+        return waterbutler_url_for(
             'metadata',
             **kwargs
         )
-        res = requests.get(metadata_url)
+
+    def _list_folder(self, filenode, metadata_url):
+        """Get the metadata of the contents of a folder, see `crawler.fetch`
+
+        :param dict filenode: The folder's metadata
+        :param str metadata_url: As returned by `_get_metadata_url`
+        """
+        url = furl.furl(metadata_url)
+        url.args['path'] = filenode.get('path', '')
+        res = crawler.fetch(url.url, self.config.short_name)
         if res.status_code != 200:
             raise HTTPError(res.status_code, data={
                 'error': res.json(),
             })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
         return res.json().get('data', [])
 
+    def _walk_file_tree(self, visit, filenode=None, user=None, cookie=None, version=None):
+        """List filenode and the folders below it, several at a time.
+        See `crawler.FileTreeCrawler.crawl` for ``visit``.
+        """
+        filenode = filenode or self._get_root_filenode()
+        if not crawler.needs_listing(filenode):
+            return
+        # Built once here: it may need the user's session or the current request
+        metadata_url = self._get_metadata_url(user, cookie=cookie, version=version)
+        limits = crawler.get_limits(self.config.short_name)
+        crawler.FileTreeCrawler(
+            lambda folder: self._list_folder(folder, metadata_url),
+            concurrency=limits['concurrency'],
+        ).crawl(filenode, visit)
+
     def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
         """
-        Recursively get file metadata
+        Get the file metadata of filenode, with the contents of every folder below it
         """
-        filenode = filenode or {
-            'path': '/',
-            'kind': 'folder',
-            'name': self.root_node.name,
-        }
-        if filenode.get('kind') == 'file':
-            return filenode
-        elif 'size' in filenode:
-            return filenode
-        kwargs = {
-            'version': version,
-            'cookie': cookie,
-        }
-        filenode['children'] = [
-            self._get_file_tree(child, user, cookie=cookie)
-            for child in self._get_fileobj_child_metadata(filenode, user, **kwargs)
-        ]
+        filenode = filenode or self._get_root_filenode()
+
+        def visit(folder, children):
+            folder['children'] = children
+            return [child for child in children if crawler.needs_listing(child)]
+
+        self._walk_file_tree(visit, filenode, user=user, cookie=cookie, version=version)
         return filenode
 
 class AddonOAuthNodeSettingsBase(AddonNodeSettingsBase):
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Concurrent, rate-limited walking of storage addons' file trees through
+WaterButler, see `StorageAddonBase._walk_file_tree`.
+
+Folders are listed on a pool of worker threads, so that walking a tree takes
+roughly as many round trips as it is deep rather than one per folder. Requests
+share WaterButler's keep-alive session, are limited per provider by a token
+bucket and are retried with exponential backoff when WaterButler cannot be
+reached or is overloaded. The limits are configured by the
+``settings.ARCHIVER_CRAWL_*`` settings.
+"""
+
+import sys
+import time
+import Queue
+import logging
+import threading
+
+import requests
+
+from website import settings
+from website.util import waterbutler
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited, or an error on WaterButler's or the provider's side
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def needs_listing(filenode):
+    """Whether the contents of ``filenode`` have to be requested from WaterButler."""
+    return filenode.get('kind') != 'file' and 'size' not in filenode
+
+
+class TokenBucket(object):
+    """Allows ``rate`` acquisitions per second on average, and bursts of up
+    to ``capacity`` after a pause.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_limits(provider):
+    limits = {
+        'concurrency': settings.ARCHIVER_CRAWL_CONCURRENCY,
+        'rate': settings.ARCHIVER_CRAWL_RATE,
+        'burst': settings.ARCHIVER_CRAWL_BURST,
+    }
+    limits.update(settings.ARCHIVER_CRAWL_PROVIDER_LIMITS.get(provider, {}))
+    return limits
+
+
+def get_bucket(provider):
+    """Return the bucket shared by every crawl of ``provider`` in this process."""
+    with _buckets_lock:
+        if provider not in _buckets:
+            limits = get_limits(provider)
+            _buckets[provider] = TokenBucket(limits['rate'], limits['burst'])
+        return _buckets[provider]
+
+
+def fetch(url, provider, retries=None, backoff=None):
+    """GET ``url`` from WaterButler within ``provider``'s rate limit, retrying
+    failed connections and responses in `RETRY_STATUSES`.
+
+    :return: The last response received
+    :raises requests.exceptions.RequestException: If the last attempt failed to connect
+    """
+    retries = settings.ARCHIVER_CRAWL_RETRIES if retries is None else retries
+    backoff = settings.ARCHIVER_CRAWL_BACKOFF if backoff is None else backoff
+    bucket = get_bucket(provider)
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            response = waterbutler.get(url)
+        except requests.exceptions.RequestException as e:
+            if attempt == retries:
+                raise
+            reason = e.__class__.__name__
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            reason = response.status_code
+        delay = backoff * 2 ** attempt
+        # The url is not logged, it contains the user's cookie
+        logger.warning('Listing a {} folder failed ({}), retrying in {:.1f}s'.format(provider, reason, delay))
+        time.sleep(delay)
+
+
+class FileTreeCrawler(object):
+    """Lists the folders of a file tree on a pool of worker threads.
+
+    :param callable list_folder: Returns the metadata of a folder's contents, given the folder's
+    :param int concurrency: Number of folders listed at once
+    """
+
+    def __init__(self, list_folder, concurrency):
+        self.list_folder = list_folder
+        self.concurrency = concurrency
+
+    def crawl(self, root, visit):
+        """List ``root`` and every folder below it that ``visit`` asks for.
+
+        ``visit(folder, children)`` is called with the metadata of each folder
+        and its contents as soon as it is listed, one call at a time, and
+        returns the children to list next. The first error raised by either
+        stops the crawl and is re-raised once the folders being listed are done.
+        """
+        queue = Queue.Queue()
+        visit_lock = threading.Lock()
+        errors = []
+
+        def work():
+            while True:
+                folder = queue.get()
+                if folder is None:
+                    return
+                try:
+                    if not errors:
+                        children = self.list_folder(folder)
+                        with visit_lock:
+                            for child in visit(folder, children):
+                                queue.put(child)
+                except Exception:
+                    errors.append(sys.exc_info())
+                finally:
+                    queue.task_done()
+
+        queue.put(root)
+        workers = [threading.Thread(target=work) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        queue.join()
+        for worker in workers:
+            queue.put(None)
+        for worker in workers:
+            worker.join()
+        if errors:
+            exc_type, exc_value, exc_tb = errors[0]
+            raise exc_type, exc_value, exc_tb
@@ -38,6 +38,7 @@ from website.project.decorators import must_be_contributor_or_public, must_be_va
 from website.project.model import DraftRegistration, MetaSchema
 from website.project.utils import serialize_node
 from website.util import rubeus
+from website.util import waterbutler
 
 # import so that associated listener is instantiated and gets emails
 from website.notifications.events.files import FileEvent  # noqa
@@ -427,6 +428,18 @@ def create_waterbutler_log(payload, **kwargs):
     return {'status': 'success'}
 
 
+@file_signals.file_updated.connect
+def invalidate_waterbutler_metadata(self, node, user, event_type, payload):
+    """Drop the cached WaterButler metadata of every provider the change touched."""
+    providers = {(node._id, payload.get('provider'))}
+    for bundle in ('source', 'destination'):
+        if payload.get(bundle):
+            providers.add((payload[bundle]['nid'], payload[bundle]['provider']))
+    for node_id, provider in providers:
+        if provider:
+            waterbutler.METADATA_CACHE.invalidate(node_id, provider)
+
+
 @file_signals.file_updated.connect
 def addon_delete_file_node(self, node, user, event_type, payload):
     """ Get addon StoredFileNode(s), move it into the TrashedFileNode collection
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import httplib as http
 
+import furl
 from modularodm import fields
 
 from framework.auth.decorators import Auth
@@ -106,12 +107,12 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
                 auth=auth,
             )
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _list_folder(self, filenode, metadata_url):
         try:
-            return super(AddonDataverseNodeSettings, self)._get_fileobj_child_metadata(filenode, user, cookie=cookie, version=version)
+            return super(AddonDataverseNodeSettings, self)._list_folder(filenode, metadata_url)
         except HTTPError as e:
             # The Dataverse API returns a 404 if the dataset has no published files
-            if e.code == http.NOT_FOUND and version == 'latest-published':
+            if e.code == http.NOT_FOUND and furl.furl(metadata_url).args.get('version') == 'latest-published':
                 return []
             raise
 
@@ -3,6 +3,7 @@ import mock
 
 from tests.base import get_default_metaschema
 from framework.auth.decorators import Auth
+from framework.exceptions import HTTPError
 
 from website.addons.base.testing import models
 
@@ -43,6 +44,18 @@ class TestNodeSettings(models.OAuthAddonNodeSettingsTestSuiteMixin, utils.Datave
         )
         assert_false(registration.has_addon('dataverse'))
 
+    @mock.patch('website.addons.base.crawler.fetch')
+    def test_file_tree_of_dataset_without_published_files(self, mock_fetch):
+        mock_fetch.return_value = mock.Mock(status_code=404, json=mock.Mock(return_value={}))
+        file_tree = self.node_settings._get_file_tree(user=self.user, version='latest-published')
+        assert_equal(file_tree['children'], [])
+
+    @mock.patch('website.addons.base.crawler.fetch')
+    def test_file_tree_of_missing_draft_raises(self, mock_fetch):
+        mock_fetch.return_value = mock.Mock(status_code=404, json=mock.Mock(return_value={}))
+        with assert_raises(HTTPError):
+            self.node_settings._get_file_tree(user=self.user, version='latest')
+
     ## Overrides ##
 
     def test_create_log(self):
@@ -47,7 +47,10 @@ class OsfStorageNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
         if not self.root_node:
             self.on_add()
 
-        clone.root_node = files_utils.copy_files(self.get_root(), clone.owner).stored_object
+        def progress(copied):
+            logger.info('Copied {} files and folders of {} to fork {}'.format(copied, node._id, fork._id))
+
+        clone.root_node = files_utils.copy_files(self.get_root(), clone.owner, progress=progress).stored_object
         clone.save()
 
         return clone, None
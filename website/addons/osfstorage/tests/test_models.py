@@ -15,6 +15,7 @@ from modularodm import exceptions as modm_errors
 
 
 from website.files import models
+from website.files import utils as files_utils
 from website.addons.osfstorage import utils
 from website.addons.osfstorage import settings
 from website.files.exceptions import FileNodeCheckedOutError
@@ -160,6 +161,56 @@ class TestOsfstorageFileNode(StorageTestCase):
             for x in xrange(100)
         ], list(self.node_settings.get_root().children))
 
+    def test_ancestors(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        assert_equal(list(root.ancestors), [])
+        assert_equal(list(folder.ancestors), [root._id])
+        assert_equal(list(child.ancestors), [root._id, folder._id])
+
+    def test_ancestors_updated_on_move(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_folder('Nested').append_file('Carp')
+        move_to = root.append_folder('Sky')
+
+        folder.move_under(move_to)
+        child.reload()
+
+        assert_equal(list(child.ancestors), [root._id, move_to._id, folder._id, child.parent._id])
+        assert_equal(child.materialized_path, '/Sky/Cloud/Nested/Carp')
+
+    def test_get_lineage(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        assert_equal(child.get_lineage(), [child, folder, root])
+        assert_equal(root.get_lineage(), [root])
+
+    def test_get_lineage_without_stored_ancestors(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        child.stored_object.ancestors = []
+        assert_equal(child.get_lineage(), [child, folder, root])
+        assert_equal(child.materialized_path, '/Cloud/Carp')
+
+    def test_serialize_children(self):
+        root = self.node_settings.get_root()
+        root.append_folder('Cloud')
+        root.append_file('Empty')
+        record = root.append_file('Carp')
+        for _ in range(2):
+            record.versions.append(factories.FileVersionFactory())
+        record.checkout = self.user
+        record.save()
+
+        assert_equal(
+            root.serialize_children(),
+            [child.serialize() for child in root.children]
+        )
+
     def test_download_count_file_defaults(self):
         child = self.node_settings.get_root().append_file('Test')
         assert_equals(child.get_download_count(), 0)
@@ -326,6 +377,42 @@ class TestOsfstorageFileNode(StorageTestCase):
     def test_copy_folder_across_nodes(self):
         pass
 
+    @mock.patch('website.files.utils.settings.FILE_COPY_BATCH_SIZE', 2)
+    def test_copy_folder_copies_tree(self):
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        carp = folder.append_file('Carp')
+        version = factories.FileVersionFactory()
+        carp.versions.append(version)
+        carp.save()
+        nested = folder.append_folder('Nested')
+        for name in ('One', 'Two', 'Three'):
+            nested.append_file(name)
+        copy_to = self.node_settings.get_root().append_folder('Sky')
+        progress = mock.Mock()
+
+        copied = files_utils.copy_files(folder, self.node, parent=copy_to, progress=progress)
+
+        assert_not_equal(copied, folder)
+        assert_equal(copied.parent, copy_to)
+        assert_equal(
+            sorted(child.name for child in copied.children),
+            ['Carp', 'Nested']
+        )
+        copied_carp = copied.find_child_by_name('Carp')
+        assert_not_equal(copied_carp, carp)
+        assert_equal(copied_carp.versions, [version])
+        assert_equal(copied_carp.node, self.node)
+        copied_nested = copied.find_child_by_name('Nested')
+        assert_not_equal(copied_nested, nested)
+        assert_equal(
+            sorted(child.name for child in copied_nested.children),
+            ['One', 'Three', 'Two']
+        )
+        assert_equal(copied_nested.find_child_by_name('One').materialized_path, '/Sky/Cloud/Nested/One')
+        # Originals are untouched
+        assert_equal(len(list(nested.children)), 3)
+        assert_equal([each[0][0] for each in progress.call_args_list], [2, 4, 5])
+
 class TestNodeSettingsModel(StorageTestCase):
 
     def test_fields(self):
@@ -352,6 +439,20 @@ class TestNodeSettingsModel(StorageTestCase):
         assert_equal(cloned_record.versions, record.versions)
         assert_true(fork_node_settings.root_node)
 
+    def test_after_fork_copies_nested_folders(self):
+        folder = self.node_settings.get_root().append_folder('jazz')
+        folder.append_folder('live').append_file('dreamers-ball.mp3')
+
+        fork = self.project.fork_node(self.auth_obj)
+        fork_node_settings = fork.get_addon('osfstorage')
+        fork_node_settings.reload()
+
+        cloned_folder = fork_node_settings.get_root().find_child_by_name('jazz')
+        cloned_file = cloned_folder.find_child_by_name('live').find_child_by_name('dreamers-ball.mp3')
+        assert_equal(cloned_file.node, fork)
+        assert_equal(cloned_file.materialized_path, '/jazz/live/dreamers-ball.mp3')
+        assert_equal(len(list(folder.children)), 1)
+
 
 class TestOsfStorageFileVersion(StorageTestCase):
 
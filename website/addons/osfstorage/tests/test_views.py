@@ -75,6 +75,33 @@ class TestGetMetadataHook(HookTestCase):
             record.serialize()
         )
 
+    def test_children_metadata_mixed_kinds(self):
+        parent = self.node_settings.get_root().append_folder('kind')
+        parent.append_folder('of')
+        record = parent.append_file('magíc.mp3')
+        record.versions.append(factories.FileVersionFactory())
+        record.save()
+        res = self.send_hook(
+            'osfstorage_get_children',
+            {'fid': parent._id},
+            {},
+        )
+        assert_equal(res.json, [child.serialize() for child in parent.children])
+
+    def test_lineage(self):
+        path = u'kind/of/magíc.mp3'
+        record = recursively_create_file(self.node_settings, path)
+        res = self.send_hook(
+            'osfstorage_get_lineage',
+            {'fid': record._id},
+            {},
+        )
+        assert_equal(
+            [each['name'] for each in res.json['data']],
+            [u'magíc.mp3', 'of', 'kind', '']
+        )
+        assert_equal(res.json['data'][0], record.serialize())
+
     def test_osf_storage_root(self):
         auth = Auth(self.project.creator)
         result = views.osf_storage_root(self.node_settings, auth=auth)
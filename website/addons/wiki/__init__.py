@@ -1,7 +1,8 @@
 from . import model
+from . import render_cache
 from . import routes
 
-MODELS = [model.AddonWikiNodeSettings, model.NodeWikiPage]
+MODELS = [model.AddonWikiNodeSettings, model.NodeWikiPage, render_cache.WikiRenderCacheEntry]
 NODE_SETTINGS_MODEL = model.AddonWikiNodeSettings
 
 ROUTES = [routes.widget_routes, routes.page_routes, routes.api_routes]
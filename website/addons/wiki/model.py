@@ -20,6 +20,7 @@ from framework.mongo import utils as mongo_utils
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
 from website.addons.wiki import utils as wiki_utils
+from website.addons.wiki.render_cache import WIKI_RENDER_CACHE
 from website.addons.wiki.settings import WIKI_CHANGE_DATE
 from website.project.commentable import Commentable
 from website.project.model import Node
@@ -216,6 +217,26 @@ class NodeWikiPage(GuidStoredObject, Commentable):
 
     def html(self, node):
         """The cleaned HTML of the page"""
+        return self._get_rendered(node)[0]
+
+    def raw_text(self, node):
+        """ The raw text of the page, suitable for using in a test search"""
+        return self._get_rendered(node)[1]
+
+    def _get_rendered(self, node):
+        """Return the ``(html, text)`` of the page as rendered for ``node``,
+        from the render cache if possible. Unsaved pages are not cached.
+        """
+        key = WIKI_RENDER_CACHE.get_key(self, node) if self._id else None
+        rendered = WIKI_RENDER_CACHE.get(key) if key else None
+        if rendered is None:
+            html = self._render_html(node)
+            rendered = (html, sanitize(html, tags=[], strip=True))
+            if key:
+                WIKI_RENDER_CACHE.set(key, *rendered)
+        return rendered
+
+    def _render_html(self, node):
         sanitized_content = render_content(self.content, node=node)
         try:
             return linkify(
@@ -226,11 +247,6 @@ class NodeWikiPage(GuidStoredObject, Commentable):
             logger.warning('Returning unlinkified content.')
             return sanitized_content
 
-    def raw_text(self, node):
-        """ The raw text of the page, suitable for using in a test search"""
-
-        return sanitize(self.html(node), tags=[], strip=True)
-
     def get_draft(self, node):
         """
         Return most recently edited version of wiki, whether that is the
@@ -255,7 +271,9 @@ class NodeWikiPage(GuidStoredObject, Commentable):
     def save(self, *args, **kwargs):
         rv = super(NodeWikiPage, self).save(*args, **kwargs)
         if self.node:
-            self.node.update_search()
+            # Warm the render cache so the first view and the search update don't render
+            self._get_rendered(self.node)
+            self.node.update_search(saved_fields={'wiki_pages_current'})
         return rv
 
     def rename(self, new_name, save=True):
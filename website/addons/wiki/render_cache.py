@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Cache of the rendered HTML and plain text of wiki page versions.
+
+Rendering a page runs markdown, bleach's sanitizer and linkify, which is by
+far the most expensive part of viewing a wiki or re-indexing it for search.
+Saved versions never change, so the output is stored in the
+``wikirendercacheentry`` collection, keyed by the page version, the node it
+is rendered for (wiki links point into that node), a hash of its content and
+a hash of the renderer settings; changing the whitelist or the renderer
+starts a new set of keys. Stored entries expire ``WIKI_RENDER_CACHE_EXPIRATION``
+seconds after they are created, which also removes the keys left behind by
+older renderer settings. Recently used entries are also held in process.
+"""
+
+import json
+import hashlib
+import datetime
+import collections
+
+import bleach
+import markdown
+from modularodm import fields
+
+from framework.mongo import StoredObject
+from framework.mongo.object_cache import TTLCache
+from website import settings
+from website.addons.wiki.settings import WIKI_RENDER_CACHE_EXPIRATION, WIKI_RENDER_CACHE_MAX_ENTRIES
+
+# Bump when the output of `render_content` or `NodeWikiPage.html` changes
+RENDERER_VERSION = 1
+
+
+def get_renderer_hash():
+    """Hash of everything other than the page itself that affects its
+    rendered output.
+    """
+    parts = [
+        RENDERER_VERSION,
+        markdown.version,
+        bleach.__version__,
+        settings.WIKI_WHITELIST,
+    ]
+    return hashlib.sha1(json.dumps(parts, sort_keys=True)).hexdigest()
+
+
+class WikiRenderCacheEntry(StoredObject):
+
+    __indices__ = [{
+        'key_or_list': [('date_created', 1)],
+        'expireAfterSeconds': WIKI_RENDER_CACHE_EXPIRATION,
+    }]
+
+    _id = fields.StringField(primary=True)
+    html = fields.StringField()
+    text = fields.StringField()
+    date_created = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
+
+
+class WikiRenderCache(object):
+    """Rendered wiki pages, looked up in process first and then in storage.
+
+    :param int max_entries: Maximum number of entries held in process;
+        0 only uses storage
+    """
+
+    def __init__(self, max_entries=1000):
+        self._entries = TTLCache(max_entries=max_entries)
+        self.hits = collections.Counter()
+        self.misses = 0
+
+    @staticmethod
+    def get_key(page, node):
+        content_hash = hashlib.sha1((page.content or u'').encode('utf-8')).hexdigest()
+        return hashlib.sha1(':'.join([
+            page._id, node._id, content_hash, get_renderer_hash(),
+        ])).hexdigest()
+
+    def get(self, key):
+        """Return the cached ``(html, text)`` pair for ``key``, or `None`."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits['memory'] += 1
+            return entry
+        record = WikiRenderCacheEntry.load(key)
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits['storage'] += 1
+        entry = (record.html, record.text)
+        self._entries.set(key, entry)
+        return entry
+
+    def set(self, key, html, text):
+        record = WikiRenderCacheEntry.load(key) or WikiRenderCacheEntry(_id=key)
+        record.html = html
+        record.text = text
+        record.save()
+        self._entries.set(key, (html, text))
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            'memory_hits': self.hits['memory'],
+            'storage_hits': self.hits['storage'],
+            'misses': self.misses,
+            'hit_rate': float(sum(self.hits.values())) / lookups if lookups else None,
+        }
+
+
+WIKI_RENDER_CACHE = WikiRenderCache(max_entries=WIKI_RENDER_CACHE_MAX_ENTRIES)
@@ -11,3 +11,10 @@ SHAREJS_DB_URL = 'mongodb://{}:{}/{}'.format(settings.DB_HOST, settings.DB_PORT,
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
+
+# Rendered wiki pages held in process in front of the stored render cache;
+# see website.addons.wiki.render_cache. 0 only uses the stored cache.
+WIKI_RENDER_CACHE_MAX_ENTRIES = 1000
+# Seconds after which stored rendered pages are removed by MongoDB, so that
+# entries for old versions and renderer settings do not pile up
+WIKI_RENDER_CACHE_EXPIRATION = 60 * 60 * 24 * 30
@@ -21,6 +21,7 @@ from website.addons.wiki import settings
 from website.addons.wiki import views
 from website.addons.wiki.exceptions import InvalidVersionError
 from website.addons.wiki.model import NodeWikiPage, render_content
+from website.addons.wiki.render_cache import WIKI_RENDER_CACHE, WikiRenderCacheEntry
 from website.addons.wiki.utils import (
     get_sharejs_uuid, generate_private_uuid, share_db, delete_share_doc,
     migrate_uuid, format_wiki_version, serialize_wiki_settings,
@@ -43,6 +44,59 @@ class TestNodeWikiPageModel(OsfTestCase):
             page.save()
 
 
+class TestWikiRenderCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestWikiRenderCache, self).setUp()
+        WIKI_RENDER_CACHE.clear()
+        self.wiki = NodeWikiFactory(content='Some *content* with a [[link]]')
+        self.node = self.wiki.node
+
+    def test_save_warms_cache(self):
+        key = WIKI_RENDER_CACHE.get_key(self.wiki, self.node)
+        record = WikiRenderCacheEntry.load(key)
+        assert_is_not_none(record)
+        assert_in('<em>content</em>', record.html)
+        assert_equal(record.text, 'Some content with a link')
+
+    @mock.patch('website.addons.wiki.model.render_content')
+    def test_html_and_raw_text_do_not_rerender(self, mock_render):
+        assert_in('<em>content</em>', self.wiki.html(self.node))
+        assert_equal(self.wiki.raw_text(self.node), 'Some content with a link')
+        assert_false(mock_render.called)
+
+    @mock.patch('website.addons.wiki.model.render_content')
+    def test_html_read_from_storage_when_not_in_process(self, mock_render):
+        WIKI_RENDER_CACHE.clear()
+        storage_hits = WIKI_RENDER_CACHE.stats()['storage_hits']
+        assert_in('<em>content</em>', self.wiki.html(self.node))
+        assert_false(mock_render.called)
+        assert_equal(WIKI_RENDER_CACHE.stats()['storage_hits'], storage_hits + 1)
+
+    def test_html_rendered_for_other_node(self):
+        other = ProjectFactory()
+        assert_in('/{}/wiki/link/'.format(other._id), self.wiki.html(other))
+        assert_in('/{}/wiki/link/'.format(self.node._id), self.wiki.html(self.node))
+
+    def test_changed_content_is_rerendered(self):
+        self.wiki.content = 'Other *content*'
+        assert_equal(self.wiki.raw_text(self.node), 'Other content')
+
+    def test_whitelist_change_is_rerendered(self):
+        with mock.patch.dict('website.settings.WIKI_WHITELIST', {'tags': ['a']}):
+            assert_not_in('<em>', self.wiki.html(self.node))
+        assert_in('<em>content</em>', self.wiki.html(self.node))
+
+
+    def test_stored_entries_expire(self):
+        indices = WikiRenderCacheEntry._storage[0].store.index_information()
+        expiring = [
+            index for index in indices.values()
+            if index['key'] == [('date_created', 1)]
+        ]
+        assert_equal(len(expiring), 1)
+        assert_equal(expiring[0]['expireAfterSeconds'], settings.WIKI_RENDER_CACHE_EXPIRATION)
+
 class TestWikiViews(OsfTestCase):
 
     def setUp(self):
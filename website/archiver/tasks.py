@@ -128,7 +128,7 @@ def stat_addon(addon_short_name, job_pk):
     src, dst, user = job.info()
     src_addon = src.get_addon(addon_name)
     try:
-        file_tree = src_addon._get_file_tree(user=user, version=version)
+        file_tree_result = utils.stat_file_tree(addon_short_name, src_addon, user, version=version)
     except HTTPError as e:
         dst.archive_job.update_target(
             addon_short_name,
@@ -139,7 +139,7 @@ def stat_addon(addon_short_name, job_pk):
     result = AggregateStatResult(
         src_addon._id,
         addon_short_name,
-        targets=[utils.aggregate_file_tree_metadata(addon_short_name, file_tree, user)],
+        targets=[file_tree_result],
     )
     return result
 
@@ -305,13 +305,10 @@ def archive_success(dst_pk, job_pk):
 
     :param str dst_pk: primary key of registration Node
 
-    note:: At first glance this task makes redundant calls to utils.get_file_map (which
-    returns a generator yielding  (<sha256>, <file_metadata>) pairs) on the dst Node. Two
-    notes about utils.get_file_map: 1) this function memoizes previous results to reduce
-    overhead and 2) this function returns a generator that lazily fetches the file metadata
-    of child Nodes (it is possible for a selected file to belong to a child Node) using a
-    non-recursive DFS. Combined this allows for a relatively effient implementation with
-    seemingly redundant calls.
+    note:: Each selected file is looked up separately in the file maps of dst and its
+    components (it is possible for a selected file to belong to a child Node). The file
+    maps are indexed by sha256, fetched lazily using a non-recursive DFS, and cached in a
+    bounded utils.FileMapCache that only lives as long as this task.
     """
     create_app_context()
     dst = Node.load(dst_pk)
@@ -320,9 +317,10 @@ def archive_success(dst_pk, job_pk):
     # questions. These files are references to files on the unregistered Node, and
     # consequently we must migrate those file paths after archiver has run. Using
     # sha256 hashes is a convenient way to identify files post-archival.
+    file_maps = utils.FileMapCache(max_entries=settings.ARCHIVER_FILE_MAP_CACHE_SIZE)
     for schema in dst.registered_schema:
         if schema.has_files:
-            utils.migrate_file_metadata(dst, schema)
+            utils.migrate_file_metadata(dst, schema, file_maps)
     job = ArchiveJob.load(job_pk)
     if not job.sent:
         job.sent = True
@@ -1,6 +1,9 @@
-import functools
+import collections
 
 from framework.auth import Auth
+from framework.mongo.object_cache import TTLCache
+
+from website.addons.base import crawler
 
 from website.archiver import (
     StatResult, AggregateStatResult,
@@ -156,6 +159,35 @@ def aggregate_file_tree_metadata(addon_short_name, fileobj_metadata, user):
             targets=[aggregate_file_tree_metadata(addon_short_name, child, user) for child in fileobj_metadata.get('children', [])],
         )
 
+def stat_file_tree(addon_short_name, src_addon, user, version=None):
+    """Collect metadata about the addon's file tree in an AggregateStatResult,
+    adding each folder's contents as soon as they are listed rather than
+    building the whole tree first.
+
+    :param src_addon: AddonNodeSettings instance of addon being examined
+    :param user: archive initatior
+    :param version: version of the files to examine, if the addon has versions
+    :return: AggregateStatResult of the addon's root folder
+    """
+    root = src_addon._get_root_filenode()
+    root_result = aggregate_file_tree_metadata(addon_short_name, root, user)
+    # Results of the folders waiting to be listed, by id of their metadata
+    pending = {id(root): root_result}
+
+    def visit(folder, children):
+        folder_result = pending.pop(id(folder))
+        to_list = []
+        for child in children:
+            child_result = aggregate_file_tree_metadata(addon_short_name, child, user)
+            folder_result.targets.append(child_result)
+            if crawler.needs_listing(child):
+                pending[id(child)] = child_result
+                to_list.append(child)
+        return to_list
+
+    src_addon._walk_file_tree(visit, root, user=user, version=version)
+    return root_result
+
 def before_archive(node, user):
     link_archive_provider(node, user)
     job = ArchiveJob(
@@ -165,60 +197,104 @@ def before_archive(node, user):
     )
     job.set_targets()
 
-def _do_get_file_map(file_tree):
-    """Reduces a tree of folders and files into a list of (<sha256>, <file_metadata>) pairs
-    """
-    file_map = []
-    stack = [file_tree]
-    while len(stack):
-        tree_node = stack.pop(0)
-        if tree_node['kind'] == 'file':
-            file_map.append((tree_node['extra']['hashes']['sha256'], tree_node))
-        else:
-            stack = stack + tree_node['children']
-    return file_map
-
-def _memoize_get_file_map(func):
-    cache = {}
-    @functools.wraps(func)
-    def wrapper(node):
-        if node._id not in cache:
-            osf_storage = node.get_addon('osfstorage')
-            file_tree = osf_storage._get_file_tree(user=node.creator)
-            cache[node._id] = _do_get_file_map(file_tree)
-        return func(node, cache[node._id])
-    return wrapper
+class FileMap(object):
+    """The files of an osfstorage file tree, in breadth-first order and
+    indexed by sha256.
 
-@_memoize_get_file_map
-def get_file_map(node, file_map):
+    Iterating yields (<sha256>, <file_metadata>) pairs.
     """
-    note:: file_map is injected implictly by the decorator; this method is called like:
 
-    get_file_map(node)
+    def __init__(self, file_tree):
+        self.files = []
+        self.by_sha256 = collections.defaultdict(list)
+        queue = collections.deque([file_tree])
+        while queue:
+            tree_node = queue.popleft()
+            if tree_node['kind'] == 'file':
+                sha256 = tree_node['extra']['hashes']['sha256']
+                self.files.append((sha256, tree_node))
+                self.by_sha256[sha256].append(tree_node)
+            else:
+                queue.extend(tree_node['children'])
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def find(self, sha256, name):
+        """Return the first file named ``name`` with the hash ``sha256``, or `None`."""
+        for file_metadata in self.by_sha256.get(sha256, []):
+            if file_metadata['name'] == name:
+                return file_metadata
+        return None
+
+
+class FileMapCache(object):
+    """Bounded LRU of the `FileMap` of each node's osfstorage, by node id.
+
+    :param int max_entries: Maximum number of file maps held
     """
-    for (key, value) in file_map:
-        yield (key, value, node._id)
-    for child in node.nodes_primary:
-        for key, value, node_id in get_file_map(child):
-            yield (key, value, node_id)
 
-def find_registration_file(value, node):
-    from website.models import Node
+    def __init__(self, max_entries=100):
+        self._entries = TTLCache(max_entries=max_entries)
+
+    def get(self, node):
+        file_map = self._entries.get(node._id)
+        if file_map is None:
+            osf_storage = node.get_addon('osfstorage')
+            file_map = FileMap(osf_storage._get_file_tree(user=node.creator))
+            self._entries.set(node._id, file_map)
+        return file_map
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Used when no cache scoped to an archive job is given
+FILE_MAP_CACHE = FileMapCache(max_entries=settings.ARCHIVER_FILE_MAP_CACHE_SIZE)
+
+def _iter_primary_nodes(node):
+    """Lazily yield node and its primary descendants, depth-first."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.nodes_primary))
+
+def get_file_map(node, file_maps=None):
+    """Lazily yield (<sha256>, <file_metadata>, <node_id>) triples for the
+    files of node and its primary descendants. A descendant's files are only
+    fetched once the generator reaches it.
+
+    :param FileMapCache file_maps: Cache to read the file maps from and add them
+        to, defaults to `FILE_MAP_CACHE`
+    """
+    file_maps = file_maps or FILE_MAP_CACHE
+    for current in _iter_primary_nodes(node):
+        for sha256, value in file_maps.get(current):
+            yield (sha256, value, current._id)
 
+def find_registration_file(value, node, file_maps=None):
     orig_sha256 = value['sha256']
     orig_name = value['selectedFileName']
     orig_node = value['nodeId']
-    file_map = get_file_map(node)
-    for sha256, value, node_id in file_map:
-        registered_from_id = Node.load(node_id).registered_from._id
-        if sha256 == orig_sha256 and registered_from_id == orig_node and orig_name == value['name']:
-            return value, node_id
+    file_maps = file_maps or FILE_MAP_CACHE
+    for current in _iter_primary_nodes(node):
+        registered_from = current.registered_from
+        # Only the registration of the node the file was selected from can hold it
+        if registered_from is None or registered_from._id != orig_node:
+            continue
+        registration_file = file_maps.get(current).find(orig_sha256, orig_name)
+        if registration_file:
+            return registration_file, current._id
     return None, None
 
-def find_registration_files(values, node):
+def find_registration_files(values, node, file_maps=None):
     ret = []
     for i in range(len(values.get('extra', []))):
-        ret.append(find_registration_file(values['extra'][i], node) + (i,))
+        ret.append(find_registration_file(values['extra'][i], node, file_maps) + (i,))
     return ret
 
 def get_title_for_question(schema, path):
@@ -273,12 +349,12 @@ def deep_get(obj, path):
         item = item[key]
     return item
 
-def migrate_file_metadata(dst, schema):
+def migrate_file_metadata(dst, schema, file_maps=None):
     metadata = dst.registered_meta[schema._id]
     missing_files = []
     selected_files = find_selected_files(schema, metadata)
     for path, selected in selected_files.items():
-        for registration_file, node_id, index in find_registration_files(selected, dst):
+        for registration_file, node_id, index in find_registration_files(selected, dst, file_maps):
             if not registration_file:
                 missing_files.append({
                     'file_name': selected['extra'][index]['selectedFileName'],
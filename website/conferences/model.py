@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import operator
+import functools
+
 import bson
 from modularodm import fields, Q
 from modularodm.exceptions import ModularOdmException
 
 from framework.mongo import StoredObject
 
+from website.project.model import Node
 from website.conferences.exceptions import ConferenceError
 
 
@@ -59,3 +63,159 @@ class MailRecord(StoredObject):
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
     data = fields.DictionaryField()
     records = fields.AbstractForeignField(list=True)
+
+
+class ConferenceSubmission(StoredObject):
+    """Entry of the conference submission index: a public, undeleted node
+    tagged with a conference's endpoint. Entries are kept up to date as nodes
+    are saved, see `update_node_submissions`, and can be rebuilt with
+    `rebuild_submissions`.
+    """
+    __indices__ = [
+        {
+            'key_or_list': [
+                ('conference', 1),
+                ('date_created', -1),
+            ]
+        },
+        {
+            'key_or_list': [
+                ('date_created', -1),
+            ]
+        },
+    ]
+
+    # <conference endpoint>:<node id>
+    _id = fields.StringField(primary=True)
+    conference = fields.StringField(required=True)
+    node = fields.StringField(required=True, index=True)
+    date_created = fields.DateTimeField()
+    title = fields.StringField()
+    author = fields.StringField()
+    author_url = fields.StringField()
+    category = fields.StringField()
+    tags = fields.StringField(list=True)
+
+    @classmethod
+    def from_node(cls, conference, node, submission=None):
+        """Render ``node`` as a submission to ``conference``, updating
+        ``submission`` if the node was already indexed.
+        """
+        if submission is None:
+            submission = cls(
+                _id='{0}:{1}'.format(conference.endpoint, node._id),
+                conference=conference.endpoint,
+                node=node._id,
+            )
+        visible_contributors = node.visible_contributors
+        author = visible_contributors[0] if visible_contributors else node.creator
+        if conference.field_names['submission1'] in node.system_tags:
+            submission.category = conference.field_names['submission1']
+        else:
+            submission.category = conference.field_names['submission2']
+        submission.date_created = node.date_created
+        submission.title = node.title
+        submission.author = author.family_name or author.fullname
+        submission.author_url = node.creator.url
+        submission.tags = [tag._id for tag in node.tags]
+        return submission
+
+
+# Node fields that are part of a submission or decide whether a node is one
+SUBMISSION_FIELDS = {
+    'tags',
+    'system_tags',
+    'is_public',
+    'is_deleted',
+    'title',
+    'visible_contributor_ids',
+}
+
+
+def is_submission_candidate(is_public, is_deleted, tags):
+    return bool(is_public and not is_deleted and tags)
+
+
+def get_tagged_conferences(node):
+    """Conferences whose endpoint matches one of the node's tags, ignoring
+    case like `index_submissions`.
+    """
+    queries = [Q('endpoint', 'iexact', tag._id) for tag in node.tags]
+    if not queries:
+        return []
+    return Conference.find(functools.reduce(operator.or_, queries))
+
+
+def update_node_submissions(node):
+    """Bring the submission index entries of ``node`` up to date.
+    """
+    current = {
+        each.conference: each
+        for each in ConferenceSubmission.find(Q('node', 'eq', node._id))
+    }
+    conferences = []
+    if is_submission_candidate(node.is_public, node.is_deleted, node.tags):
+        conferences = list(get_tagged_conferences(node))
+
+    endpoints = set()
+    for conference in conferences:
+        ConferenceSubmission.from_node(conference, node, current.get(conference.endpoint)).save()
+        endpoints.add(conference.endpoint)
+    removed = set(current) - endpoints
+    if removed:
+        ConferenceSubmission.remove(Q('_id', 'in', [current[endpoint]._id for endpoint in removed]))
+    # Only conferences that gained or lost a submission need a new count
+    counted = (endpoints - set(current)) | removed
+    if counted:
+        for conference in Conference.find(Q('endpoint', 'in', list(counted))):
+            update_submission_count(conference)
+
+
+def update_submission_count(conference):
+    conference.num_submissions = ConferenceSubmission.find(Q('conference', 'eq', conference.endpoint)).count()
+    conference.save()
+
+
+def index_submissions(conference):
+    """Rebuild the submission index of ``conference`` from scratch, without
+    saving the conference's new count.
+    """
+    ConferenceSubmission.remove(Q('conference', 'eq', conference.endpoint))
+    nodes = Node.find(
+        Q('tags', 'iexact', conference.endpoint) &
+        Q('is_public', 'eq', True) &
+        Q('is_deleted', 'eq', False)
+    )
+    count = 0
+    for node in nodes:
+        ConferenceSubmission.from_node(conference, node).save()
+        count += 1
+    conference.num_submissions = count
+
+
+def rebuild_submissions(conference):
+    index_submissions(conference)
+    conference.save()
+
+
+@Node.subscribe('save')
+def node_saved(schema, instance, fields_changed, cached_data):
+    if not SUBMISSION_FIELDS.intersection(fields_changed):
+        return
+    was_candidate = is_submission_candidate(
+        cached_data.get('is_public'),
+        cached_data.get('is_deleted'),
+        cached_data.get('tags'),
+    )
+    if was_candidate or is_submission_candidate(instance.is_public, instance.is_deleted, instance.tags):
+        update_node_submissions(instance)
+
+
+@Conference.subscribe('before_save')
+def conference_before_save(schema, instance):
+    # Index nodes that were tagged before the conference was created or renamed
+    if not instance.endpoint or (instance._is_loaded and instance._stored_key == instance.endpoint):
+        return
+    if instance._is_loaded:
+        ConferenceSubmission.remove(Q('conference', 'eq', instance._stored_key))
+    index_submissions(instance)
@@ -4,17 +4,20 @@ import httplib
 import logging
 from datetime import datetime
 
+from flask import request
+
 from modularodm import Q
 from modularodm.exceptions import ModularOdmException
 
 from framework.auth import get_or_create_user
 from framework.exceptions import HTTPError
 from framework.flask import redirect
+from framework.mongo import database
+from framework.analytics import get_total_counters
 from framework.transactions.context import TokuTransaction
 from framework.transactions.handlers import no_auto_transaction
 
 from website import settings
-from website.models import Node, Tag
 from website.util import web_url_for
 from website.mails import send_mail
 from website.files.models import StoredFileNode
@@ -22,7 +25,7 @@ from website.mails import CONFERENCE_SUBMITTED, CONFERENCE_INACTIVE, CONFERENCE_
 
 from website.conferences import utils, signals
 from website.conferences.message import ConferenceMessage, ConferenceError
-from website.conferences.model import Conference
+from website.conferences.model import Conference, ConferenceSubmission
 
 
 logger = logging.getLogger(__name__)
@@ -138,45 +141,86 @@ def add_poster_by_email(conference, message):
         signals.osf4m_user_created.send(user, conference=conference, node=node)
 
 
-def _render_conference_node(node, idx, conf):
+def _get_page():
+    """Read optional ``page`` and ``size`` query parameters. Without a page
+    the whole index is returned.
+    """
+    if 'page' not in request.args:
+        return None, None
     try:
-        record = next(
-            x for x in
-            StoredFileNode.find(
-                Q('node', 'eq', node) &
-                Q('is_file', 'eq', True)
-            ).limit(1)
-        ).wrapped()
-        download_count = record.get_download_count()
-
-        download_url = node.web_url_for(
-            'addon_view_or_download_file',
-            path=record.path.strip('/'),
-            provider='osfstorage',
-            action='download',
-            _absolute=True,
-        )
-    except StopIteration:
-        download_url = ''
-        download_count = 0
+        page = int(request.args['page'])
+        size = int(request.args.get('size', settings.CONFERENCE_SUBMISSIONS_PAGE_SIZE))
+    except ValueError:
+        raise HTTPError(httplib.BAD_REQUEST)
+    if page < 0 or size < 1:
+        raise HTTPError(httplib.BAD_REQUEST)
+    return page, size
 
-    author = node.visible_contributors[0]
-    tags = [tag._id for tag in node.tags]
 
-    return {
-        'id': idx,
-        'title': node.title,
-        'nodeUrl': node.url,
-        'author': author.family_name if author.family_name else author.fullname,
-        'authorUrl': node.creator.url,
-        'category': conf.field_names['submission1'] if conf.field_names['submission1'] in node.system_tags else conf.field_names['submission2'],
-        'download': download_count,
-        'downloadUrl': download_url,
-        'dateCreated': node.date_created.isoformat(),
-        'confName': conf.name,
-        'confUrl': web_url_for('conference_results', meeting=conf.endpoint),
-        'tags': ' '.join(tags)
-    }
+def _paginate(submissions, page, size):
+    if page is None:
+        return submissions
+    return submissions.offset(page * size).limit(size)
+
+
+def _get_download_files(node_ids):
+    """Map node ids to the id of their first OSF Storage file.
+    """
+    files = {}
+    records = database[StoredFileNode._name].find(
+        {'node': {'$in': node_ids}, 'is_file': True, 'provider': 'osfstorage'},
+        {'node': True},
+    )
+    for record in records:
+        files.setdefault(record['node'], record['_id'])
+    return files
+
+
+def _render_conference_submissions(submissions, conferences):
+    """Render submission index entries for the meeting grids. Download links
+    and counts are looked up for all entries at once.
+
+    :param list submissions: `ConferenceSubmission` records
+    :param dict conferences: Conferences of the submissions, by endpoint
+    """
+    files = _get_download_files([each.node for each in submissions])
+    download_counts = get_total_counters([
+        'download:{0}:{1}'.format(node_id, file_id)
+        for node_id, file_id in files.items()
+    ])
+
+    ret = []
+    for idx, submission in enumerate(submissions):
+        conf = conferences[submission.conference]
+        file_id = files.get(submission.node)
+        if file_id:
+            download_url = web_url_for(
+                'addon_view_or_download_file',
+                pid=submission.node,
+                path=file_id,
+                provider='osfstorage',
+                action='download',
+                _absolute=True,
+            )
+            download_count = download_counts['download:{0}:{1}'.format(submission.node, file_id)]
+        else:
+            download_url = ''
+            download_count = 0
+        ret.append({
+            'id': idx,
+            'title': submission.title,
+            'nodeUrl': '/{}/'.format(submission.node),
+            'author': submission.author,
+            'authorUrl': submission.author_url,
+            'category': submission.category,
+            'download': download_count,
+            'downloadUrl': download_url,
+            'dateCreated': submission.date_created.isoformat(),
+            'confName': conf.name,
+            'confUrl': web_url_for('conference_results', meeting=conf.endpoint),
+            'tags': ' '.join(submission.tags),
+        })
+    return ret
 
 
 def conference_data(meeting):
@@ -185,17 +229,12 @@ def conference_data(meeting):
     except ModularOdmException:
         raise HTTPError(httplib.NOT_FOUND)
 
-    nodes = Node.find(
-        Q('tags', 'iexact', meeting) &
-        Q('is_public', 'eq', True) &
-        Q('is_deleted', 'eq', False)
-    )
-
-    ret = [
-        _render_conference_node(each, idx, conf)
-        for idx, each in enumerate(nodes)
-    ]
-    return ret
+    page, size = _get_page()
+    submissions = ConferenceSubmission.find(
+        Q('conference', 'eq', conf.endpoint)
+    ).sort('-date_created')
+    submissions = list(_paginate(submissions, page, size))
+    return _render_conference_submissions(submissions, {conf.endpoint: conf})
 
 
 def redirect_to_meetings(**kwargs):
@@ -223,36 +262,19 @@ def conference_results(meeting):
     }
 
 def conference_submissions(**kwargs):
-    """Return data for all OSF4M submissions.
+    """Return data for all OSF4M submissions, newest first.
 
-    The total number of submissions for each meeting is calculated and cached
-    in the Conference.num_submissions field.
+    Submissions are read from the `ConferenceSubmission` index, which also
+    keeps Conference.num_submissions up to date.
     """
-    submissions = []
-    #  TODO: Revisit this loop, there has to be a way to optimize it
-    for conf in Conference.find():
-        # For efficiency, we filter by tag first, then node
-        # instead of doing a single Node query
-        projects = set()
-
-        tags = Tag.find(Q('lower', 'eq', conf.endpoint.lower())).get_keys()
-        nodes = Node.find(
-            Q('tags', 'in', tags) &
-            Q('is_public', 'eq', True) &
-            Q('is_deleted', 'ne', True)
-        )
-        projects.update(list(nodes))
-
-        for idx, node in enumerate(projects):
-            submissions.append(_render_conference_node(node, idx, conf))
-        num_submissions = len(projects)
-        # Cache the number of submissions
-        conf.num_submissions = num_submissions
-        conf.save()
-        if num_submissions < settings.CONFERENCE_MIN_COUNT:
-            continue
-    submissions.sort(key=lambda submission: submission['dateCreated'], reverse=True)
-    return {'submissions': submissions}
+    page, size = _get_page()
+    submissions = ConferenceSubmission.find().sort('-date_created')
+    submissions = list(_paginate(submissions, page, size))
+    conferences = {
+        conf.endpoint: conf
+        for conf in Conference.find(Q('endpoint', 'in', list({each.conference for each in submissions})))
+    }
+    return {'submissions': _render_conference_submissions(submissions, conferences)}
 
 def conference_view(**kwargs):
     meetings = []
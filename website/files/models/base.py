@@ -57,6 +57,7 @@ class TrashedFileNode(StoredObject, Commentable):
 
     node = fields.ForeignField('node', required=True)
     parent = fields.AbstractForeignField(default=None)
+    ancestors = fields.StringField(list=True)
 
     is_file = fields.BooleanField(default=True)
     provider = fields.StringField(required=True)
@@ -171,6 +172,11 @@ class StoredFileNode(StoredObject, Commentable):
         'key_or_list': [
             ('parent', pymongo.ASCENDING),
         ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('ancestors', pymongo.ASCENDING),
+        ]
     }]
 
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
@@ -186,6 +192,8 @@ class StoredFileNode(StoredObject, Commentable):
 
     node = fields.ForeignField('Node', required=True)
     parent = fields.ForeignField('StoredFileNode', default=None)
+    # The _ids of the chain of parents, root first. Kept up to date by OsfStorageFileNode.save
+    ancestors = fields.StringField(list=True)
 
     is_file = fields.BooleanField(default=True)
     provider = fields.StringField(required=True)
@@ -536,6 +544,7 @@ class FileNode(object):
             path=self.path,
             node=self.node,
             parent=parent or self.parent,
+            ancestors=self.ancestors,
             history=self.history,
             is_file=self.is_file,
             checkout=self.checkout,
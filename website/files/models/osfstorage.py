@@ -5,10 +5,12 @@ import os
 from modularodm import Q
 
 from framework.auth import Auth
+from framework.mongo import database
 from framework.guid.model import Guid
+from framework.analytics import get_total_counters
 from website.exceptions import InvalidTagError, NodeStateError, TagNotFoundError
 from website.files import exceptions
-from website.files.models.base import File, Folder, FileNode, FileVersion, TrashedFileNode
+from website.files.models.base import File, Folder, FileNode, FileVersion, StoredFileNode, TrashedFileNode
 from website.util import permissions
 
 
@@ -64,26 +66,36 @@ class OsfStorageFileNode(FileNode):
     @property
     def materialized_path(self):
         """creates the full path to a the given filenode
-        Note: Possibly high complexity/ many database calls
-        USE SPARINGLY
+        The names of its parents are read with a single query, see `get_lineage`
         """
         if not self.parent:
             return '/'
-        # Note: ODM cache can be abused here
-        # for highly nested folders calling
-        # list(self.__class__.find(Q(nodesetting),Q(folder))
-        # may result in a massive increase in performance
-        def lineage():
-            current = self
-            while current:
-                yield current
-                current = current.parent
 
-        path = os.path.join(*reversed([x.name for x in lineage()]))
+        path = os.path.join(*reversed([x.name for x in self.get_lineage()]))
         if self.is_file:
             return '/{}'.format(path)
         return '/{}/'.format(path)
 
+    def get_lineage(self):
+        """Return this filenode followed by its parents, up to and including
+        the root folder. The parents are loaded with one query on their stored
+        ancestors.
+        """
+        ancestor_ids = list(self.ancestors)
+        parents = {
+            each._id: each
+            for each in OsfStorageFileNode.find(Q('_id', 'in', ancestor_ids))
+        } if ancestor_ids else {}
+        if self.parent and (not ancestor_ids or len(parents) != len(ancestor_ids)):
+            # Ancestors not stored yet, walk the parent pointers instead
+            lineage = []
+            current = self
+            while current:
+                lineage.append(current)
+                current = current.parent
+            return lineage
+        return [self] + [parents[_id] for _id in reversed(ancestor_ids)]
+
     @property
     def path(self):
         """Path is dynamically computed as storedobject.path is stored
@@ -146,6 +158,14 @@ class OsfStorageFileNode(FileNode):
     def save(self):
         self.path = ''
         self.materialized_path = ''
+        parent = self.parent
+        if parent is None:
+            self.ancestors = []
+        elif parent.ancestors or not parent.parent:
+            self.ancestors = list(parent.ancestors) + [parent._id]
+        else:
+            # The parent's ancestors are not stored yet
+            self.ancestors = [each._id for each in reversed(parent.get_lineage())]
         return super(OsfStorageFileNode, self).save()
 
 
@@ -284,3 +304,47 @@ class OsfStorageFolder(OsfStorageFileNode, Folder):
         if include_full:
             ret['fullPath'] = self.materialized_path
         return ret
+
+    def serialize_children(self):
+        """Serialize the children of this folder the way `serialize` would,
+        reading the children with one projection query and the latest versions
+        and download counts of all files with one query each.
+        """
+        children = list(database[StoredFileNode._name].find(
+            {'parent': self._id},
+            {'name': True, 'is_file': True, 'versions': True, 'checkout': True},
+        ))
+        files = [each for each in children if each['is_file']]
+        versions = {
+            version._id: version
+            for version in FileVersion.find(Q('_id', 'in', [
+                each['versions'][-1] for each in files if each.get('versions')
+            ]))
+        }
+        downloads = get_total_counters([
+            'download:{0}:{1}'.format(self.node._id, each['_id']) for each in files
+        ])
+
+        ret = []
+        for child in children:
+            serialized = {
+                'id': child['_id'],
+                'path': '/' + child['_id'] + ('' if child['is_file'] else '/'),
+                'name': child['name'],
+                'kind': 'file' if child['is_file'] else 'folder',
+            }
+            if child['is_file']:
+                version = versions.get(child['versions'][-1]) if child.get('versions') else None
+                serialized.update(
+                    size=version.size if version else None,
+                    modified=version.date_modified.isoformat() if version and version.date_modified else None,
+                    contentType=version.content_type if version else None,
+                    downloads=downloads['download:{0}:{1}'.format(self.node._id, child['_id'])],
+                    # checkout is an AbstractForeignField, stored as (_id, collection)
+                    checkout=child['checkout'][0] if child.get('checkout') else None,
+                    version=len(child.get('versions') or []),
+                    md5=version.metadata.get('md5') if version else None,
+                    sha256=version.metadata.get('sha256') if version else None,
+                )
+            ret.append(serialized)
+        return ret
@@ -1,11 +1,19 @@
+import bson
+
+from modularodm import Q
 from modularodm.exceptions import ValidationValueError
 
+from framework.mongo import database
+from website import settings
+
 
-def copy_files(src, target_node, parent=None, name=None):
+def copy_files(src, target_node, parent=None, name=None, progress=None):
     """Copy the files from src to the target node
     :param Folder src: The source to copy children from
     :param Node target_node: The node settings of the project to copy files to
     :param Folder parent: The parent of to attach the clone of src to, if applicable
+    :param callable progress: Called with the number of descendants copied so far
+        after each batch written, see `copy_descendants`
     """
     assert not parent or not parent.is_file, 'Parent must be a folder'
 
@@ -20,12 +28,70 @@ def copy_files(src, target_node, parent=None, name=None):
     cloned.save()
 
     if not src.is_file:
-        for child in src.children:
-            copy_files(child, target_node, parent=cloned)
+        copy_descendants(src, cloned, target_node, progress=progress)
 
     return cloned
 
 
+def copy_descendants(src, cloned, target_node, batch_size=None, progress=None):
+    """Copy everything below the folder src under its clone, cloned.
+    The tree is read one level at a time, breadth-first, and written back with
+    batched inserts rather than a save per record. Copies keep pointing at the
+    same FileVersions as their originals.
+    :param Folder src: The folder to copy the contents of
+    :param Folder cloned: The already saved copy of src
+    :param Node target_node: The node the copies belong to
+    :param int batch_size: Records read and inserted at a time, defaults to
+        ``settings.FILE_COPY_BATCH_SIZE``
+    :param callable progress: Called with the number of records copied so far
+        after each batch written
+    :return: The number of records copied
+    """
+    batch_size = batch_size or settings.FILE_COPY_BATCH_SIZE
+    collection = database[src.stored_object._name]
+    copied = 0
+    batch = []
+    # Maps the ids of the folders of the current level to the ids of their
+    # copies and the ancestors of the copies' children
+    new_ids = {src._id: (cloned._id, list(cloned.ancestors) + [cloned._id])}
+    while new_ids:
+        next_ids = {}
+        parent_ids = list(new_ids)
+        for start in range(0, len(parent_ids), batch_size):
+            for record in collection.find({'parent': {'$in': parent_ids[start:start + batch_size]}}):
+                new_id = str(bson.ObjectId())
+                new_parent_id, ancestors = new_ids[record['parent']]
+                if not record['is_file']:
+                    next_ids[record['_id']] = (new_id, ancestors + [new_id])
+                # Back references point at the original, not the copy
+                record.pop('__backrefs', None)
+                record.update(_id=new_id, parent=new_parent_id, ancestors=ancestors, node=target_node._id)
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    copied += _insert_copies(collection, batch, src.provider, target_node)
+                    batch = []
+                    if progress is not None:
+                        progress(copied)
+        new_ids = next_ids
+    if batch:
+        copied += _insert_copies(collection, batch, src.provider, target_node)
+        if progress is not None:
+            progress(copied)
+    return copied
+
+
+def _insert_copies(collection, records, provider, target_node):
+    collection.insert(records)
+    # Saving an OsfStorageFile indexes it; do the same for the whole batch at once
+    if provider == 'osfstorage' and target_node.is_public:
+        from website.search import search
+        from website.files.models import FileNode
+        search.update_files(FileNode.resolve_class(provider, FileNode.FILE).find(
+            Q('_id', 'in', [record['_id'] for record in records if record['is_file']])
+        ))
+    return len(records)
+
+
 class GenWrapper(object):
     """A Wrapper for MongoQuerySets
     Overrides __iter__ so for loops will always
@@ -1,4 +1,8 @@
 from babel import dates, core, Locale
+from modularodm import Q
+
+from framework.mongo import database as db
+from framework.postcommit_tasks.handlers import run_postcommit
 
 from website import mails
 from website import models as website_models
@@ -45,10 +49,15 @@ def notify(event, user, node, timestamp, **context):
     return sent_users
 
 
+@run_postcommit(once_per_request=False)
 def store_emails(recipient_ids, notification_type, event, user, node, timestamp, **context):
     """Store notification emails
 
-    Emails are sent via celery beat as digests
+    Emails are sent via celery beat as digests. Outside of debug mode the
+    digests are built once the request's transaction has been committed.
+    Recipients are loaded with a single query, the message is rendered once
+    per timezone and locale, and the digests are inserted together.
+
     :param recipient_ids: List of user ids to send mail to.
     :param notification_type: from constants.Notification_types
     :param event: event that triggered notification
@@ -61,56 +70,113 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     if notification_type == 'none':
         return
 
+    recipient_ids = [user_id for user_id in recipient_ids if user_id != user._id]
+    if not recipient_ids:
+        return
+
     template = event + '.html.mako'
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
 
+    recipients = {
+        recipient._id: recipient
+        for recipient in website_models.User.find(Q('_id', 'in', list(set(recipient_ids))))
+    }
+    # (timezone, locale) => rendered message
+    messages = {}
+    digests = []
     for user_id in recipient_ids:
-        if user_id == user._id:
+        recipient = recipients.get(user_id)
+        if recipient is None:
             continue
-        recipient = website_models.User.load(user_id)
-        context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
-        message = mails.render_message(template, **context)
+        key = (recipient.timezone, recipient.locale)
+        if key not in messages:
+            context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
+            messages[key] = mails.render_message(template, **context)
 
         digest = NotificationDigest(
             timestamp=timestamp,
             send_type=notification_type,
             event=event,
             user_id=user_id,
-            message=message,
+            message=messages[key],
             node_lineage=node_lineage_ids
         )
-        digest.save()
+        digest.validate_record()
+        digests.append(digest.to_storage())
+
+    if digests:
+        db['notificationdigest'].insert(digests)
 
 
-def compile_subscriptions(node, event_type, event=None, level=0):
-    """Recurse through node and parents for subscriptions.
+def compile_subscriptions(node, event_type, event=None):
+    """Compile the subscriptions of a node and its parents.
+
+    Subscriptions on a node override those on its parents, and subscriptions
+    to a particular event override the node's subscriptions to the event type.
+    The subscriptions of the whole lineage are loaded with a single query.
 
     :param node: current node
     :param event_type: Generally node_subscriptions_available
     :param event: Particular event such a file_updated that has specific file subs
-    :param level: How deep the recursion is
     :return: a dict of notification types with lists of users.
     """
-    subscriptions = check_node(node, event_type)
+    lineage = get_lineage_nodes(node)
+    levels = [(each, event_type) for each in lineage]
     if event:
-        subscriptions = check_node(node, event)  # Gets particular event subscriptions
-        parent_subscriptions = compile_subscriptions(node, event_type, level=level + 1)  # get node and parent subs
-    elif node.parent_id:
-        parent_subscriptions = \
-            compile_subscriptions(website_models.Node.load(node.parent_id), event_type, level=level + 1)
-    else:
-        parent_subscriptions = check_node(None, event_type)
-    for notification_type in parent_subscriptions:
-        p_sub_n = parent_subscriptions[notification_type]
-        p_sub_n.extend(subscriptions[notification_type])
-        for nt in subscriptions:
-            if notification_type != nt:
-                p_sub_n = list(set(p_sub_n).difference(set(subscriptions[nt])))
-        if level == 0:
-            p_sub_n, removed = utils.separate_users(node, p_sub_n)
-        parent_subscriptions[notification_type] = p_sub_n
-    return parent_subscriptions
+        levels.append((node, event))
+
+    keys = [utils.to_subscription_key(each._id, each_event) for each, each_event in levels]
+    subscriptions = {
+        subscription._id: subscription
+        for subscription in NotificationSubscription.find(Q('_id', 'in', keys))
+    }
+    readers = get_lineage_readers(lineage)
+
+    compiled = {key: set() for key in constants.NOTIFICATION_TYPES}
+    for (level_node, _), key in zip(levels, keys):
+        level_subscriptions = get_subscribed_ids(subscriptions.get(key), readers[level_node._id])
+        for notification_type in compiled:
+            compiled[notification_type] |= level_subscriptions[notification_type]
+            for other_type in level_subscriptions:
+                if other_type != notification_type:
+                    compiled[notification_type] -= level_subscriptions[other_type]
+
+    return {
+        notification_type: [user_id for user_id in user_ids if user_id in readers[node._id]]
+        for notification_type, user_ids in compiled.items()
+    }
+
+
+def get_subscribed_ids(subscription, reader_ids):
+    """Return the ids of the users in each notification type of ``subscription``
+    that are in ``reader_ids``, without loading the users.
+    """
+    return {
+        notification_type: {
+            user_id
+            for user_id in getattr(subscription, notification_type)._to_primary_keys()
+            if user_id in reader_ids
+        } if subscription else set()
+        for notification_type in constants.NOTIFICATION_TYPES
+    }
+
+
+def get_lineage_readers(lineage):
+    """Map the id of each node in ``lineage`` to the ids of the users with read
+    permission on it, including admins of its parents (see
+    `Node.has_permission`).
+
+    :param lineage: Nodes from the top most project down
+    """
+    readers = {}
+    admin_ids = set()
+    for node in lineage:
+        admin_ids |= {user_id for user_id, permissions in node.permissions.items() if 'admin' in permissions}
+        readers[node._id] = admin_ids | {
+            user_id for user_id, permissions in node.permissions.items() if 'read' in permissions
+        }
+    return readers
 
 
 def check_node(node, event):
@@ -131,19 +197,26 @@ def get_user_subscriptions(user, event):
     return {key: getattr(user_subscription, key, []) for key in constants.NOTIFICATION_TYPES}
 
 
-def get_node_lineage(node):
-    """ Get a list of node ids in order from the node to top most project
-        e.g. [parent._id, node._id]
+def get_lineage_nodes(node):
+    """ Get a list of nodes in order from the top most project to node
+        e.g. [parent, node]
     """
-    lineage = [node._id]
+    lineage = [node]
 
     while node.parent_id:
         node = website_models.Node.load(node.parent_id)
-        lineage = [node._id] + lineage
+        lineage.insert(0, node)
 
     return lineage
 
 
+def get_node_lineage(node):
+    """ Get a list of node ids in order from the node to top most project
+        e.g. [parent._id, node._id]
+    """
+    return [each._id for each in get_lineage_nodes(node)]
+
+
 def get_settings_url(uid, user):
     if uid == user._id:
         return web_url_for('user_notifications', _absolute=True)
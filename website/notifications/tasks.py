@@ -1,55 +1,159 @@
 """
 Tasks for making even transactional emails consolidated.
 """
-from bson.code import Code
+import time
+import logging
+import itertools
+from multiprocessing.pool import ThreadPool
+
 from modularodm import Q
 
 from framework.celery_tasks import app as celery_app
 from framework.mongo import database as db
+from framework.mongo.handlers import release_current_client
 from framework.auth.core import User
 from framework.sentry import log_exception
 
-from framework.transactions.context import TokuTransaction
-
 from website.notifications.utils import NotificationsDict
 from website.notifications.model import NotificationDigest
 from website import mails
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = 'notificationdigestcheckpoint'
+
+
+class DigestMetrics(object):
+    """Throughput of a single `send_users_email` run.
+    """
+
+    def __init__(self, send_type):
+        self.send_type = send_type
+        self.start = time.time()
+        self.users = 0
+        self.digests = 0
+        self.emails = 0
+        self.failures = 0
+
+    def stats(self):
+        elapsed = time.time() - self.start
+        return {
+            'send_type': self.send_type,
+            'users': self.users,
+            'digests': self.digests,
+            'emails': self.emails,
+            'failures': self.failures,
+            'elapsed': elapsed,
+            'users_per_second': self.users / elapsed if elapsed else 0,
+        }
 
 
 @celery_app.task(name='notify.send_users_email', max_retries=0)
 def send_users_email(send_type):
     """Find pending Emails and amalgamates them into a single Email.
 
+    Users are processed in chunks of ``settings.NOTIFICATION_DIGEST_CHUNK_SIZE``.
+    The emails of a chunk are sent concurrently, after which its digests are
+    deleted and the last user of the chunk is checkpointed, so that a run that
+    crashed resumes after the last completed chunk.
+
     :param send_type
-    :return:
+    :return: dict of throughput metrics
     """
-    grouped_emails = get_users_emails(send_type)
-    if not grouped_emails:
-        return
-    for group in grouped_emails:
-        user = User.load(group['user_id'])
-        if not user:
-            log_exception()
-            continue
-        info = group['info']
-        notification_ids = [message['_id'] for message in info]
-        sorted_messages = group_by_node(info)
-        if sorted_messages:
-            mails.send_mail(
-                to_addr=user.username,
-                mimetype='html',
-                mail=mails.DIGEST,
-                name=user.fullname,
-                message=sorted_messages,
-                callback=remove_notifications(email_notification_ids=notification_ids)
-            )
+    metrics = DigestMetrics(send_type)
+    groups = iter_users_emails(send_type, after=get_checkpoint(send_type))
+    while True:
+        chunk = list(itertools.islice(groups, settings.NOTIFICATION_DIGEST_CHUNK_SIZE))
+        if not chunk:
+            break
+        send_chunk(chunk, metrics)
+        set_checkpoint(send_type, chunk[-1]['user_id'])
+    clear_checkpoint(send_type)
 
+    stats = metrics.stats()
+    logger.info(
+        'Sent {emails} {send_type} emails for {digests} digests to {users} users '
+        'in {elapsed:.1f}s ({users_per_second:.1f} users/s, {failures} failures)'.format(**stats)
+    )
+    return stats
 
-def get_users_emails(send_type):
-    """Get all emails that need to be sent.
+
+def send_chunk(chunk, metrics):
+    """Send the emails for a chunk of grouped digests, then delete the digests
+    of every email that was sent.
+    """
+    users = {
+        user._id: user
+        for user in User.find(Q('_id', 'in', [group['user_id'] for group in chunk]))
+    }
+    # Celery workers are not monkey patched, so emails are sent on threads
+    # rather than greenlets
+    pool = ThreadPool(settings.NOTIFICATION_DIGEST_CONCURRENCY)
+    try:
+        results = [
+            pool.apply_async(_send_user_email, (users.get(group['user_id']), group))
+            for group in chunk
+        ]
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+
+    sent_ids = []
+    for group, result in zip(chunk, results):
+        metrics.users += 1
+        metrics.digests += len(group['info'])
+        if result.successful() and result.get():
+            metrics.emails += 1
+            sent_ids.extend(message['_id'] for message in group['info'])
+        else:
+            metrics.failures += 1
+    remove_notifications(email_notification_ids=sent_ids)
+
+
+def _send_user_email(user, group):
+    """Call `send_user_email` on a pool thread, then return the thread's
+    database client, which rendering the digest may have taken.
+    """
+    try:
+        return send_user_email(user, group)
+    finally:
+        release_current_client()
+
+
+def send_user_email(user, group):
+    """Send a single user's digest. Returns whether an email was sent.
+    """
+    if not user:
+        log_exception()
+        return False
+    sorted_messages = group_by_node(group['info'])
+    if not sorted_messages:
+        return False
+    try:
+        mails.send_mail(
+            to_addr=user.username,
+            mimetype='html',
+            mail=mails.DIGEST,
+            name=user.fullname,
+            message=sorted_messages,
+        )
+    except Exception:
+        logger.exception('Sending notification digest to user {} failed'.format(user._id))
+        return False
+    return True
+
+
+def iter_users_emails(send_type, after=None):
+    """Stream the pending emails of every user, grouped by user.
+
+    Digests are read from a single cursor sorted by user, so only one user's
+    digests are held in memory at a time.
 
     :param send_type: from NOTIFICATION_TYPES
-    :return: [{
+    :param after: Only include users whose id sorts after this one
+    :return: iterator of {
                 'user_id': 'se8ea',
                 'info': [{
                     'message': {
@@ -60,31 +164,50 @@ def get_users_emails(send_type):
                     '_id': NotificationDigest._id
                 }, ...
                 }]
-              },
-              {
-                'user_id': ...
-              }]
+              }
     """
-    with TokuTransaction():
-        emails = db['notificationdigest'].group(
-            key={'user_id': 1},
-            condition={
-                'send_type': send_type
-            },
-            initial={'info': []},
-            reduce=Code(
-                """
-                function(curr, result) {
-                    result.info.push({
-                        'message': curr.message,
-                        'node_lineage': curr.node_lineage,
-                        '_id': curr._id
-                    });
-                };
-                """
-            )
-        )
-    return emails
+    query = {'send_type': send_type}
+    if after is not None:
+        query['user_id'] = {'$gt': after}
+    cursor = db['notificationdigest'].find(
+        query,
+        {'user_id': True, 'message': True, 'node_lineage': True},
+        sort=[('user_id', 1), ('timestamp', 1)],
+    )
+    for user_id, digests in itertools.groupby(cursor, key=lambda digest: digest['user_id']):
+        yield {
+            'user_id': user_id,
+            'info': [
+                {
+                    'message': digest['message'],
+                    'node_lineage': digest['node_lineage'],
+                    '_id': digest['_id'],
+                }
+                for digest in digests
+            ]
+        }
+
+
+def get_users_emails(send_type):
+    """Get all emails that need to be sent.
+
+    :param send_type: from NOTIFICATION_TYPES
+    :return: list of grouped emails, see `iter_users_emails`
+    """
+    return list(iter_users_emails(send_type))
+
+
+def get_checkpoint(send_type):
+    checkpoint = db[CHECKPOINT_COLLECTION].find_one({'_id': send_type})
+    return checkpoint['user_id'] if checkpoint else None
+
+
+def set_checkpoint(send_type, user_id):
+    db[CHECKPOINT_COLLECTION].update({'_id': send_type}, {'$set': {'user_id': user_id}}, upsert=True)
+
+
+def clear_checkpoint(send_type):
+    db[CHECKPOINT_COLLECTION].remove({'_id': send_type})
 
 
 def group_by_node(notifications):
@@ -105,5 +228,5 @@ def remove_notifications(email_notification_ids=None):
     :param email_notification_ids:
     :return:
     """
-    for email_id in email_notification_ids:
-        NotificationDigest.remove(Q('_id', 'eq', email_id))
+    if email_notification_ids:
+        NotificationDigest.remove(Q('_id', 'in', list(email_notification_ids)))
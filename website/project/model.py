@@ -3,6 +3,7 @@ import itertools
 import functools
 import os
 import re
+import time
 import logging
 import pymongo
 import datetime
@@ -21,6 +22,7 @@ from modularodm.exceptions import NoResultsFound
 from modularodm.exceptions import ValidationValueError
 
 from framework import status
+from framework.mongo import database
 from framework.mongo import ObjectId
 from framework.mongo import StoredObject
 from framework.mongo import validators
@@ -60,6 +62,7 @@ from website.project.licenses import (
     NodeLicenseRecord,
 )
 from website.project import signals as project_signals
+from website.project.visibility import VISIBLE_NODES_CACHE
 from website.project.spam.model import SpamMixin
 from website.project.sanctions import (
     DraftRegistrationApproval,
@@ -504,20 +507,55 @@ class NodeLog(StoredObject):
     def pk(self):
         return self._id
 
-    def clone_node_log(self, node_id):
+    @classmethod
+    def clone_logs(cls, original, node, batch_size=None):
         """
         When a node is forked or registered, all logs on the node need to be cloned for the fork or registration.
-        :param node_id:
-        :return: cloned log
+        The logs are streamed from the database and written back with batched inserts rather than loaded and
+        saved one at a time. Back references to the clones are not recorded.
+        :param Node original: The node to copy the logs of
+        :param Node node: The fork or registration to attach the clones to
+        :param int batch_size: Logs inserted at a time, defaults to ``settings.NODE_LOG_CLONE_BATCH_SIZE``
+        :return: The number of logs cloned
         """
-        original_log = self.load(self._id)
-        node = Node.find(Q('_id', 'eq', node_id))[0]
-        log_clone = original_log.clone()
-        log_clone.node = node
-        log_clone.original_node = original_log.original_node
-        log_clone.user = original_log.user
-        log_clone.save()
-        return log_clone
+        batch_size = batch_size or settings.NODE_LOG_CLONE_BATCH_SIZE
+        collection = database[cls._name]
+        start = time.time()
+        cloned = 0
+        batch = []
+        for record in collection.find({'node': original._id}).sort('date', 1).batch_size(batch_size):
+            record.pop('__backrefs', None)
+            record.update(_id=str(ObjectId()), node=node._id)
+            batch.append(record)
+            if len(batch) >= batch_size:
+                collection.insert(batch)
+                cloned += len(batch)
+                batch = []
+        if batch:
+            collection.insert(batch)
+            cloned += len(batch)
+        logger.info('Cloned {} logs of node {} to node {} in {:.2f}s'.format(
+            cloned, original._id, node._id, time.time() - start
+        ))
+        return cloned
+
+    @classmethod
+    def get_node_counters(cls, node_id):
+        """Compute the denormalized log fields of a node from its logs, see `Node.update_log_counters`.
+        :param str node_id: The node to count the logs of
+        :return: dict of ``log_count``, ``last_logged`` and ``recent_log_ids``
+        """
+        collection = database[cls._name]
+        recent = list(
+            collection.find({'node': node_id}, {'_id': True, 'date': True})
+            .sort([('date', -1), ('_id', -1)])
+            .limit(settings.NODE_RECENT_LOG_IDS_SIZE)
+        )
+        return {
+            'log_count': collection.find({'node': node_id}).count(),
+            'last_logged': recent[0]['date'] if recent else None,
+            'recent_log_ids': [record['_id'] for record in reversed(recent)],
+        }
 
     @property
     def tz_date(self):
@@ -733,6 +771,12 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
                 ('institution_domains', pymongo.ASCENDING),
             ]
         },
+        {
+            'unique': False,
+            'key_or_list': [
+                ('ancestors', pymongo.ASCENDING),
+            ]
+        },
         {
             'unique': False,
             'key_or_list': [
@@ -874,10 +918,20 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
     registered_from = fields.ForeignField('node', index=True)
     root = fields.ForeignField('node', index=True)
     parent_node = fields.ForeignField('node', index=True)
+    # IDs of the chain of parent nodes, root first, maintained on save
+    ancestors = fields.StringField(list=True)
 
     # The node (if any) used as a template for this node's creation
     template_node = fields.ForeignField('node', index=True)
 
+    # Denormalized from the node's logs by add_log, so that they need not be
+    # scanned; None until first counted, see update_log_counters
+    log_count = fields.IntegerField()
+    last_logged = fields.DateTimeField()
+    # IDs of the most recent logs, oldest first so that add_log can append
+    # and trim them with MongoDB 2.4's $push; see get_recent_log_ids
+    recent_log_ids = fields.StringField(list=True)
+
     piwik_site_id = fields.StringField()
 
     # Dictionary field mapping user id to a list of nodes in node.nodes which the user has subscriptions for
@@ -941,6 +995,78 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         """ List of logs associated with this node"""
         return NodeLog.find(Q('node', 'eq', self._id)).sort('date')
 
+    def clone(self):
+        clone = super(Node, self).clone()
+        # None of the logs are the clone's; they are recounted once it has some
+        clone.log_count = None
+        clone.last_logged = None
+        clone.recent_log_ids = []
+        return clone
+
+    def update_log_counters(self, save=True):
+        """Recompute log_count, last_logged and recent_log_ids from the node's logs."""
+        for key, value in NodeLog.get_node_counters(self._id).items():
+            setattr(self, key, value)
+        if save:
+            self.save()
+
+    def _increment_log_counters(self, log, log_date):
+        """Count ``log`` in the stored counters with a single atomic update, so
+        that concurrent logs on the node are all counted, and mirror the
+        result on this instance. Recounts instead if another process stored a
+        more recent log in the meantime.
+        """
+        counters = database[self._name].find_and_modify(
+            {
+                '_id': self._id,
+                '$or': [
+                    {'last_logged': {'$lte': log_date}},
+                    {'last_logged': None},
+                ],
+            },
+            {
+                '$inc': {'log_count': 1},
+                '$push': {'recent_log_ids': {
+                    '$each': [log._id],
+                    '$slice': -settings.NODE_RECENT_LOG_IDS_SIZE,
+                }},
+                '$set': {'last_logged': log_date},
+            },
+            new=True,
+            fields={'log_count': True, 'last_logged': True, 'recent_log_ids': True},
+        )
+        if counters is None:
+            self.update_log_counters(save=False)
+            return
+        counters.pop('_id')
+        for key, value in counters.items():
+            setattr(self, key, value)
+        # Already stored; keep save from writing them back over concurrent updates
+        cached_data = self._get_cached_data(self._primary_key)
+        if cached_data is not None:
+            cached_data.update(counters)
+
+    def _ensure_log_counters(self):
+        if self.log_count is None:
+            self.update_log_counters(save=False)
+
+    def get_log_count(self):
+        """Number of logs on the node."""
+        self._ensure_log_counters()
+        return self.log_count
+
+    def get_last_logged(self):
+        """Date of the node's most recent log, or None."""
+        self._ensure_log_counters()
+        return self.last_logged
+
+    def get_recent_log_ids(self):
+        """IDs of the node's most recent logs, newest first; at most
+        ``settings.NODE_RECENT_LOG_IDS_SIZE`` of them.
+        """
+        self._ensure_log_counters()
+        return list(reversed(self.recent_log_ids))
+
     @property
     def license(self):
         node_license = self.node_license
@@ -1133,9 +1259,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
     def is_admin_parent(self, user):
         if self.has_permission(user, 'admin', check_parent=False):
             return True
-        if self.parent_node:
-            return self.parent_node.is_admin_parent(user)
-        return False
+        return any(parent.has_permission(user, 'admin', check_parent=False) for parent in self.parents)
 
     def can_view(self, auth):
         if auth and getattr(auth.private_link, 'anonymous', False):
@@ -1249,15 +1373,20 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         """
         if self.has_permission(user, permission):
             return True
+        if user is None:
+            return False
 
-        for node in self.nodes:
-            if not node.primary or node.is_deleted:
-                continue
-
-            if node.has_permission_on_children(user, permission):
-                return True
-
-        return False
+        descendants, ancestor_ids = self._get_live_primary_descendants()
+        # Resolve admin rights on parents once for the whole subtree, see `is_admin_parent`
+        admin_ids = {
+            node._id for node in itertools.chain([self], descendants)
+            if 'admin' in node.permissions.get(user._id, [])
+        }
+        return any(
+            permission in node.permissions.get(user._id, []) or
+            (permission == 'read' and admin_ids.intersection(ancestor_ids[node._id]))
+            for node in descendants
+        )
 
     def has_addon_on_children(self, addon):
         """Checks if a given node has a specific addon on child nodes
@@ -1266,14 +1395,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         if self.has_addon(addon):
             return True
 
-        for node in self.nodes:
-            if not node.primary or node.is_deleted:
-                continue
-
-            if node.has_addon_on_children(addon):
-                return True
-
-        return False
+        descendants, _ = self._get_live_primary_descendants()
+        return any(node.has_addon(addon) for node in descendants)
 
     def get_permissions(self, user):
         """Get list of permissions for user.
@@ -1298,9 +1421,16 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
     @property
     def parents(self):
-        if self.parent_node:
+        """The chain of parent nodes, nearest first, loaded with a single query."""
+        ancestor_ids = list(self.ancestors)
+        ancestors = {
+            node._id: node
+            for node in Node.find(Q('_id', 'in', ancestor_ids))
+        } if ancestor_ids else {}
+        if self.parent_node and (not ancestor_ids or len(ancestors) != len(ancestor_ids)):
+            # Ancestors not stored yet (see migrate_ancestors_on_node), walk the parent pointers instead
             return [self.parent_node] + self.parent_node.parents
-        return []
+        return [ancestors[node_id] for node_id in reversed(ancestor_ids)]
 
     @property
     def admin_contributor_ids(self, contributors=None):
@@ -1520,10 +1650,24 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
         self.root = self._root._id
         self.parent_node = self._parent_node
+        if self.parent_node:
+            self.ancestors = list(self.parent_node.ancestors) + [self.parent_node._id]
+        else:
+            self.ancestors = []
 
         # If you're saving a property, do it above this super call
         saved_fields = super(Node, self).save(*args, **kwargs)
 
+        if 'ancestors' in saved_fields and not first_save:
+            self._update_descendant_ancestors()
+        if 'nodes' in saved_fields:
+            # Forks and templates attach components that were saved before
+            # their parent, so they do not know their ancestors yet
+            ancestors = list(self.ancestors) + [self._id]
+            for node in self.nodes_primary:
+                if list(node.ancestors) != ancestors:
+                    node.save()
+
         if first_save and is_original and not suppress_log:
             # TODO: This logic also exists in self.use_as_template()
             for addon in settings.ADDONS_AVAILABLE:
@@ -1560,7 +1704,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         if self.is_collection or self.archiving:
             need_update = False
         if need_update:
-            self.update_search()
+            self.update_search(saved_fields=None if first_save else saved_fields)
 
         if 'node_license' in saved_fields:
             children = [c for c in self.get_descendants_recursive(
@@ -1787,11 +1931,66 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
         :param node Node: target Node
         """
-        return itertools.chain([self], self.get_descendants_recursive(lambda n: n.primary))
+        return itertools.chain([self], self.get_primary_descendants())
+
+    def get_primary_descendants(self):
+        """Return all primary (non-pointer) descendants of this node, including
+        deleted ones, with a single query on `ancestors`.
+        """
+        descendants = list(Node.find(Q('ancestors', 'eq', self._id)))
+        found = {node._id for node in descendants}
+        for node in itertools.chain([self], descendants):
+            if not found.issuperset(node._get_primary_child_ids()):
+                # Ancestors not stored yet (see migrate_ancestors_on_node), walk the nodes lists instead
+                return list(self._get_descendants_recursive(lambda node: node.primary))
+        return descendants
+
+    def _get_primary_child_ids(self):
+        """IDs of the components in `nodes`, read without loading them."""
+        return [node_id for node_id, name in self.nodes._to_data() if name == Node._name]
+
+    def _get_descendant_ancestor_ids(self, descendants):
+        """Map the ID of each of ``descendants`` to the IDs of its parents from
+        this node down, following the `nodes` lists of the loaded subtree.
+        """
+        by_id = {node._id: node for node in descendants}
+        ancestor_ids = {}
+        stack = [(self, [self._id])]
+        while stack:
+            node, chain = stack.pop()
+            for child_id in node._get_primary_child_ids():
+                if child_id in by_id and child_id not in ancestor_ids:
+                    ancestor_ids[child_id] = chain
+                    stack.append((by_id[child_id], chain + [child_id]))
+        return ancestor_ids
+
+    def _get_live_primary_descendants(self):
+        """Return the primary descendants of this node that are neither deleted
+        nor below a deleted node, and the IDs of their parents from this node
+        down, see `_get_descendant_ancestor_ids`.
+        """
+        descendants = self.get_primary_descendants()
+        ancestor_ids = self._get_descendant_ancestor_ids(descendants)
+        deleted_ids = {node._id for node in descendants if node.is_deleted}
+        live = [
+            node for node in descendants
+            if node._id in ancestor_ids and
+            not node.is_deleted and
+            not deleted_ids.intersection(ancestor_ids[node._id])
+        ]
+        return live, ancestor_ids
+
+    def _update_descendant_ancestors(self):
+        """Recompute the ancestors of every descendant after those of this node
+        changed, parents before their children.
+        """
+        descendants = sorted(self.get_primary_descendants(), key=lambda node: len(node.ancestors))
+        for node in descendants:
+            node.save(update_piwik=False)
 
     @property
     def depth(self):
-        return len(self.parents)
+        return len(self.ancestors) if self.ancestors else len(self.parents)
 
     def next_descendants(self, auth, condition=lambda auth, node: True):
         """
@@ -1799,35 +1998,102 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
         returns a list of [(node, [children]), ...]
         """
+        # Load the subtree up front so the walk finds the nodes in the identity map
+        list(self.get_primary_descendants())
+        return self._next_descendants(auth, condition)
+
+    def _next_descendants(self, auth, condition):
         ret = []
         for node in self.nodes:
             if condition(auth, node):
                 # base case
                 ret.append((node, []))
             else:
-                ret.append((node, node.next_descendants(auth, condition)))
+                ret.append((node, node._next_descendants(auth, condition)))
         ret = [item for item in ret if item[1] or condition(auth, item[0])]  # prune empty branches
         return ret
 
     def get_descendants_recursive(self, include=lambda n: True):
+        # Load the subtree up front so the walk finds the nodes in the identity map
+        list(self.get_primary_descendants())
+        for node in self._get_descendants_recursive(include):
+            yield node
+
+    def _get_descendants_recursive(self, include):
         for node in self.nodes:
             if include(node):
                 yield node
             if node.primary:
-                for descendant in node.get_descendants_recursive(include):
+                for descendant in node._get_descendants_recursive(include):
                     if include(descendant):
                         yield descendant
 
+    def get_visible_descendant_ids(self, auth):
+        """Return the IDs of the primary descendants of this node that ``auth``
+        can view, with the same rules as `can_view` but resolved for the whole
+        subtree at once. Results are cached per node and user, see
+        `website.project.visibility`.
+
+        :param Auth auth: Consolidated authorization
+        :return frozenset: IDs of the visible descendants
+        """
+        private_link = auth.private_link if auth else None
+        user = auth.user if auth else None
+        private_key = auth.private_key if auth else None
+        cache_key = (self._id, user._id if user else None, private_key)
+        root_id = self.root._id if self.root else self._id
+        if not getattr(private_link, 'anonymous', False):
+            ids = VISIBLE_NODES_CACHE.get(root_id, cache_key)
+            if ids is not None:
+                return ids
+
+        descendants = self.get_primary_descendants()
+        if getattr(private_link, 'anonymous', False):
+            return frozenset(node._id for node in descendants if node.can_view(auth))
+
+        admin_ids = set()
+        parent_admin = False
+        if user:
+            admin_ids = {
+                node._id for node in itertools.chain([self], descendants)
+                if node.has_permission(user, 'admin', check_parent=False)
+            }
+            parent_admin = any(node.has_permission(user, 'admin', check_parent=False) for node in self.parents)
+        ancestor_ids = self._get_descendant_ancestor_ids(descendants)
+        link_ids = set()
+        if private_key:
+            for link in PrivateLink.find(Q('key', 'eq', private_key) & Q('is_deleted', 'eq', False)):
+                link_ids.update(link.nodes._to_primary_keys())
+
+        ids = frozenset(
+            node._id for node in descendants
+            if node.is_public or
+            (user and 'read' in node.permissions.get(user._id, [])) or
+            node._id in link_ids or
+            admin_ids.intersection(ancestor_ids.get(node._id, node.ancestors)) or
+            parent_admin
+        )
+        VISIBLE_NODES_CACHE.set(root_id, cache_key, ids)
+        return ids
+
     def get_aggregate_logs_query(self, auth):
-        ids = [self._id] + [n._id
-                            for n in self.get_descendants_recursive()
-                            if n.can_view(auth)]
+        ids = [self._id] + sorted(self.get_visible_descendant_ids(auth))
         query = Q('node', 'in', ids) & Q('should_hide', 'ne', True)
         return query
 
-    def get_aggregate_logs_queryset(self, auth):
+    def get_aggregate_logs_queryset(self, auth, before=None):
+        """Return the logs of this node and the descendants ``auth`` can view,
+        newest first.
+
+        :param tuple before: ``(date, _id)`` of the last log already seen; when
+            given, only older logs are returned, so pages can be fetched with a
+            keyset cursor instead of an offset
+        """
         query = self.get_aggregate_logs_query(auth)
-        return NodeLog.find(query).sort('-date')
+        if before:
+            date, log_id = before
+            query = query & (Q('date', 'lt', date) | (Q('date', 'eq', date) & Q('_id', 'lt', log_id)))
+        return NodeLog.find(query).sort('-date', '-_id')
 
     @property
     def nodes_pointer(self):
@@ -2002,10 +2268,16 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
             self.save()
         return None
 
-    def update_search(self):
+    def update_search(self, saved_fields=None):
+        """Update the node's search documents.
+
+        :param saved_fields: Fields changed since the last update; only the
+            parts of the index that depend on them are rewritten. By default
+            everything is reindexed.
+        """
         from website import search
         try:
-            search.search.update_node(self, bulk=False, async=True)
+            search.search.update_node(self, bulk=False, async=True, saved_fields=saved_fields)
         except search.exceptions.SearchUnavailableError as e:
             logger.exception(e)
             log_exception()
@@ -2193,9 +2465,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         )
 
         # Clone each log from the original node for this fork.
-        logs = original.logs
-        for log in logs:
-            log.clone_node_log(forked._id)
+        NodeLog.clone_logs(original, forked)
+        forked.update_log_counters()
 
         forked.reload()
 
@@ -2260,9 +2531,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         registered.save()
 
         # Clone each log from the original node for this registration.
-        logs = original.logs
-        for log in logs:
-            log.clone_node_log(registered._id)
+        NodeLog.clone_logs(original, registered)
+        registered.update_log_counters()
 
         registered.is_public = False
         for node in registered.get_descendants_recursive():
@@ -2421,10 +2691,14 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
             log.date = log_date
         log.save()
 
-        if len(self.logs) == 1:
-            self.date_modified = log.date.replace(tzinfo=None)
+        log_date = log.date.replace(tzinfo=None)
+        stored = self._get_cached_data(self._primary_key) or {}
+        if stored.get('log_count') is None or (self.last_logged and log_date < self.last_logged):
+            # Not counted yet, or a log dated before the most recent ones
+            self.update_log_counters(save=False)
         else:
-            self.date_modified = self.logs[-1].date.replace(tzinfo=None)
+            self._increment_log_counters(log, log_date)
+        self.date_modified = self.last_logged
 
         if save:
             self.save()
@@ -2524,8 +2798,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         if doi:
             csl['DOI'] = doi
 
-        if self.logs:
-            csl['issued'] = datetime_to_csl(self.logs[-1].date)
+        if self.get_last_logged():
+            csl['issued'] = datetime_to_csl(self.get_last_logged())
 
         return csl
 
@@ -8,7 +8,6 @@ from flask import request
 
 from api.caching.tasks import ban_url
 from framework.guid.model import Guid
-from framework.postcommit_tasks.handlers import enqueue_postcommit_task
 from modularodm import Q
 from website import settings
 from website.addons.base.signals import file_updated
@@ -145,11 +144,11 @@ def is_reply(target):
 
 def _update_comments_timestamp(auth, node, page=Comment.OVERVIEW, root_id=None):
     if node.is_contributor(auth.user):
-        enqueue_postcommit_task(ban_url, (node, ), {})
+        ban_url(node)
         if root_id is not None:
             guid_obj = Guid.load(root_id)
             if guid_obj is not None:
-                enqueue_postcommit_task(ban_url, (guid_obj.referent, ), {})
+                ban_url(guid_obj.referent)
 
         # update node timestamp
         if page == Comment.OVERVIEW:
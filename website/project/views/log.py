@@ -3,6 +3,7 @@ import httplib as http
 import logging
 import math
 
+from dateutil.parser import parse as parse_date
 from flask import request
 
 from framework.exceptions import HTTPError
@@ -55,12 +56,49 @@ def _get_logs(node, count, auth, page=0):
 
     return logs, total, pages
 
+def _get_logs_after(node, count, auth, cursor=None):
+    """Keyset-paginated variant of `_get_logs`.
+
+    :param str cursor: Cursor returned with the previous page, if any
+    :return list: List of serialized logs,
+            str: cursor of the next page, or None if there are no more logs
+    """
+    before = decode_log_cursor(cursor) if cursor else None
+    logs_set = node.get_aggregate_logs_queryset(auth, before=before)
+    # Fetch one extra log to tell whether there is a next page
+    page = list(logs_set.limit(count + 1))
+    anonymous = has_anonymous_link(node, auth)
+    logs = [serialize_log(log, auth=auth, anonymous=anonymous) for log in page[:count]]
+    next_cursor = encode_log_cursor(page[count - 1]) if count and len(page) > count else None
+    return logs, next_cursor
+
+
+def encode_log_cursor(log):
+    return '{0}_{1}'.format(log.date.isoformat(), log._id)
+
+
+def decode_log_cursor(cursor):
+    """
+    :raises: HTTPError(400) if the cursor is malformed
+    """
+    try:
+        date, log_id = cursor.rsplit('_', 1)
+        return parse_date(date), log_id
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPError(http.BAD_REQUEST, data=dict(
+            message_long='Invalid value for "cursor".'
+        ))
+
+
 @no_auto_transaction
 @collect_auth
 @must_be_valid_project(retractions_valid=True)
 def get_logs(auth, node, **kwargs):
-    """
+    """Return a page of the logs of ``node`` and its visible components.
 
+    Pages are selected with `page`, or, when `cursor` is given (empty for the
+    first page), with the `next_cursor` returned by the previous page, which
+    does not need to count or skip the logs before it.
     """
     try:
         page = int(request.args.get('page', 0))
@@ -81,6 +119,10 @@ def get_logs(auth, node, **kwargs):
     else:
         count = 10
 
+    if 'cursor' in request.args:
+        logs, next_cursor = _get_logs_after(node, count, auth, request.args['cursor'])
+        return {'logs': logs, 'next_cursor': next_cursor}
+
     # Serialize up to `count` logs in reverse chronological order; skip
     # logs that the current user / API key cannot access
     logs, total, pages = _get_logs(node, count, auth, page)
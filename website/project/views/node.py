@@ -697,7 +697,7 @@ def _view_project(node, auth, primary=False):
             'is_public': node.is_public,
             'is_archiving': node.archiving,
             'date_created': iso8601format(node.date_created),
-            'date_modified': iso8601format(node.logs[-1].date) if node.logs else '',
+            'date_modified': iso8601format(node.get_last_logged()) if node.get_last_logged() else '',
             'tags': [tag._primary_key for tag in node.tags],
             'children': bool(node.nodes_active),
             'is_registration': node.is_registration,
@@ -854,7 +854,7 @@ def get_editable_children(auth, node, **kwargs):
 
 @must_be_valid_project
 def get_recent_logs(node, **kwargs):
-    logs = list(reversed(node.logs._to_primary_keys()))[:3]
+    logs = node.get_recent_log_ids()[:3]
     return {'logs': logs}
 
 
@@ -902,7 +902,7 @@ def _get_summary(node, auth, primary=True, link_id=None, show_path=False):
             'parent_title': node.parent_node.title if node.parent_node else None,
             'parent_is_public': node.parent_node.is_public if node.parent_node else False,
             'show_path': show_path,
-            'nlogs': len(node.logs),
+            'nlogs': node.get_log_count(),
         })
     else:
         summary['can_view'] = False
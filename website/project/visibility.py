@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Cache of which parts of a project tree a user can view.
+
+Aggregate log feeds need the IDs of every descendant of a node that the
+current user may see. Resolving them means reading the whole subtree, so the
+result is kept per (node, user, private link key) until a node of the same
+tree is saved with a change to its place in the tree or to who may see it, or
+until a private link changes.
+
+This is a permission cache. Entries are keyed by a generation number per
+tree, and saves bump it. With ``settings.VISIBLE_NODES_CACHE_SHARED_BACKEND``
+configured, the generations are shared, so a change made in one process
+invalidates the entries of every process. Without one, other processes only
+see the change once their entries expire after
+``settings.VISIBLE_NODES_CACHE_TTL`` seconds, which therefore stays short.
+"""
+
+from modularodm import signals
+
+from framework.mongo.object_cache import TTLCache, Generations
+from website import settings
+
+
+# Node fields whose changes may change who can see a node
+VISIBILITY_FIELDS = {
+    'nodes',
+    'parent_node',
+    'ancestors',
+    'permissions',
+    'contributors',
+    'is_public',
+    'is_deleted',
+}
+
+
+# Generation group bumped when any private link changes
+ALL_TREES = '*'
+
+
+class VisibleNodesCache(object):
+    """Bounded LRU of visible node IDs, keyed by the generation of the root of
+    their tree so a save can drop every entry of its tree at once.
+
+    :param int ttl: Seconds an entry may live
+    :param int max_entries: Maximum number of entries held
+    :param shared: Optional shared tier for the generations, see `LocalSharedBackend`
+    """
+
+    def __init__(self, ttl=5, max_entries=1000, shared=None):
+        self._entries = TTLCache(ttl=ttl, max_entries=max_entries)
+        # Outlive every entry of the previous generation
+        self._generations = Generations(
+            'visiblegeneration', ttl * 2, max_entries=max_entries, shared=shared, on_reset=self._entries.clear,
+        )
+
+    def _key(self, root_id, key):
+        return (root_id, self._generations.get(root_id), self._generations.get(ALL_TREES)) + tuple(key)
+
+    def get(self, root_id, key):
+        """Return the cached IDs for ``key`` in the tree of ``root_id``, or `None`."""
+        return self._entries.get(self._key(root_id, key))
+
+    def set(self, root_id, key, ids):
+        self._entries.set(self._key(root_id, key), frozenset(ids))
+
+    def invalidate_tree(self, root_id):
+        self._generations.bump(root_id)
+
+    def invalidate_all(self):
+        self._generations.bump(ALL_TREES)
+
+    def clear(self):
+        self._entries.clear()
+        self._generations.clear()
+
+
+VISIBLE_NODES_CACHE = VisibleNodesCache(
+    ttl=settings.VISIBLE_NODES_CACHE_TTL,
+    max_entries=settings.VISIBLE_NODES_CACHE_MAX_ENTRIES,
+    shared=settings.VISIBLE_NODES_CACHE_SHARED_BACKEND,
+)
+
+
+@signals.save.connect
+def invalidate_visible_nodes(sender, instance, fields_changed, cached_data):
+    if sender._name == 'privatelink':
+        VISIBLE_NODES_CACHE.invalidate_all()
+    elif sender._name == 'node' and VISIBILITY_FIELDS.intersection(fields_changed or ()):
+        VISIBLE_NODES_CACHE.invalidate_tree(instance.root._id if instance.root else instance._id)
+        # A node moved to another tree also changes what its old root's tree contains
+        old_root = (cached_data or {}).get('root')
+        if old_root:
+            VISIBLE_NODES_CACHE.invalidate_tree(old_root)
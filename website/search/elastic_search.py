@@ -4,6 +4,7 @@ from __future__ import division
 
 import copy
 import functools
+import itertools
 import logging
 import math
 import re
@@ -273,79 +274,166 @@ def get_doctype_from_node(node):
     else:
         return node.category
 
+# Node fields that are copied into the documents of the node's files
+NODE_FILE_FIELDS = {
+    'title',
+    'is_public',
+    'is_deleted',
+    'is_registration',
+    'parent_node',
+}
+
+# Node fields that decide whether and under which doc_type a node is indexed,
+# or that require its wikis to be reloaded. Changing any of them rewrites the
+# whole document; other changes are sent as partial updates.
+NODE_REINDEX_FIELDS = {
+    'category',
+    'is_public',
+    'is_deleted',
+    'is_registration',
+    'is_retracted',
+    'retraction',
+    'parent_node',
+    'wiki_pages_current',
+}
+
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
-def update_node_async(self, node_id, index=None, bulk=False):
+def update_node_async(self, node_id, index=None, bulk=False, saved_fields=None):
     node = Node.load(node_id)
     try:
-        update_node(node=node, index=index, bulk=bulk)
+        update_node(node=node, index=index, bulk=bulk, saved_fields=saved_fields)
     except Exception as exc:
         self.retry(exc=exc)
 
 @requires_search
-def update_node(node, index=None, bulk=False):
+def update_node(node, index=None, bulk=False, saved_fields=None):
+    """Index ``node`` and the files stored on it.
+
+    :param bool bulk: Return the node's document instead of indexing it
+    :param saved_fields: Fields changed by the save that triggered this update,
+        as returned by `Node.save`. Only the parts of the index affected by
+        these fields are rewritten. If `None`, everything is reindexed.
+    """
     index = index or INDEX
-    from website.addons.wiki.model import NodeWikiPage
+    saved_fields = set(saved_fields) if saved_fields is not None else None
 
     category = get_doctype_from_node(node)
-
     elastic_document_id = node._id
-    parent_id = node.parent_id
 
-    from website.files.models.osfstorage import OsfStorageFile
-    for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
-        update_file(file_, index=index)
+    actions = []
+    if saved_fields is None or saved_fields & NODE_FILE_FIELDS:
+        from website.files.models.osfstorage import OsfStorageFile
+        actions = (
+            serialize_file_action(file_, index)
+            for file_ in paginated(OsfStorageFile, Q('node', 'eq', node))
+        )
 
     if node.is_deleted or not node.is_public or node.archiving:
-        delete_doc(elastic_document_id, node)
+        if not bulk:
+            doc_type = 'registration' if node.is_registration else node.project_or_component
+            actions = itertools.chain(actions, [{
+                '_op_type': 'delete',
+                '_index': index,
+                '_type': doc_type,
+                '_id': elastic_document_id,
+            }])
+        _send_bulk(actions)
+        return
+
+    reindex = bulk or saved_fields is None or bool(saved_fields & NODE_REINDEX_FIELDS)
+    elastic_document = serialize_node(node, category, include_wikis=reindex)
+    if bulk:
+        _send_bulk(actions)
+        return elastic_document
+
+    if reindex:
+        node_action = {
+            '_index': index,
+            '_type': category,
+            '_id': elastic_document_id,
+            '_source': elastic_document,
+        }
     else:
-        try:
-            normalized_title = six.u(node.title)
-        except TypeError:
-            normalized_title = node.title
-        normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
-
-        elastic_document = {
-            'id': elastic_document_id,
-            'contributors': [
-                {
-                    'fullname': x.fullname,
-                    'url': x.profile_url if x.is_active else None
-                }
-                for x in node.visible_contributors
-                if x is not None
-            ],
-            'title': node.title,
-            'normalized_title': normalized_title,
-            'category': category,
-            'public': node.is_public,
-            'tags': [tag._id for tag in node.tags if tag],
-            'description': node.description,
-            'url': node.url,
-            'is_registration': node.is_registration,
-            'is_pending_registration': node.is_pending_registration,
-            'is_retracted': node.is_retracted,
-            'is_pending_retraction': node.is_pending_retraction,
-            'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
-            'is_pending_embargo': node.is_pending_embargo,
-            'registered_date': node.registered_date,
-            'wikis': {},
-            'parent_id': parent_id,
-            'date_created': node.date_created,
-            'license': serialize_node_license_record(node.license),
-            'primary_institution': node.primary_institution.name if node.primary_institution else None,
-            'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
+        node_action = {
+            '_op_type': 'update',
+            '_index': index,
+            '_type': category,
+            '_id': elastic_document_id,
+            'doc': elastic_document,
         }
-        if not node.is_retracted:
-            for wiki in [
-                NodeWikiPage.load(x)
-                for x in node.wiki_pages_current.values()
-            ]:
-                elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
-
-        if bulk:
-            return elastic_document
-        else:
-            es.index(index=index, doc_type=category, id=elastic_document_id, body=elastic_document, refresh=True)
+    _, errors = _send_bulk(itertools.chain(actions, [node_action]))
+    if not reindex and any(error.get('update', {}).get('_id') == elastic_document_id for error in errors):
+        # The partial update failed, most likely because the document has not
+        # been indexed yet; write it in full
+        es.index(
+            index=index,
+            doc_type=category,
+            id=elastic_document_id,
+            body=serialize_node(node, category),
+            refresh=settings.ELASTIC_FORCE_REFRESH
+        )
+
+def serialize_node(node, category, include_wikis=True):
+    """Build the search document for ``node``. The `wikis` key is left out
+    unless ``include_wikis`` is set.
+    """
+    try:
+        normalized_title = six.u(node.title)
+    except TypeError:
+        normalized_title = node.title
+    normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
+
+    elastic_document = {
+        'id': node._id,
+        'contributors': [
+            {
+                'fullname': x.fullname,
+                'url': x.profile_url if x.is_active else None
+            }
+            for x in node.visible_contributors
+            if x is not None
+        ],
+        'title': node.title,
+        'normalized_title': normalized_title,
+        'category': category,
+        'public': node.is_public,
+        'tags': [tag._id for tag in node.tags if tag],
+        'description': node.description,
+        'url': node.url,
+        'is_registration': node.is_registration,
+        'is_pending_registration': node.is_pending_registration,
+        'is_retracted': node.is_retracted,
+        'is_pending_retraction': node.is_pending_retraction,
+        'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
+        'is_pending_embargo': node.is_pending_embargo,
+        'registered_date': node.registered_date,
+        'parent_id': node.parent_id,
+        'date_created': node.date_created,
+        'license': serialize_node_license_record(node.license),
+        'primary_institution': node.primary_institution.name if node.primary_institution else None,
+        'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
+    }
+    if include_wikis:
+        elastic_document['wikis'] = serialize_wikis(node) if not node.is_retracted else {}
+    return elastic_document
+
+def serialize_wikis(node):
+    from website.addons.wiki.model import NodeWikiPage
+
+    wiki_ids = node.wiki_pages_current.values()
+    if not wiki_ids:
+        return {}
+    return {
+        wiki.page_name: wiki.raw_text(node)
+        for wiki in NodeWikiPage.find(Q('_id', 'in', wiki_ids))
+    }
+
+def _send_bulk(actions):
+    """Send ``actions`` to elasticsearch in chunks. Failed actions, such as
+    deletes of documents that were never indexed, are returned rather than
+    raised.
+    """
+    return helpers.bulk(es, actions, refresh=settings.ELASTIC_FORCE_REFRESH)
 
 def bulk_update_nodes(serialize, nodes, index=None):
     """Updates the list of input projects
@@ -437,17 +525,44 @@ def update_user(user, index=None):
 def update_file(file_, index=None, delete=False):
 
     index = index or INDEX
+    action = serialize_file_action(file_, index, delete=delete)
 
-    if not file_.node.is_public or delete or file_.node.is_deleted or file_.node.archiving:
+    if action['_op_type'] == 'delete':
         es.delete(
             index=index,
             doc_type='file',
             id=file_._id,
-            refresh=True,
+            refresh=settings.ELASTIC_FORCE_REFRESH,
             ignore=[404]
         )
         return
 
+    es.index(
+        index=index,
+        doc_type='file',
+        body=action['_source'],
+        id=file_._id,
+        refresh=settings.ELASTIC_FORCE_REFRESH
+    )
+
+@requires_search
+def update_files(files, index=None):
+    """Index ``files`` with bulk requests rather than one request per file."""
+    index = index or INDEX
+    _send_bulk(serialize_file_action(file_, index) for file_ in files)
+
+def serialize_file_action(file_, index, delete=False):
+    """Build the bulk action that indexes ``file_``, or removes it from the
+    index if its node is not public.
+    """
+    if not file_.node.is_public or delete or file_.node.is_deleted or file_.node.archiving:
+        return {
+            '_op_type': 'delete',
+            '_index': index,
+            '_type': 'file',
+            '_id': file_._id,
+        }
+
     # We build URLs manually here so that this function can be
     # run outside of a Flask request context (e.g. in a celery task)
     file_deep_url = '/{node_id}/files/{provider}{path}/'.format(
@@ -469,13 +584,13 @@ def update_file(file_, index=None, delete=False):
         'is_registration': file_.node.is_registration,
     }
 
-    es.index(
-        index=index,
-        doc_type='file',
-        body=file_doc,
-        id=file_._id,
-        refresh=True
-    )
+    return {
+        '_op_type': 'index',
+        '_index': index,
+        '_type': 'file',
+        '_id': file_._id,
+        '_source': file_doc,
+    }
 
 @requires_search
 def update_institution(institution, index=None):
@@ -555,7 +670,7 @@ def create_index(index=None):
 def delete_doc(elastic_document_id, node, index=None, category=None):
     index = index or INDEX
     category = category or 'registration' if node.is_registration else node.project_or_component
-    es.delete(index=index, doc_type=category, id=elastic_document_id, refresh=True, ignore=[404])
+    es.delete(index=index, doc_type=category, id=elastic_document_id, refresh=settings.ELASTIC_FORCE_REFRESH, ignore=[404])
 
 
 @requires_search
@@ -594,15 +709,19 @@ def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
     pages = math.ceil(results['counts'].get('user', 0) / size)
     validate_page_num(page, pages)
 
-    users = []
-    for doc in docs:
-        # TODO: use utils.serialize_user
-        user = User.load(doc['id'])
+    # TODO: use utils.serialize_user
+    hits = [(doc, User.load(doc['id'])) for doc in docs]
+    if current_user:
+        projects_in_common = current_user.get_n_projects_in_common([user for _, user in hits if user])
+    else:
+        projects_in_common = {}
 
-        if current_user and current_user._id == user._id:
+    users = []
+    for doc, user in hits:
+        if current_user and user and current_user._id == user._id:
             n_projects_in_common = -1
-        elif current_user:
-            n_projects_in_common = current_user.n_projects_in_common(user)
+        elif current_user and user:
+            n_projects_in_common = projects_in_common[user._id]
         else:
             n_projects_in_common = 0
 
@@ -26,20 +26,21 @@ def search(query, index=None, doc_type=None):
     return search_engine.search(query, index=index, doc_type=doc_type)
 
 @requires_search
-def update_node(node, index=None, bulk=False, async=True):
+def update_node(node, index=None, bulk=False, async=True, saved_fields=None):
     if async:
         node_id = node._id
+        saved_fields = list(saved_fields) if saved_fields is not None else None
         # We need the transaction to be committed before trying to run celery tasks.
         # For example, when updating a Node's privacy, is_public must be True in the
         # database in order for method that updates the Node's elastic search document
         # to run correctly.
         if settings.USE_CELERY:
-            enqueue_task(search_engine.update_node_async.s(node_id=node_id, index=index, bulk=bulk))
+            enqueue_task(search_engine.update_node_async.s(node_id=node_id, index=index, bulk=bulk, saved_fields=saved_fields))
         else:
-            search_engine.update_node_async(node_id=node_id, index=index, bulk=bulk)
+            search_engine.update_node_async(node_id=node_id, index=index, bulk=bulk, saved_fields=saved_fields)
     else:
         index = index or settings.ELASTIC_INDEX
-        return search_engine.update_node(node, index=index, bulk=bulk)
+        return search_engine.update_node(node, index=index, bulk=bulk, saved_fields=saved_fields)
 
 @requires_search
 def bulk_update_nodes(serialize, nodes, index=None):
@@ -68,6 +69,11 @@ def update_file(file_, index=None, delete=False):
     index = index or settings.ELASTIC_INDEX
     search_engine.update_file(file_, index=index, delete=delete)
 
+@requires_search
+def update_files(files, index=None):
+    index = index or settings.ELASTIC_INDEX
+    search_engine.update_files(files, index=index)
+
 @requires_search
 def update_institution(institution, index=None):
     index = index or settings.ELASTIC_INDEX
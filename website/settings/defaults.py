@@ -74,6 +74,10 @@ SEARCH_ENGINE = 'elastic'  # Can be 'elastic', or None
 ELASTIC_URI = 'localhost:9200'
 ELASTIC_TIMEOUT = 10
 ELASTIC_INDEX = 'website'
+# Refresh the index after every write to node and file documents so that the
+# write is searchable immediately. Leave off in production and rely on the
+# index's refresh interval instead.
+ELASTIC_FORCE_REFRESH = False
 SHARE_ELASTIC_URI = ELASTIC_URI
 SHARE_ELASTIC_INDEX = 'share'
 # For old indices
@@ -144,6 +148,77 @@ DB_NAME = 'osf20130903'
 DB_USER = None
 DB_PASS = None
 
+# MongoDB client pool. Clients are shared between threads and greenlets; each
+# client holds up to DB_POOL_SOCKETS_PER_CLIENT sockets and serves as many
+# concurrent leases before another client is created.
+DB_POOL_MAX_CLIENTS = 4
+DB_POOL_MIN_CLIENTS = 1
+DB_POOL_SOCKETS_PER_CLIENT = 25
+# Seconds to wait for a free client before giving up
+DB_POOL_ACQUIRE_TIMEOUT = 10
+# Seconds an unused client may sit in the pool before it is closed
+DB_POOL_IDLE_TIMEOUT = 300
+# Seconds between liveness pings of a pooled client
+DB_POOL_HEALTH_CHECK_INTERVAL = 30
+# Celery workers run one task at a time per process and need far fewer sockets,
+# but each digest email thread takes its own lease, so a worker needs room for
+# the task plus NOTIFICATION_DIGEST_CONCURRENCY threads
+CELERY_DB_POOL_MAX_CLIENTS = 1
+CELERY_DB_POOL_SOCKETS_PER_CLIENT = 11
+
+# Post-commit tasks run on a bounded pool of greenlets before the response is returned
+POSTCOMMIT_MAX_CONCURRENCY = 10
+# Seconds before a running post-commit task is cancelled
+POSTCOMMIT_TASK_TIMEOUT = 10
+# Hand post-commit tasks that support it to Celery once the response has been sent
+POSTCOMMIT_CELERY = False
+
+# Page view counts are merged in memory and written to the database at most
+# every ANALYTICS_FLUSH_INTERVAL seconds, or once this many pages are pending
+ANALYTICS_FLUSH_INTERVAL = 10
+ANALYTICS_BUFFER_MAX_PAGES = 1000
+# Unique visitors are counted with HyperLogLog sketches of 2 ** precision bytes
+ANALYTICS_SKETCH_PRECISION = 10
+# Number of most recent days whose visitor sketches are kept, so that views
+# buffered across midnight are merged into the right day
+ANALYTICS_SKETCH_DAYS = 2
+
+# Users whose notification digests are sent, and then deleted, together
+NOTIFICATION_DIGEST_CHUNK_SIZE = 500
+# Digest emails sent at once within a chunk, each on its own thread with its own
+# database client lease; see CELERY_DB_POOL_SOCKETS_PER_CLIENT
+NOTIFICATION_DIGEST_CONCURRENCY = 10
+
+# Cross-request cache of raw documents for StoredObject.load
+OBJECT_CACHE_ENABLED = False
+# Collection name => seconds an entry may live before it is re-read
+OBJECT_CACHE_SCHEMAS = {
+    'node': 60,
+    'user': 60,
+    'guid': 3600,
+}
+OBJECT_CACHE_MAX_ENTRIES = 10000
+# Optional shared tier; see framework.mongo.object_cache.LocalSharedBackend
+OBJECT_CACHE_SHARED_BACKEND = None
+
+# Cache of the nodes of a project tree a user can view, used by aggregate log
+# feeds; see website.project.visibility. 0 disables it. This is a permission
+# cache: without a shared backend, a process only sees changes made by others
+# (e.g. a removed contributor) once its entries expire, so the TTL is the
+# longest a user may still be shown logs of a node they lost access to.
+VISIBLE_NODES_CACHE_TTL = 5
+VISIBLE_NODES_CACHE_MAX_ENTRIES = 1000
+# Optional shared tier holding a generation per tree, so that changes
+# invalidate the entries of every process; see
+# framework.mongo.object_cache.LocalSharedBackend
+VISIBLE_NODES_CACHE_SHARED_BACKEND = None
+
+# Per-process cache of the node IDs each user contributes to, used to count
+# projects in common in contributor search; see framework.auth.contributed.
+# 0 disables it.
+CONTRIBUTED_NODES_CACHE_TTL = 300
+CONTRIBUTED_NODES_CACHE_MAX_ENTRIES = 10000
+
 # Cache settings
 SESSION_HISTORY_LENGTH = 5
 SESSION_HISTORY_IGNORE_RULES = [
@@ -167,6 +242,8 @@ PROFILE_IMAGE_SMALL = 20
 
 # Conference options
 CONFERENCE_MIN_COUNT = 5
+# Default number of submissions per page when the meeting listings are paginated
+CONFERENCE_SUBMISSIONS_PAGE_SIZE = 50
 
 WIKI_WHITELIST = {
     'tags': [
@@ -265,6 +342,14 @@ DEFAULT_HMAC_SECRET = 'changeme'
 DEFAULT_HMAC_ALGORITHM = hashlib.sha256
 WATERBUTLER_URL = 'http://localhost:7777'
 WATERBUTLER_ADDRS = ['127.0.0.1']
+# Requests to WaterButler made by the OSF; see website.util.waterbutler
+WATERBUTLER_TIMEOUT = 30  # Seconds
+WATERBUTLER_POOL_SIZE = 10
+# Seconds file metadata fetched from WaterButler is reused; 0 disables caching
+WATERBUTLER_METADATA_CACHE_TTL = 10
+WATERBUTLER_METADATA_CACHE_MAX_ENTRIES = 1000
+# Optional shared tier; see framework.mongo.object_cache.LocalSharedBackend
+WATERBUTLER_METADATA_CACHE_SHARED_BACKEND = None
 
 # Test identifier namespaces
 DOI_NAMESPACE = 'doi:10.5072/FK2'
@@ -289,8 +374,40 @@ ARCHIVE_PROVIDER = 'osfstorage'
 MAX_ARCHIVE_SIZE = 5 * 1024 ** 3  # == math.pow(1024, 3) == 1 GB
 MAX_FILE_SIZE = MAX_ARCHIVE_SIZE  # TODO limit file size?
 
+# Files and folders read and inserted at a time when copying a file tree,
+# e.g. for forks; see website.files.utils.copy_descendants
+FILE_COPY_BATCH_SIZE = 1000
+# Logs inserted at a time when cloning a node's logs for a fork or registration;
+# see website.project.model.NodeLog.clone_logs
+NODE_LOG_CLONE_BATCH_SIZE = 1000
+# Most recent log ids kept on each node; see website.project.model.Node.get_recent_log_ids
+NODE_RECENT_LOG_IDS_SIZE = 10
+
+# Nested (mod-meta) templates of a page rendered at once, each in a greenlet with a copy of the
+# request context; see framework.routing.WebRenderer.render_elements. Their queries do not run
+# inside the request's database transaction, so pages should not rely on it before enabling this.
+# Each greenlet holds its own database client lease while it renders
+WEB_RENDERER_NESTED_CONCURRENCY = 1
+
 ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
 
+# Folders listed at once when walking an addon's files, e.g. to stat them
+# for archiving; see website.addons.base.crawler
+ARCHIVER_CRAWL_CONCURRENCY = 5
+# Folder listings requested from WaterButler per second and per provider,
+# and how many may be requested at once after a pause
+ARCHIVER_CRAWL_RATE = 10
+ARCHIVER_CRAWL_BURST = 10
+# Overrides of the above per provider, e.g. {'github': {'concurrency': 2, 'rate': 1}}
+ARCHIVER_CRAWL_PROVIDER_LIMITS = {}
+# Listings that fail to connect or return 429 or 5xx are retried after
+# ARCHIVER_CRAWL_BACKOFF seconds, doubling each time
+ARCHIVER_CRAWL_RETRIES = 3
+ARCHIVER_CRAWL_BACKOFF = 0.5
+# Nodes whose osfstorage file maps are kept while migrating the files selected
+# in a registration's schema; see website.archiver.utils.FileMapCache
+ARCHIVER_FILE_MAP_CACHE_SIZE = 100
+
 ENABLE_ARCHIVER = True
 
 JWT_SECRET = 'changeme'
@@ -310,6 +427,8 @@ CELERY_IMPORTS = (
     'framework.celery_tasks.signals',
     'framework.email.tasks',
     'framework.analytics.tasks',
+    'framework.postcommit_tasks.tasks',
+    'api.caching.tasks',
     'website.mailchimp_utils',
     'website.notifications.tasks',
     'website.archiver.tasks',
@@ -461,6 +580,12 @@ ENABLE_INSTITUTIONS = False
 ENABLE_VARNISH = False
 ENABLE_ESI = False
 VARNISH_SERVERS = []  # This should be set in local.py or cache invalidation won't work
+# Seconds before a single BAN request is abandoned and retried from the task queue
+VARNISH_BAN_TIMEOUT = 0.3
+# Number of BAN requests sent at once
+VARNISH_BAN_CONCURRENCY = 10
+# Longest ban regex sent in one request; longer lists are split
+VARNISH_BAN_MAX_LENGTH = 2000
 ESI_MEDIA_TYPES = {'application/vnd.api+json', 'application/json'}
 
 # Used for gathering meta information about the current build
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Shared client for WaterButler's API and a short-lived cache of the file
+metadata it returns.
+
+All requests go through one `requests.Session`, so connections to WaterButler
+are kept alive and reused, and every request gets a timeout.
+
+Metadata is cached per (node, provider, path, user) for
+``settings.WATERBUTLER_METADATA_CACHE_TTL`` seconds. The entries of a node's
+provider are dropped whenever WaterButler reports a change to it through the
+log callback, see `website.addons.base.views.invalidate_waterbutler_metadata`.
+Entries are grouped by a generation number per node and provider, so with a
+shared tier configured (``settings.WATERBUTLER_METADATA_CACHE_SHARED_BACKEND``,
+see `framework.mongo.object_cache.LocalSharedBackend`) a change reported to
+one process also invalidates what the others cached. Without one, other
+processes only see the change once their entries expire.
+"""
+
+import copy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from framework.mongo.object_cache import TTLCache, Generations
+from website import settings
+
+
+# Keep-alive connections to WaterButler, shared by every request
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_maxsize=settings.WATERBUTLER_POOL_SIZE))
+session.mount('https://', HTTPAdapter(pool_maxsize=settings.WATERBUTLER_POOL_SIZE))
+
+
+def get(url, **kwargs):
+    """GET ``url`` from WaterButler over the shared session.
+
+    :raises requests.exceptions.RequestException: If WaterButler cannot be
+        reached or does not answer within ``settings.WATERBUTLER_TIMEOUT``
+    """
+    kwargs.setdefault('timeout', settings.WATERBUTLER_TIMEOUT)
+    return session.get(url, **kwargs)
+
+
+class MetadataCache(object):
+    """Bounded LRU of WaterButler metadata, optionally backed by a shared tier.
+
+    :param int ttl: Seconds an entry may live; 0 disables the cache
+    :param int max_entries: Maximum number of entries held in process
+    :param shared: Optional shared tier, see `LocalSharedBackend`
+    """
+
+    def __init__(self, ttl=10, max_entries=1000, shared=None):
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = TTLCache(ttl=ttl, max_entries=max_entries)
+        # Outlive every entry of the previous generation
+        self._generations = Generations(
+            'wbgeneration', ttl * 2, max_entries=max_entries, shared=shared, on_reset=self._entries.clear,
+        )
+
+    def _key(self, node_id, provider, path, user_id):
+        generation = self._generations.get('{}:{}'.format(node_id, provider))
+        return 'wbmetadata:{}:{}:{}:{}:{}'.format(node_id, provider, generation, user_id, path)
+
+    def get(self, node_id, provider, path, user_id):
+        """Return a copy of the cached metadata, or `None`."""
+        if not self.ttl:
+            return None
+        key = self._key(node_id, provider, path, user_id)
+        data = self._entries.get(key)
+        if data is None and self.shared is not None:
+            data = self.shared.get(key)
+            if data is not None:
+                self._entries.set(key, data)
+        return copy.deepcopy(data) if data is not None else None
+
+    def set(self, node_id, provider, path, user_id, data):
+        if not self.ttl:
+            return
+        key = self._key(node_id, provider, path, user_id)
+        data = copy.deepcopy(data)
+        self._entries.set(key, data)
+        if self.shared is not None:
+            self.shared.set(key, data, self.ttl)
+
+    def invalidate(self, node_id, provider):
+        """Drop everything cached for ``provider`` on the node ``node_id``."""
+        self._generations.bump('{}:{}'.format(node_id, provider))
+
+    def clear(self):
+        self._entries.clear()
+        self._generations.clear()
+
+
+METADATA_CACHE = MetadataCache(
+    ttl=settings.WATERBUTLER_METADATA_CACHE_TTL,
+    max_entries=settings.WATERBUTLER_METADATA_CACHE_MAX_ENTRIES,
+    shared=settings.WATERBUTLER_METADATA_CACHE_SHARED_BACKEND,
+)
+